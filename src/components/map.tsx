@@ -1,5 +1,7 @@
 import { FunctionComponent, useRef, useEffect, useState } from "react";
 import { findClosestEphemeraItem, updateOrbitLine } from "utils/map";
+import { getGroundTrackPosition } from "utils/groundTrack";
+import { getSubsolarIndex, getSubsolarPoint, isIssSunlit } from "utils/daylight";
 import { getLatLngObj } from "tle.js";
 import "ol/ol.css";
 import Map from "ol/Map";
@@ -20,11 +22,26 @@ import Terminator from "utils/terminator";
 import { timeStringFromTimeDef } from "utils/time";
 import { containsCoordinate } from "ol/extent";
 
+// the marker is dimmed while the ISS is in the Earth's shadow
+const markerStyle = (sunlit: boolean): Style =>
+  new Style({
+    text: new Text({
+      text: "X",
+      font: "bold 16px sans-serif",
+      fill: new Fill({ color: sunlit ? "red" : "darkred" }),
+      stroke: new Stroke({ color: "white", width: 1 }),
+    }),
+  });
+const SUNLIT_MARKER_STYLE = markerStyle(true);
+const SHADOW_MARKER_STYLE = markerStyle(false);
+
 const MapComponent: FunctionComponent<{
   viewDate: string;
   ephemeraItems: EphemeraItem[];
+  groundTrack: GroundTrack | null;
+  daylight: Daylight | null;
   timeDef: TimeDef;
-}> = ({ viewDate, ephemeraItems, timeDef }) => {
+}> = ({ viewDate, ephemeraItems, groundTrack, daylight, timeDef }) => {
   const mapRef = useRef<HTMLDivElement | null>(null);
   const olMapRef = useRef<Map | null>(null);
   const viewRef = useRef<View | null>(null);
@@ -81,16 +98,7 @@ const MapComponent: FunctionComponent<{
       geometry: new Point(fromLonLat([0, 0])), // Initial position
     });
 
-    markerFeatureRef.current.setStyle(
-      new Style({
-        text: new Text({
-          text: "X",
-          font: "bold 16px sans-serif",
-          fill: new Fill({ color: "red" }),
-          stroke: new Stroke({ color: "white", width: 1 }),
-        }),
-      })
-    );
+    markerFeatureRef.current.setStyle(SUNLIT_MARKER_STYLE);
 
     markerLayerRef.current.getSource().addFeature(markerFeatureRef.current);
 
@@ -135,15 +143,29 @@ const MapComponent: FunctionComponent<{
   useEffect(() => {
     if (!olMapRef.current || !ephemeraItems || !viewDate || !timeStr) return;
 
-    const ephemeris = findClosestEphemeraItem(new Date(`${viewDate}T${timeStr}Z`), ephemeraItems);
-    if (ephemeris) {
-      const tle = `${ephemeris.tle_line1}
+    const time = new Date(`${viewDate}T${timeStr}Z`).getTime();
+    // Interpolate the precomputed ground track, or propagate the closest TLE without one
+    let position: { lat: number; lng: number } | undefined =
+      groundTrack && getGroundTrackPosition(groundTrack, time);
+    if (!position) {
+      const ephemeris = findClosestEphemeraItem(new Date(time), ephemeraItems);
+      if (ephemeris) {
+        const tle = `${ephemeris.tle_line1}
         ${ephemeris.tle_line2}`;
-      const { lat, lng } = getLatLngObj(tle, new Date(`${viewDate}T${timeStr}Z`).getTime());
+        position = getLatLngObj(tle, time);
+      }
+    }
+    if (position) {
+      const { lat, lng } = position;
 
       if (markerFeatureRef.current) {
         // Update marker position directly for better performance
         (markerFeatureRef.current.getGeometry() as Point).setCoordinates(fromLonLat([lng, lat]));
+        const sunlit = (daylight && isIssSunlit(daylight, time)) ?? true;
+        const style = sunlit ? SUNLIT_MARKER_STYLE : SHADOW_MARKER_STYLE;
+        if (markerFeatureRef.current.getStyle() !== style) {
+          markerFeatureRef.current.setStyle(style);
+        }
 
         // Check if the marker is within the current view
         const view = viewRef.current;
@@ -156,15 +178,25 @@ const MapComponent: FunctionComponent<{
         }
       }
     }
-  }, [ephemeraItems, viewDate, timeStr]);
+  }, [ephemeraItems, groundTrack, daylight, viewDate, timeStr]);
+
+  // The precomputed subsolar point only changes every few minutes of playback
+  const subsolarIndex =
+    daylight && timeStr
+      ? getSubsolarIndex(daylight, new Date(`${viewDate}T${timeStr}Z`).getTime())
+      : 0;
 
   /**
    * Add a terminator layer to the map
    */
   useEffect(() => {
     if (!viewDate || !olMapRef.current) return;
-    // Add terminator layer
-    const terminator = new Terminator({ time: new Date(viewDate), resolution: 2 });
+    // Add terminator layer, computing the sun's position only for dates without a daylight file
+    const terminator = new Terminator({
+      time: new Date(viewDate),
+      resolution: 2,
+      subsolar: daylight ? getSubsolarPoint(daylight, subsolarIndex) : undefined,
+    });
     const terminatorGeoJSON = terminator.getTerminator();
 
     const terminatorSource = new VectorSourceOL({
@@ -190,15 +222,20 @@ const MapComponent: FunctionComponent<{
     return () => {
       olMapRef.current.removeLayer(terminatorLayer);
     };
-  }, [viewDate]);
+  }, [viewDate, daylight, subsolarIndex]);
 
   /**
    * Update the orbit line based on the current time
    */
   useEffect(() => {
-    if (!viewDate || !olMapRef.current || !ephemeraItems.length) return;
+    if (!viewDate || !olMapRef.current || (!ephemeraItems.length && !groundTrack)) return;
 
-    const { coordinates1, coordinates2 } = updateOrbitLine(viewDate, timeStr, ephemeraItems);
+    const { coordinates1, coordinates2 } = updateOrbitLine(
+      viewDate,
+      timeStr,
+      ephemeraItems,
+      groundTrack
+    );
 
     const orbitSource = orbitLayerRef.current?.getSource();
     if (orbitSource) {
@@ -218,7 +255,7 @@ const MapComponent: FunctionComponent<{
         orbitSource.addFeature(orbitFeature2);
       }
     }
-  }, [viewDate, ephemeraItems, timeStr]);
+  }, [viewDate, ephemeraItems, groundTrack, timeStr]);
 
   return <div ref={mapRef} style={{ width: "100%", height: "100%" }}></div>;
 };
@@ -15,6 +15,8 @@ const DatePage = (): JSX.Element => {
     transcriptItems,
     imageItems,
     ephemeraItems,
+    groundTrack,
+    daylight,
     evaDetails,
     youtubeLiveRecordings,
     crewArrDep,
@@ -34,9 +36,8 @@ const DatePage = (): JSX.Element => {
   const timeStrRef = useRef<HTMLSpanElement>(null);
 
   const evaDetailsForDate = evaDetails.filter((evaDetail) => evaDetail.startTime.startsWith(date));
-  const youtubeLiveRecordingsForDate = youtubeLiveRecordings.filter((recording) =>
-    recording.startTime.startsWith(date)
-  );
+  // the loader already returns only the recordings overlapping this date
+  const youtubeLiveRecordingsForDate = youtubeLiveRecordings;
 
   const crewOnboard = getCrewMembersOnboardByDate({ crewArrDep, dateStr: date });
   const expedition = expeditionInfo.find((exp) => exp.start <= date && exp.end >= date);
@@ -106,7 +107,13 @@ const DatePage = (): JSX.Element => {
           <YouTube viewDate={date} timeDef={timeDef} />
         </div>
         <div className={styles.mapContainer}>
-          <Map ephemeraItems={ephemeraItems} viewDate={date} timeDef={timeDef} />
+          <Map
+            ephemeraItems={ephemeraItems}
+            groundTrack={groundTrack}
+            daylight={daylight}
+            viewDate={date}
+            timeDef={timeDef}
+          />
         </div>
       </div>
 
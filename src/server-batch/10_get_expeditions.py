@@ -1,6 +1,7 @@
-import requests
+from http_cache import cached_get
+from http_client import client
+from output_files import write_json_if_changed
 from bs4 import BeautifulSoup
-import json
 import re, os
 import datetime  # Added import
 
@@ -58,7 +59,7 @@ def get_expedition_patch_url(expedition_number):
         }
 
         # Make the API request
-        response = requests.get(api_url, params=params)
+        response = cached_get(api_url, params=params)
         data = response.json()
 
         # Extract page information
@@ -85,7 +86,7 @@ def get_expedition_patch_url(expedition_number):
     }
 
     # Make the search API request
-    search_response = requests.get(api_url, params=search_params)
+    search_response = cached_get(api_url, params=search_params)
     search_data = search_response.json()
 
     # Iterate over search results
@@ -94,7 +95,7 @@ def get_expedition_patch_url(expedition_number):
 
         # Get image info for the found file
         params["titles"] = file_title
-        response = requests.get(api_url, params=params)
+        response = cached_get(api_url, params=params)
         data = response.json()
         pages = data.get("query", {}).get("pages", {})
         for page in pages.values():
@@ -111,7 +112,7 @@ def get_expedition_patch_url(expedition_number):
 
 def scrape_expedition(num):
     url = f"https://www.nasa.gov/mission/expedition-{str(num)}/"
-    response = requests.get(url)
+    response = cached_get(url)
     response.raise_for_status()  # Check for request errors
 
     soup = BeautifulSoup(response.content, "html.parser")
@@ -142,15 +143,17 @@ def scrape_expedition(num):
     return mission_info
 
 
-if __name__ == "__main__":
-    expeditions = []
-    for i in range(1, 72):
-        data = scrape_expedition(i)
-        # get patch image url
-        data["patchUrl"] = get_expedition_patch_url(i)
+def get_expedition(num):
+    data = scrape_expedition(num)
+    # get patch image url
+    data["patchUrl"] = get_expedition_patch_url(num)
+    return data
+
 
-        expeditions.append(data)
+if __name__ == "__main__":
+    # Expeditions are independent, so scrape them concurrently. The shared client keeps the
+    # requests to each host within its limits.
+    expeditions = client.map(get_expedition, range(1, 72))
 
     # Save the data to a JSON file
-    with open(f"{S3_FOLDER}/expeditions.json", "w") as f:
-        json.dump(expeditions, f, indent=4)
+    write_json_if_changed(f"{S3_FOLDER}/expeditions.json", expeditions)
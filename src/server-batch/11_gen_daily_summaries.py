@@ -3,6 +3,7 @@ import json
 import requests
 import csv  # Added import for CSV parsing
 from bs4 import BeautifulSoup
+from http_cache import cached_get
 
 # import openai  # Removed import
 from datetime import datetime
@@ -26,7 +27,7 @@ def fetch_blog_content(url):
         str: The extracted text content.
     """
     try:
-        response = requests.get(url)
+        response = cached_get(url)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, "html.parser")
 
@@ -58,7 +59,7 @@ def parse_transcript(url):
     """
     transcript_entries = []
     try:
-        response = requests.get(url)
+        response = cached_get(url)
         response.raise_for_status()
         lines = response.text.splitlines()
         reader = csv.reader(lines, delimiter="|")
@@ -0,0 +1,139 @@
+import os
+import json
+import gzip
+import hashlib
+import brotli
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv(dotenv_path="../../.env")
+
+# This script prepares the text artifacts in the S3 folder for publication. It should be run after
+# all of the other scripts. The stages already write their JSON compactly (see output_files.py), so
+# the artifacts are published as they are and never rewritten here, which keeps their mtimes for
+# the incremental stages. Every JSON and CSV artifact gets precompressed .gz and .br variants next
+# to it, and the content hash of each artifact is recorded in static_manifest.json at the S3 root.
+# The client's data loaders read the manifest and append ?v=<hash> to artifact URLs (see
+# src/utils/staticFiles.ts), so CDN and browser caches can keep the artifacts indefinitely and
+# only the manifest needs a short cache lifetime. Files whose hash is unchanged since the last run
+# are not recompressed.
+
+S3_FOLDER = os.getenv("S3_FOLDER")
+STATIC_MANIFEST = "static_manifest.json"
+ARTIFACT_EXTENSIONS = (".json", ".csv")
+HASH_LENGTH = 16
+
+
+def write_compressed_variants(file_path, content):
+    # mtime=0 keeps the gzip output identical for identical content
+    with open(file_path + ".gz", "wb") as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    with open(file_path + ".br", "wb") as f:
+        f.write(brotli.compress(content, quality=11))
+
+
+def find_artifacts(s3_folder):
+    for dirpath, dirnames, filenames in os.walk(s3_folder):
+        for filename in filenames:
+            if filename.endswith(ARTIFACT_EXTENSIONS) and filename != STATIC_MANIFEST:
+                full_path = os.path.join(dirpath, filename)
+                yield os.path.relpath(full_path, s3_folder).replace(os.sep, "/")
+
+
+def date_page_artifacts(date_str):
+    # The files getDatePageData in src/utils/dataLoaders.ts fetches for one date page
+    year, month, day = date_str.split("-")
+    return [
+        f"comm/{year}/{month}/{day}/_transcript_{date_str}.csv",
+        f"images/{year}/{month}/images-manifest_{date_str}.json",
+        f"ephemera/{year}/{year}-{month}.json",
+        f"groundtrack/{year}/{month}/groundtrack_{date_str}.json",
+        f"daylight/{year}/{month}/daylight_{date_str}.json",
+        "eva_details.json",
+        "available_dates.json",
+        f"youtube/{year}/{year}-{month}.json",
+        f"crew/{year}/{year}-{month}.json",
+        "expeditions.json",
+    ]
+
+
+def publish_artifact(s3_folder, rel_path, previous_hash):
+    """
+    Compresses one artifact. Returns (hash, raw bytes, gzip bytes, brotli bytes).
+    """
+    file_path = os.path.join(s3_folder, rel_path)
+    with open(file_path, "rb") as f:
+        content = f.read()
+
+    content_hash = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    if (
+        content_hash != previous_hash
+        or not os.path.exists(file_path + ".gz")
+        or not os.path.exists(file_path + ".br")
+    ):
+        if rel_path.endswith(".json"):
+            # Raises ValueError for a broken file, which is then left unpublished
+            json.loads(content)
+        write_compressed_variants(file_path, content)
+
+    return (
+        content_hash,
+        len(content),
+        os.path.getsize(file_path + ".gz"),
+        os.path.getsize(file_path + ".br"),
+    )
+
+
+def main():
+    manifest_path = os.path.join(S3_FOLDER, STATIC_MANIFEST)
+    previous_files = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous_files = json.load(f)["files"]
+
+    files = {}
+    sizes = {}
+    for rel_path in sorted(find_artifacts(S3_FOLDER)):
+        try:
+            content_hash, *artifact_sizes = publish_artifact(
+                S3_FOLDER, rel_path, previous_files.get(rel_path)
+            )
+        except (ValueError, OSError) as e:
+            print(f"Error publishing {rel_path}: {e}")
+            continue
+        files[rel_path] = content_hash
+        sizes[rel_path] = artifact_sizes
+
+    manifest_content = json.dumps(
+        {"files": files}, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+    with open(manifest_path, "wb") as f:
+        f.write(manifest_content)
+    write_compressed_variants(manifest_path, manifest_content)
+
+    raw, gz, br = (sum(s[i] for s in sizes.values()) for i in range(3))
+    print(f"Published {len(files):,} artifacts to {manifest_path}")
+    if raw:
+        print(
+            f"Total: {raw:,} bytes raw, {gz:,} gzip ({raw / max(gz, 1):.1f}x), "
+            f"{br:,} brotli ({raw / max(br, 1):.1f}x)"
+        )
+
+    # Report the transfer size of the most recent date page as a reference point
+    available_dates_path = os.path.join(S3_FOLDER, "available_dates.json")
+    if os.path.exists(available_dates_path):
+        with open(available_dates_path, "r", encoding="utf-8") as f:
+            available_dates = json.load(f)
+        if available_dates:
+            date_str = max(item["date"] for item in available_dates)
+            page_sizes = [sizes[p] for p in date_page_artifacts(date_str) if p in sizes]
+            raw, gz, br = (sum(s[i] for s in page_sizes) for i in range(3))
+            if raw:
+                print(
+                    f"Date page {date_str}: {raw:,} bytes raw, {gz:,} gzip, {br:,} brotli "
+                    f"({raw / max(br, 1):.1f}x smaller)"
+                )
+
+
+if __name__ == "__main__":
+    main()
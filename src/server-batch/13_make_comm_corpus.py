@@ -0,0 +1,141 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+from comm_audio import (
+    get_day_audio_index_filename,
+    read_day_durations,
+    utterance_duration,
+)
+from comm_corpus import CORPUS_DIR, SCHEMA, get_day_path
+from comm_transcripts import channel_from_filename, utc_times_from_aac_filenames
+
+# Load environment variables from .env file
+load_dotenv(dotenv_path="../../.env")
+
+# This script compacts the daily transcript CSVs in the 'comm' directory into the columnar corpus
+# dataset described in comm_corpus.py. A manifest of each CSV's and audio index's size and mtime is
+# kept in the corpus directory so only days that stage 3 has rebuilt are rewritten. Days whose CSV has
+# disappeared are removed from the dataset.
+
+COMM_S3 = os.getenv("S3_FOLDER") + "comm/"
+CORPUS_MANIFEST = os.path.join(CORPUS_DIR, "_manifest.json")
+
+
+def parse_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def build_day_table(date_str, transcript_path):
+    rows = []
+    with open(transcript_path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("|")
+            if len(fields) == 7:
+                rows.append(fields)
+
+    # Exact durations come from the consolidated audio index written by stage 3
+    durations = read_day_durations(os.path.dirname(transcript_path), date_str)
+
+    filenames = [fields[1] for fields in rows]
+    columns = {
+        "utc": utc_times_from_aac_filenames(filenames),
+        "date": [date_str] * len(rows),
+        "channel": [
+            int(channel) if channel.isdigit() else None
+            for channel in map(channel_from_filename, filenames)
+        ],
+        "language": [fields[4] for fields in rows],
+        "start": [parse_float(fields[2]) for fields in rows],
+        "end": [parse_float(fields[3]) for fields in rows],
+        "duration": [
+            utterance_duration(durations, fields[1], fields[3]) for fields in rows
+        ],
+        "filename": filenames,
+        "text": [fields[5] for fields in rows],
+        "textOriginalLang": [fields[6] for fields in rows],
+    }
+    return pa.table(columns, schema=SCHEMA)
+
+
+def write_day(date_str, transcript_path):
+    table = build_day_table(date_str, transcript_path)
+    day_path = get_day_path(CORPUS_DIR, date_str)
+    os.makedirs(os.path.dirname(day_path), exist_ok=True)
+    pq.write_table(table, day_path, compression="zstd")
+    return date_str, table.num_rows
+
+
+def find_transcripts(comm_dir):
+    transcripts = {}
+    for year in os.listdir(comm_dir):
+        year_path = os.path.join(comm_dir, year)
+        if os.path.isdir(year_path):
+            for month in os.listdir(year_path):
+                month_path = os.path.join(year_path, month)
+                if os.path.isdir(month_path):
+                    for day in os.listdir(month_path):
+                        date_str = f"{year}-{month}-{day}"
+                        transcript_path = os.path.join(
+                            month_path, day, f"_transcript_{date_str}.csv"
+                        )
+                        if os.path.exists(transcript_path):
+                            transcripts[date_str] = transcript_path
+    return transcripts
+
+
+def main():
+    manifest = {}
+    if os.path.exists(CORPUS_MANIFEST):
+        with open(CORPUS_MANIFEST, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    transcripts = find_transcripts(COMM_S3)
+    stats = {}
+    for date_str, transcript_path in transcripts.items():
+        stat = os.stat(transcript_path)
+        # The durations come from the audio index, so a changed index rewrites the day too
+        audio_index_path = os.path.join(
+            os.path.dirname(transcript_path), get_day_audio_index_filename(date_str)
+        )
+        audio_index_stat = None
+        if os.path.exists(audio_index_path):
+            index_stat = os.stat(audio_index_path)
+            audio_index_stat = [index_stat.st_size, index_stat.st_mtime_ns]
+        stats[date_str] = [stat.st_size, stat.st_mtime_ns, audio_index_stat]
+    to_write = [
+        date_str
+        for date_str in sorted(transcripts)
+        if manifest.get(date_str) != stats[date_str]
+        or not os.path.exists(get_day_path(CORPUS_DIR, date_str))
+    ]
+
+    for date_str in set(manifest) - set(transcripts):
+        day_path = get_day_path(CORPUS_DIR, date_str)
+        if os.path.exists(day_path):
+            os.remove(day_path)
+        print(f"Removed {date_str} from the corpus")
+
+    if to_write:
+        with ProcessPoolExecutor() as executor:
+            for date_str, num_rows in executor.map(
+                write_day, to_write, [transcripts[d] for d in to_write]
+            ):
+                print(f"Wrote {num_rows:,} utterances for {date_str}")
+
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    with open(CORPUS_MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(stats, f)
+    print(
+        f"Corpus at {CORPUS_DIR} is up to date: {len(transcripts):,} days, "
+        f"{len(to_write):,} rewritten"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import os
+import json
+from collections import defaultdict
+from dotenv import load_dotenv
+from comm_transcripts import channel_from_filename, utc_times_from_aac_filenames
+from search_index import (
+    SEARCH_INDEX_FILENAME,
+    get_shard_id,
+    tokenize,
+    write_shard,
+)
+
+# Load environment variables from .env file
+load_dotenv(dotenv_path="../../.env")
+
+# This script builds the static full-text search index described in search_index.py from the
+# daily transcript CSVs in the 'comm' directory. Each day's postings are cached in SEARCH_WORK
+# together with the size and mtime of its CSV. Only days that stage 3 has rebuilt are re-read,
+# and only the shards of the years those days fall in are rewritten. Caches written with an older
+# DAY_CACHE_VERSION are rebuilt.
+
+COMM_S3 = os.getenv("S3_FOLDER") + "comm/"
+SEARCH_S3 = os.getenv("S3_FOLDER") + "search/"
+SEARCH_WORK = os.getenv("SG_RAW_FOLDER") + "search_work/"
+# Version 2 postings start with the full UTC time instead of the folder date and UTC time of day
+DAY_CACHE_VERSION = 2
+
+
+def build_day_postings(transcript_path):
+    """
+    Returns {term: [[utc time, channel, filename], ...]} for one transcript CSV.
+    """
+    with open(transcript_path, "r", encoding="utf-8") as f:
+        rows = [line.rstrip("\n").split("|") for line in f]
+    rows = [fields for fields in rows if len(fields) == 7]
+    utc_times = utc_times_from_aac_filenames(fields[1] for fields in rows)
+
+    postings = defaultdict(list)
+    for fields, utc_dt in zip(rows, utc_times):
+        time, filename, start, end, language, text, textOriginalLang = fields
+        posting = [
+            utc_dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            channel_from_filename(filename),
+            filename,
+        ]
+        for term in set(tokenize(text)) | set(tokenize(textOriginalLang)):
+            postings[term].append(posting)
+    return postings
+
+
+def get_day_cache_path(date_str):
+    return os.path.join(SEARCH_WORK, "days", f"{date_str}.json")
+
+
+def update_day_caches(comm_dir):
+    """
+    Refreshes the per-day posting caches. Returns (all dates, years with changed days).
+    """
+    dates = set()
+    changed_years = set()
+    for year in os.listdir(comm_dir):
+        year_path = os.path.join(comm_dir, year)
+        if not os.path.isdir(year_path):
+            continue
+        for month in os.listdir(year_path):
+            month_path = os.path.join(year_path, month)
+            if not os.path.isdir(month_path):
+                continue
+            for day in os.listdir(month_path):
+                date_str = f"{year}-{month}-{day}"
+                transcript_path = os.path.join(
+                    month_path, day, f"_transcript_{date_str}.csv"
+                )
+                if not os.path.exists(transcript_path):
+                    continue
+                dates.add(date_str)
+
+                stat = os.stat(transcript_path)
+                source = [stat.st_size, stat.st_mtime_ns]
+                cache_path = get_day_cache_path(date_str)
+                if os.path.exists(cache_path):
+                    with open(cache_path, "r", encoding="utf-8") as f:
+                        cache = json.load(f)
+                    if (
+                        cache.get("version") == DAY_CACHE_VERSION
+                        and cache["source"] == source
+                    ):
+                        continue
+
+                print(f"Indexing {date_str}...")
+                postings = build_day_postings(transcript_path)
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                with open(cache_path, "w", encoding="utf-8") as f:
+                    json.dump(
+                        {
+                            "version": DAY_CACHE_VERSION,
+                            "source": source,
+                            "postings": postings,
+                        },
+                        f,
+                        ensure_ascii=False,
+                    )
+                changed_years.add(year)
+
+    # Days that no longer have a transcript
+    days_dir = os.path.join(SEARCH_WORK, "days")
+    if os.path.isdir(days_dir):
+        for filename in os.listdir(days_dir):
+            date_str = filename.replace(".json", "")
+            if date_str not in dates:
+                os.remove(os.path.join(days_dir, filename))
+                changed_years.add(date_str[:4])
+    return dates, changed_years
+
+
+def build_year_shards(year, dates):
+    """
+    Merges the cached day postings of one year into its shards. Returns the shard ids written.
+    """
+    shards = defaultdict(lambda: defaultdict(list))
+    for date_str in sorted(d for d in dates if d.startswith(year)):
+        with open(get_day_cache_path(date_str), "r", encoding="utf-8") as f:
+            postings = json.load(f)["postings"]
+        for term, term_postings in postings.items():
+            shards[get_shard_id(term)][term].extend(term_postings)
+
+    year_dir = os.path.join(SEARCH_S3, year)
+    if os.path.isdir(year_dir):
+        for filename in os.listdir(year_dir):
+            os.remove(os.path.join(year_dir, filename))
+    for shard_id, postings in shards.items():
+        write_shard(SEARCH_S3, year, shard_id, postings)
+    return sorted(shards)
+
+
+def main():
+    dates, changed_years = update_day_caches(COMM_S3)
+
+    index_path = os.path.join(SEARCH_S3, SEARCH_INDEX_FILENAME)
+    years = {}
+    if os.path.exists(index_path):
+        with open(index_path, "r") as f:
+            years = json.load(f)["years"]
+
+    all_years = set(date_str[:4] for date_str in dates)
+    for year in sorted(changed_years | (all_years - set(years))):
+        print(f"Writing search shards for {year}...")
+        years[year] = build_year_shards(year, dates)
+    years = {year: shard_ids for year, shard_ids in years.items() if year in all_years}
+
+    os.makedirs(SEARCH_S3, exist_ok=True)
+    with open(index_path, "w") as f:
+        json.dump({"years": dict(sorted(years.items()))}, f, separators=(",", ":"))
+    print(f"Search index at {SEARCH_S3} covers {len(dates):,} days")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import os
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from output_files import write_json_if_changed
+
+# Load environment variables from .env file
+load_dotenv(dotenv_path="../../.env")
+
+# This script precomputes who was onboard for every available date from the reviewed crew
+# arrival/departure list and expeditions.json, so date pages no longer scan the whole crew
+# history. A single sweep over the sorted arrival/departure events visits the dates in order,
+# giving each date's roster at 00:00 UTC and the changes during the day. Crew are tracked per
+# stint, keyed "name|arrivalDate", so someone who flew more than once keeps each stay's record.
+# One file per month:
+#   crew/2023/2023-11.json
+#     {"crew": {stint: crew arrival/departure record, for every stint overlapping the month},
+#      "days": {"2023-11-01": {"onboard": [stints at 00:00 UTC],
+#                              "changes": [[utc time, "arrival" | "departure", stint], ...],
+#                              "expedition": number}}}
+# Who was onboard at time T is the day's onboard list with the changes up to T applied.
+
+S3_FOLDER = os.getenv("S3_FOLDER")
+CREW_ARR_DEP_S3 = S3_FOLDER + "iss_crew_arr_dep.json"
+EXPEDITIONS_S3 = S3_FOLDER + "expeditions.json"
+AVAILABLE_DATES_S3 = S3_FOLDER + "available_dates.json"
+CREW_ROSTER_S3 = S3_FOLDER + "crew/"
+
+
+def parse_utc(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(
+            timezone.utc
+        )
+    except ValueError:
+        return None
+
+
+def stint_key(crew_member):
+    return f"{crew_member['name']}|{crew_member['arrivalDate']}"
+
+
+def get_stints(crew_arr_dep):
+    """
+    Returns (stint key, arrival, departure, record) for every crew arrival/departure record.
+    Records without an arrival time are skipped, and a departure of None is still onboard.
+    """
+    stints = []
+    for crew_member in crew_arr_dep:
+        arrival = parse_utc(crew_member.get("arrivalDate"))
+        if arrival is None:
+            continue
+        departure = parse_utc(crew_member.get("departureDate"))
+        stints.append((stint_key(crew_member), arrival, departure, crew_member))
+    return stints
+
+
+def get_crew_events(stints):
+    """
+    Returns the arrival and departure events of the stints sorted by time.
+    """
+    events = []
+    for key, arrival, departure, _ in stints:
+        events.append((arrival, "arrival", key))
+        if departure is not None:
+            events.append((departure, "departure", key))
+    # Departures before arrivals at the same instant, so a handover never double counts
+    events.sort(key=lambda event: (event[0], event[1] == "arrival", event[2]))
+    return events
+
+
+def get_active_expedition(expeditions, date_str):
+    """
+    The most recently started expedition covering the date, or None.
+    """
+    active = [
+        expedition
+        for expedition in expeditions
+        if expedition.get("start")
+        and expedition["start"] <= date_str
+        and (not expedition.get("end") or date_str <= expedition["end"])
+    ]
+    if not active:
+        return None
+    return max(active, key=lambda expedition: expedition["start"])["expedition"]
+
+
+def build_rosters(dates, events, expeditions):
+    """
+    Sweeps the events once over the sorted dates. Returns {date: day roster}.
+    """
+    rosters = {}
+    onboard = set()
+    event_index = 0
+    for date_str in sorted(dates):
+        day_start = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        day_end = day_start + timedelta(days=1)
+
+        # Apply everything before midnight
+        while event_index < len(events) and events[event_index][0] < day_start:
+            time, change, key = events[event_index]
+            if change == "arrival":
+                onboard.add(key)
+            else:
+                onboard.discard(key)
+            event_index += 1
+
+        changes = []
+        i = event_index
+        while i < len(events) and events[i][0] < day_end:
+            time, change, key = events[i]
+            changes.append([time.strftime("%Y-%m-%dT%H:%M:%SZ"), change, key])
+            i += 1
+
+        rosters[date_str] = {
+            "onboard": sorted(onboard),
+            "changes": changes,
+            "expedition": get_active_expedition(expeditions, date_str),
+        }
+    return rosters
+
+
+def get_month_stints(stints, month_str):
+    """
+    {stint key: record} for the stints overlapping the month.
+    """
+    month_start = datetime.strptime(month_str, "%Y-%m").replace(tzinfo=timezone.utc)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    return {
+        key: record
+        for key, arrival, departure, record in sorted(stints, key=lambda s: s[0])
+        if arrival < next_month and (departure is None or departure >= month_start)
+    }
+
+
+def write_month_rosters(rosters, stints, output_dir):
+    months = defaultdict(dict)
+    for date_str, roster in rosters.items():
+        months[date_str[:7]][date_str] = roster
+
+    written = 0
+    for month_str, days in sorted(months.items()):
+        output_path = os.path.join(output_dir, month_str[:4], f"{month_str}.json")
+        roster = {"crew": get_month_stints(stints, month_str), "days": days}
+        if write_json_if_changed(output_path, roster):
+            written += 1
+    print(f"Crew rosters: {len(months)} months, {written} rewritten")
+
+
+def main():
+    with open(CREW_ARR_DEP_S3, "r", encoding="utf-8") as f:
+        crew_arr_dep = json.load(f)
+    expeditions = []
+    if os.path.exists(EXPEDITIONS_S3):
+        with open(EXPEDITIONS_S3, "r", encoding="utf-8") as f:
+            expeditions = json.load(f)
+    with open(AVAILABLE_DATES_S3, "r") as f:
+        dates = [item["date"] for item in json.load(f)]
+
+    stints = get_stints(crew_arr_dep)
+    rosters = build_rosters(dates, get_crew_events(stints), expeditions)
+    write_month_rosters(rosters, stints, CREW_ROSTER_S3)
+
+
+if __name__ == "__main__":
+    main()
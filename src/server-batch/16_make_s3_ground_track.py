@@ -0,0 +1,92 @@
+import os
+import json
+import numpy as np
+from dotenv import load_dotenv
+from orbit import get_months, load_tles, ground_track
+from output_files import write_json_if_changed
+
+# Load environment variables from .env file
+load_dotenv(dotenv_path="../../.env")
+
+# This script precomputes the ISS ground track for every available date from the ephemera TLEs
+# (see orbit.py), so the date page only interpolates between samples instead of propagating TLEs
+# for every frame, and every client shows the same positions. Samples are taken every
+# GROUND_TRACK_STEP_SECONDS from GROUND_TRACK_PADDING_SECONDS before the date to as long after
+# it, which covers the map's orbit line around any time of the day. One file per date:
+#   groundtrack/2023/11/groundtrack_2023-11-01.json
+#     {"start": first sample UTC, "step": seconds, "count": samples,
+#      "lat": [...], "lon": [...], "alt": [...],
+#      "sunlitAtStart": bool, "sunlitChanges": [sample indexes where sunlit flips]}
+# lat and lon are in 1e-4 degrees and alt in metres. Each holds the first sample followed by
+# the difference from the previous sample, so the files stay small and compress well.
+
+S3_FOLDER = os.getenv("S3_FOLDER")
+EPHEMERA_S3 = S3_FOLDER + "ephemera/"
+AVAILABLE_DATES_S3 = S3_FOLDER + "available_dates.json"
+GROUND_TRACK_S3 = S3_FOLDER + "groundtrack/"
+
+GROUND_TRACK_STEP_SECONDS = 10
+GROUND_TRACK_PADDING_SECONDS = 4000
+DEGREES_SCALE = 10000
+
+
+def get_sample_times(date_str):
+    start = np.datetime64(date_str) - np.timedelta64(GROUND_TRACK_PADDING_SECONDS, "s")
+    count = (86400 + 2 * GROUND_TRACK_PADDING_SECONDS) // GROUND_TRACK_STEP_SECONDS + 1
+    return start + np.arange(count) * np.timedelta64(GROUND_TRACK_STEP_SECONDS, "s")
+
+
+def delta_encode(values):
+    values = np.asarray(values, dtype=np.int64)
+    return np.diff(values, prepend=0).tolist()
+
+
+def encode_ground_track(times, track):
+    sunlit = track["sunlit"]
+    return {
+        "start": str(times[0].astype("datetime64[s]")) + "Z",
+        "step": GROUND_TRACK_STEP_SECONDS,
+        "count": len(times),
+        "lat": delta_encode(np.round(track["lat"] * DEGREES_SCALE)),
+        "lon": delta_encode(np.round(track["lon"] * DEGREES_SCALE)),
+        "alt": delta_encode(np.round(track["alt"] * 1000)),
+        "sunlitAtStart": bool(sunlit[0]),
+        "sunlitChanges": (np.flatnonzero(sunlit[1:] != sunlit[:-1]) + 1).tolist(),
+    }
+
+
+def main():
+    with open(AVAILABLE_DATES_S3, "r") as f:
+        dates = sorted(item["date"] for item in json.load(f))
+
+    tles_by_months = {}
+    written = 0
+    skipped = 0
+    for date_str in dates:
+        times = get_sample_times(date_str)
+        months = get_months(times[0], times[-1])
+        if months not in tles_by_months:
+            tles_by_months[months] = load_tles(EPHEMERA_S3, months)
+        tles = tles_by_months[months]
+        if not len(tles):
+            print(f"No ephemera for {date_str}, skipping")
+            skipped += 1
+            continue
+
+        track = ground_track(tles, times)
+        if not track["valid"].all():
+            print(f"SGP4 failed for some of {date_str}'s samples, skipping")
+            skipped += 1
+            continue
+
+        year, month, day = date_str.split("-")
+        output_path = os.path.join(
+            GROUND_TRACK_S3, year, month, f"groundtrack_{date_str}.json"
+        )
+        if write_json_if_changed(output_path, encode_ground_track(times, track)):
+            written += 1
+    print(f"Ground tracks: {len(dates)} dates, {written} rewritten, {skipped} skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import numpy as np
+from dotenv import load_dotenv
+from comm_transcripts import utc_times_from_aac_filenames
+from orbit import get_months, load_tles, ground_track
+from output_files import write_json_if_changed
+
+# Load environment variables from .env file
+load_dotenv(dotenv_path="../../.env")
+
+# This script geotags every utterance and photo with where the ISS was at the time, so the UI
+# can filter by region without propagating TLEs. For each available date, the times of the
+# transcript rows (file start time plus the segment start) and of the photos (dateTaken) are
+# propagated together in one vectorized pass (see orbit.py). Two sidecars are written:
+#   comm/2023/11/01/_transcript_2023-11-01_geo.json
+#     {"lat": [...], "lon": [...]} in CSV row order, null where the ephemera do not cover a row
+#   images/2023/11/images-geo_2023-11-01.json
+#     {photo ID: [lat, lon]} for the photos with a full dateTaken
+# A date is skipped when its sidecars are newer than the transcript, the image manifest and
+# the ephemera months they were computed from.
+
+S3_FOLDER = os.getenv("S3_FOLDER")
+COMM_S3 = S3_FOLDER + "comm/"
+IMAGES_S3 = S3_FOLDER + "images/"
+EPHEMERA_S3 = S3_FOLDER + "ephemera/"
+AVAILABLE_DATES_S3 = S3_FOLDER + "available_dates.json"
+
+# 0.001 degrees is about 110 m; the ISS covers 7.7 km in the second utterance times resolve to
+COORDINATE_DECIMALS = 3
+
+
+def get_day_paths(date_str):
+    year, month, day = date_str.split("-")
+    day_dir = os.path.join(COMM_S3, year, month, day)
+    images_dir = os.path.join(IMAGES_S3, year, month)
+    return {
+        "transcript": os.path.join(day_dir, f"_transcript_{date_str}.csv"),
+        "transcript_geo": os.path.join(day_dir, f"_transcript_{date_str}_geo.json"),
+        "images": os.path.join(images_dir, f"images-manifest_{date_str}.json"),
+        "images_geo": os.path.join(images_dir, f"images-geo_{date_str}.json"),
+    }
+
+
+def read_utterance_times(transcript_path):
+    """
+    Returns a datetime64 array with each CSV row's UTC time.
+    """
+    filenames = []
+    starts = []
+    with open(transcript_path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("|")
+            if len(fields) != 7:
+                continue
+            filenames.append(fields[1])
+            try:
+                starts.append(float(fields[2]))
+            except ValueError:
+                starts.append(0.0)
+
+    times = np.array(
+        [utc.replace(tzinfo=None) for utc in utc_times_from_aac_filenames(filenames)],
+        dtype="datetime64[ms]",
+    )
+    return times + (np.array(starts) * 1000).astype("timedelta64[ms]")
+
+
+def read_image_times(manifest_path):
+    """
+    Returns the photo IDs and their dateTaken as a datetime64 array, NaT when only the date is
+    known.
+    """
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    ids = [image["ID"] for image in manifest]
+    times = np.array(
+        [
+            (
+                np.datetime64(image["dateTaken"].rstrip("Z"), "ms")
+                if "T" in image.get("dateTaken", "")
+                else np.datetime64("NaT")
+            )
+            for image in manifest
+        ],
+        dtype="datetime64[ms]",
+    )
+    return ids, times
+
+
+def geotag(tles_by_months, times):
+    """
+    Returns lat and lon arrays for the times, NaN where the time is NaT or not covered by the
+    ephemera.
+    """
+    lat = np.full(len(times), np.nan)
+    lon = np.full(len(times), np.nan)
+    known = ~np.isnat(times)
+    if not known.any():
+        return lat, lon
+    months = get_months(times[known].min(), times[known].max())
+    if months not in tles_by_months:
+        tles_by_months[months] = load_tles(EPHEMERA_S3, months)
+    tles = tles_by_months[months]
+    if not len(tles):
+        return lat, lon
+
+    track = ground_track(tles, times[known])
+    lat[known] = np.where(track["valid"], track["lat"], np.nan)
+    lon[known] = np.where(track["valid"], track["lon"], np.nan)
+    return lat, lon
+
+
+def to_coordinate_list(values):
+    return [
+        None if np.isnan(value) else round(float(value), COORDINATE_DECIMALS)
+        for value in values
+    ]
+
+
+def is_up_to_date(paths, date_str):
+    sidecars = {"transcript": "transcript_geo", "images": "images_geo"}
+    inputs = [paths[source] for source in sidecars if os.path.exists(paths[source])]
+    outputs = [
+        paths[sidecars[source]] for source in sidecars if os.path.exists(paths[source])
+    ]
+    if not all(os.path.exists(path) for path in outputs):
+        return False
+    if not inputs:
+        return True
+    # Times near the start or end of the date can use the neighbouring months' TLEs
+    for month_offset in (-1, 0, 1):
+        month = np.datetime64(date_str[:7]) + np.timedelta64(month_offset, "M")
+        month_path = os.path.join(EPHEMERA_S3, str(month)[:4], f"{month}.json")
+        if os.path.exists(month_path):
+            inputs.append(month_path)
+    return min(map(os.path.getmtime, outputs)) >= max(map(os.path.getmtime, inputs))
+
+
+def geotag_day(date_str, paths, tles_by_months):
+    """
+    Geotags one date and writes its sidecars. Returns the number of points.
+    """
+    utterance_times = np.array([], dtype="datetime64[ms]")
+    if os.path.exists(paths["transcript"]):
+        utterance_times = read_utterance_times(paths["transcript"])
+    image_ids, image_times = [], np.array([], dtype="datetime64[ms]")
+    if os.path.exists(paths["images"]):
+        image_ids, image_times = read_image_times(paths["images"])
+
+    # One propagation pass for the utterances and photos together
+    lat, lon = geotag(tles_by_months, np.concatenate([utterance_times, image_times]))
+
+    count = len(utterance_times)
+    if os.path.exists(paths["transcript"]):
+        # Touched when unchanged so the next run sees it as up to date
+        write_json_if_changed(
+            paths["transcript_geo"],
+            {
+                "lat": to_coordinate_list(lat[:count]),
+                "lon": to_coordinate_list(lon[:count]),
+            },
+            touch=True,
+        )
+    if os.path.exists(paths["images"]):
+        write_json_if_changed(
+            paths["images_geo"],
+            {
+                image_id: [image_lat, image_lon]
+                for image_id, image_lat, image_lon in zip(
+                    image_ids,
+                    to_coordinate_list(lat[count:]),
+                    to_coordinate_list(lon[count:]),
+                )
+                if image_lat is not None
+            },
+            touch=True,
+        )
+    return len(lat)
+
+
+def main():
+    with open(AVAILABLE_DATES_S3, "r") as f:
+        dates = sorted(item["date"] for item in json.load(f))
+
+    tles_by_months = {}
+    geotagged = 0
+    points = 0
+    slowest = (0.0, None)
+    start = time.perf_counter()
+    for date_str in dates:
+        paths = get_day_paths(date_str)
+        if is_up_to_date(paths, date_str):
+            continue
+        day_start = time.perf_counter()
+        points += geotag_day(date_str, paths, tles_by_months)
+        geotagged += 1
+        slowest = max(slowest, (time.perf_counter() - day_start, date_str))
+    print(
+        f"Geotagged {points:,} utterances and photos on {geotagged} of {len(dates)} dates "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    if slowest[1]:
+        print(f"Slowest date: {slowest[1]} in {slowest[0] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import numpy as np
+from dotenv import load_dotenv
+from orbit import (
+    get_months,
+    load_tles,
+    to_julian,
+    propagate,
+    sun_direction,
+    shadow_margin,
+    subsolar_point,
+)
+from output_files import write_json_if_changed
+
+# Load environment variables from .env file
+load_dotenv(dotenv_path="../../.env")
+
+# This script precomputes day and night for every available date, so the date page draws the
+# solar terminator and shows whether the ISS is in sunlight without any solar math per frame.
+# The subsolar point is computed every SUBSOLAR_STEP_SECONDS of the date; the terminator is the
+# great circle 90 degrees from it. The ISS's orbital sunrises and sunsets are found by sampling
+# its distance from the edge of the Earth's shadow every ISS_STEP_SECONDS and interpolating where
+# it changes sign (see orbit.py). One file per date:
+#   daylight/2023/11/daylight_2023-11-01.json
+#     {"subsolar": {"start": "2023-11-01T00:00:00Z", "step": seconds, "lat": [...], "lon": [...]},
+#      "iss": {"sunlitAtStart": bool, "events": [["2023-11-01T00:31:07Z", "sunset"], ...]}}
+# The subsolar samples run from 00:00 to 24:00 UTC inclusive. "iss" is null when the ephemera
+# do not cover the date.
+
+S3_FOLDER = os.getenv("S3_FOLDER")
+EPHEMERA_S3 = S3_FOLDER + "ephemera/"
+AVAILABLE_DATES_S3 = S3_FOLDER + "available_dates.json"
+DAYLIGHT_S3 = S3_FOLDER + "daylight/"
+
+# The subsolar point moves 1.25 degrees of longitude in 5 minutes
+SUBSOLAR_STEP_SECONDS = 300
+# 0.001 degrees is about 110 m on the ground
+SUBSOLAR_DECIMALS = 3
+# Sunrise and sunset take about 10 seconds at the ISS, so linear interpolation between
+# samples this far apart lands within a second
+ISS_STEP_SECONDS = 10
+
+
+def get_sample_times(date_str, step_seconds):
+    count = 86400 // step_seconds + 1
+    return np.datetime64(date_str, "s") + np.arange(count) * np.timedelta64(
+        step_seconds, "s"
+    )
+
+
+def format_time(t):
+    return str(t.astype("datetime64[s]")) + "Z"
+
+
+def subsolar_track(date_str):
+    times = get_sample_times(date_str, SUBSOLAR_STEP_SECONDS)
+    lat, lon = subsolar_point(*to_julian(times))
+    return {
+        "start": format_time(times[0]),
+        "step": SUBSOLAR_STEP_SECONDS,
+        "lat": np.round(lat, SUBSOLAR_DECIMALS).tolist(),
+        "lon": np.round(lon, SUBSOLAR_DECIMALS).tolist(),
+    }
+
+
+def iss_sunrises_and_sunsets(tles, date_str):
+    """
+    Returns {"sunlitAtStart", "events"} for the date, or None if SGP4 failed for any sample.
+    """
+    times = get_sample_times(date_str, ISS_STEP_SECONDS)
+    jd, fr = to_julian(times)
+    positions, valid = propagate(tles, jd, fr)
+    if not valid.all():
+        return None
+    margin = shadow_margin(positions, sun_direction(jd, fr))
+
+    sunlit = margin > 0
+    changes = np.flatnonzero(sunlit[1:] != sunlit[:-1])
+    # Where the margin crosses zero between each pair of samples
+    fractions = margin[changes] / (margin[changes] - margin[changes + 1])
+    offsets = np.round(fractions * ISS_STEP_SECONDS * 1000).astype("timedelta64[ms]")
+    event_times = times[changes] + offsets
+    return {
+        "sunlitAtStart": bool(sunlit[0]),
+        "events": [
+            [format_time(t), "sunrise" if sunlit[change + 1] else "sunset"]
+            for t, change in zip(event_times, changes)
+        ],
+    }
+
+
+def main():
+    with open(AVAILABLE_DATES_S3, "r") as f:
+        dates = sorted(item["date"] for item in json.load(f))
+
+    tles_by_months = {}
+    written = 0
+    without_iss = 0
+    events = 0
+    start = time.perf_counter()
+    for date_str in dates:
+        # The samples run to the next midnight, which can be in the next month
+        day = np.datetime64(date_str)
+        months = get_months(day, day + np.timedelta64(1, "D"))
+        if months not in tles_by_months:
+            tles_by_months[months] = load_tles(EPHEMERA_S3, months)
+        tles = tles_by_months[months]
+
+        iss = iss_sunrises_and_sunsets(tles, date_str) if len(tles) else None
+        if iss is None:
+            print(f"No ISS sunrises and sunsets for {date_str}")
+            without_iss += 1
+        else:
+            events += len(iss["events"])
+
+        year, month, day = date_str.split("-")
+        output_path = os.path.join(
+            DAYLIGHT_S3, year, month, f"daylight_{date_str}.json"
+        )
+        daylight = {"subsolar": subsolar_track(date_str), "iss": iss}
+        if write_json_if_changed(output_path, daylight):
+            written += 1
+    print(
+        f"Daylight: {len(dates)} dates, {written} rewritten, {without_iss} without ISS events, "
+        f"{events:,} sunrises and sunsets in {time.perf_counter() - start:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
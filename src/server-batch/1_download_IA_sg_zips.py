@@ -1,10 +1,19 @@
 import os
+import threading
+import zipfile
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from internetarchive import search_items, download
+from internetarchive import search_items, download, get_files
 from tqdm import tqdm  # Install via `pip install tqdm`
 
 # issAudioBasePath = r"O:/ISS/Internet_Archive/space_to_grounds/"
 issAudioBasePath = r"F:/ISSiRT_assets/_raw/InternetArchive_space_to_grounds/"
+
+# Verified zips are appended here as soon as they land so that
+# 2_process_transcribe_ia_zips.py --watch can start transcribing them while the
+# rest of the downloads are still running.
+IA_ZIPS_READY_TRACKING_FILE = "ia_zips_ready.txt"
+ready_file_lock = threading.Lock()
+
 search = search_items("creator:(john.l.stoll@nasa.gov)")
 
 # Filter identifiers for "Space-to" or "Space to" results
@@ -15,15 +24,16 @@ space_to_grounds = [
 ]
 
 
-# Define a function for downloading an item
+# Define a function for downloading an item. Returns the names of the item's zip files.
 def download_item(space_to_ground):
     try:
         destDir = os.path.join(issAudioBasePath)
         if not os.path.exists(destDir):
             os.makedirs(destDir, exist_ok=True)
+        zip_names = [f.name for f in get_files(space_to_ground, glob_pattern="*.zip")]
         # if this zip file already exists, skip it
         if os.path.exists(os.path.join(destDir, f"{space_to_ground}")):
-            return
+            return zip_names
         download(
             space_to_ground,
             destdir=destDir,
@@ -31,8 +41,33 @@ def download_item(space_to_ground):
             ignore_existing=True,
             glob_pattern="*.zip",
         )
+        return zip_names
     except Exception as e:
         print(f"Error downloading {space_to_ground}: {e}")
+        return []
+
+
+def enqueue_verified_zips(future):
+    """
+    Completion callback: add each fully downloaded zip to the ready queue for stage 2.
+    A zip is only considered complete once its central directory can be read.
+    """
+    if future.cancelled() or future.exception():
+        return
+    with ready_file_lock:
+        ready = set()
+        if os.path.exists(IA_ZIPS_READY_TRACKING_FILE):
+            with open(IA_ZIPS_READY_TRACKING_FILE, "r") as f:
+                ready = set(line.strip() for line in f)
+        with open(IA_ZIPS_READY_TRACKING_FILE, "a") as f:
+            for zip_name in future.result() or []:
+                zip_path = os.path.join(issAudioBasePath, zip_name)
+                if zip_name in ready or not os.path.exists(zip_path):
+                    continue
+                if not zipfile.is_zipfile(zip_path):
+                    print(f"Downloaded zip failed verification: {zip_name}")
+                    continue
+                f.write(f"{zip_name}\n")
 
 
 # Download in parallel with a progress bar
@@ -46,6 +81,8 @@ with ThreadPoolExecutor(
         futures = {
             executor.submit(download_item, item): item for item in space_to_grounds
         }
+        for future in futures:
+            future.add_done_callback(enqueue_verified_zips)
 
         for future in as_completed(futures):
             item = futures[future]
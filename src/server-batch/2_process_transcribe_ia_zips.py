@@ -1,3 +1,4 @@
+import argparse
 import json
 import os
 import shutil
@@ -48,6 +49,9 @@ TALKYBOT_API_URL = "http://talkybot-local.fit.nasa.gov:5000/"
 IA_ZIPS_PROCESSED_TRACKING_FILE = "ia_zips_processed.txt"
 IA_ZIPS_IN_PROGRESS_TRACKING_FILE = "ia_zips_in_progress.txt"  # New tracking file
 IA_SKIP_ZIPS_TRACKING_FILE = "ia_skip_zips.txt"  # New skip list tracking file
+# Verified zips queued by 1_download_IA_sg_zips.py as each download completes
+IA_ZIPS_READY_TRACKING_FILE = "ia_zips_ready.txt"
+WATCH_POLL_SECONDS = 30  # How often --watch mode checks the ready queue
 
 INPUT_IA_ZIPS_PATH = os.path.join(os.getenv("IA_ZIP_WAVS_WORKING_FOLDER"))
 CURRENT_IA_ZIP_WAVS_ROOT = Path("F:/tempF/iss_working/current_ia_zip_wavs")
@@ -105,6 +109,27 @@ def checkIfZipAlreadyProcessed(zipFileName):
     return zipFileName in processed_zips or zipFileName in in_progress_zips
 
 
+def is_complete_zip(zip_file):
+    # A zip that is still being downloaded has no readable central directory yet
+    return zipfile.is_zipfile(os.path.join(INPUT_IA_ZIPS_PATH, zip_file))
+
+
+def sort_zip_files_newest_first(zip_files):
+    # Create a date-sorted list of zip files. The date is the first 8 characters in mm-dd-yy format.
+    dated_zip_file_tuple = [None] * len(zip_files)
+    for i in range(len(zip_files)):
+        dateStr = zip_files[i][:8]
+        month = dateStr[:2]
+        day = dateStr[3:5]
+        year = dateStr[6:8]
+        date = f"20{year}-{month}-{day}"
+        dated_zip_file_tuple[i] = (date, zip_files[i])
+    # Sort newest to oldest
+    dated_zip_file_tuple.sort(reverse=True)
+
+    return [zip_file for date, zip_file in dated_zip_file_tuple]
+
+
 def ensure_mono_wav(input_wav_path):
     try:
         with wave.open(str(input_wav_path), "rb") as wf:
@@ -618,6 +643,68 @@ def process_zip_file(zip_file):
         remove_from_tracking_file(IA_ZIPS_IN_PROGRESS_TRACKING_FILE, zip_file)
 
 
+def process_zip_files(zip_files, skip_zips):
+    """
+    Processes the given zip files in order, skipping any that are on the skip list or have
+    already been processed. Returns False if the user asked to stop.
+    """
+    for zip_file in zip_files:
+        if immediate_exit_event.is_set():
+            logger.info("Immediate exit requested. Exiting main loop.")
+            return False
+        if exit_event.is_set() and not immediate_exit_event.is_set():
+            logger.info("Exit after current IA zip requested. Exiting main loop.")
+            return False
+        if zip_file in skip_zips:
+            logger.info(f"Skipping {zip_file} as it is in the skip list.")
+            continue
+        if checkIfZipAlreadyProcessed(zip_file):
+            logger.debug(
+                f"Skipping {zip_file} because it has already been processed or is in progress"
+            )
+            continue
+
+        process_zip_file(zip_file)
+
+        # Add the zip to the processed list before checking exit flags
+        add_to_tracking_file(IA_ZIPS_PROCESSED_TRACKING_FILE, zip_file)
+
+        if immediate_exit_event.is_set():
+            logger.info("Immediate exit requested after processing zip.")
+            return False
+        if exit_event.is_set():
+            logger.info("Exit after current IA zip after processing zip.")
+            return False
+    return True
+
+
+def watch_ready_queue():
+    """
+    Keeps consuming zips queued by the downloader until the user asks to stop. After each
+    zip the queue is re-read so that the newest arrivals are always transcribed first.
+    """
+    logger.info(f"Watching {IA_ZIPS_READY_TRACKING_FILE} for newly downloaded zips...")
+    while not exit_event.is_set() and not immediate_exit_event.is_set():
+        skip_zips = read_skip_list(IA_SKIP_ZIPS_TRACKING_FILE)
+        pending_zips = [
+            zip_file
+            for zip_file in read_tracking_file(IA_ZIPS_READY_TRACKING_FILE)
+            if zip_file not in skip_zips and not checkIfZipAlreadyProcessed(zip_file)
+        ]
+        if pending_zips:
+            zip_files = sort_zip_files_newest_first(pending_zips)
+            if not process_zip_files(zip_files[:1], skip_zips):
+                return
+            continue
+
+        # Nothing queued yet; wait for the downloader while staying responsive to keys
+        deadline = time.monotonic() + WATCH_POLL_SECONDS
+        while time.monotonic() < deadline:
+            if exit_event.is_set() or immediate_exit_event.is_set():
+                return
+            time.sleep(0.5)
+
+
 def check_for_exit():
     while True:
         if msvcrt.kbhit():
@@ -632,6 +719,16 @@ def check_for_exit():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Segment and transcribe downloaded Internet Archive space-to-ground zips."
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the existing zips, keep transcribing zips as 1_download_IA_sg_zips.py "
+        "queues them instead of exiting.",
+    )
+    args = parser.parse_args()
 
     # clear the console and reinstantiate the logger
     os.system("cls" if os.name == "nt" else "clear")
@@ -681,48 +778,14 @@ if __name__ == "__main__":
     zip_files = [
         f for f in os.listdir(INPUT_IA_ZIPS_PATH) if f.lower().endswith(".zip")
     ]
+    if args.watch:
+        # The downloader may still be writing some of these
+        zip_files = [f for f in zip_files if is_complete_zip(f)]
 
-    # Create a date-sorted list of zip files. The date is the first 8 characters in mm-dd-yy format.
-    dated_zip_file_tuple = [None] * len(zip_files)
-    for i in range(len(zip_files)):
-        dateStr = zip_files[i][:8]
-        month = dateStr[:2]
-        day = dateStr[3:5]
-        year = dateStr[6:8]
-        date = f"20{year}-{month}-{day}"
-        dated_zip_file_tuple[i] = (date, zip_files[i])
-    # Sort newest to oldest
-    dated_zip_file_tuple.sort(reverse=True)
-
-    zip_files = [zip_file for date, zip_file in dated_zip_file_tuple]
+    zip_files = sort_zip_files_newest_first(zip_files)
 
-    for zip_file in zip_files:
-        if immediate_exit_event.is_set():
-            logger.info("Immediate exit requested. Exiting main loop.")
-            break
-        if exit_event.is_set() and not immediate_exit_event.is_set():
-            logger.info("Exit after current IA zip requested. Exiting main loop.")
-            break
-        if zip_file in skip_zips:
-            logger.info(f"Skipping {zip_file} as it is in the skip list.")
-            continue
-        if checkIfZipAlreadyProcessed(zip_file):
-            logger.debug(
-                f"Skipping {zip_file} because it has already been processed or is in progress"
-            )
-            continue
-
-        process_zip_file(zip_file)
-
-        # Add the zip to the processed list before checking exit flags
-        add_to_tracking_file(IA_ZIPS_PROCESSED_TRACKING_FILE, zip_file)
-
-        if immediate_exit_event.is_set():
-            logger.info("Immediate exit requested after processing zip.")
-            break
-        if exit_event.is_set():
-            logger.info("Exit after current IA zip after processing zip.")
-            break
+    if process_zip_files(zip_files, skip_zips) and args.watch:
+        watch_ready_queue()
 
     if immediate_exit_event.is_set():
         print("Script exited immediately by user.")
@@ -2,9 +2,10 @@ import os
 import json
 import csv
 import shutil
-from datetime import datetime
-from zoneinfo import ZoneInfo
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dotenv import load_dotenv
+from comm_transcripts import load_day_utterances, utc_times_from_aac_filenames
+from comm_audio import build_day_audio, get_day_audio_index_filename
 
 # Load environment variables from .env file
 load_dotenv(dotenv_path="../../.env")
@@ -12,128 +13,271 @@ load_dotenv(dotenv_path="../../.env")
 # This script processes the JSON files in the 'tb_transcribed_aacs' directory that are produced by
 # the transcription batch processor. It extracts the relevant data and writes it to a pipe-delimited
 # CSV file in the 'comm' directory. It also copies the corresponding AAC files to the 'comm' directory.
+#
+# Days are rebuilt incrementally. For each day a manifest of the input JSON names, sizes and mtimes
+# is kept in COMM_MANIFESTS. A day is skipped when its inputs are unchanged, new JSONs are appended
+# to the existing CSV, and the whole day is only re-parsed when a JSON was changed or removed.
+#
+# Rows are sorted by UTC time. Next to each CSV an _index.json sidecar maps every UTC minute that
+# has utterances ("2023-11-01T14:05Z") to the byte offset of its first row, so clients can
+# range-request part of a day. The minutes carry the date because a day folder is a Chicago-local
+# date, which spans UTC midnight and, on the fall-back day, 25 hours.
+#
+# The day's AACs are also concatenated into one _audio_YYYY-MM-DD_SG_N.aac per SG channel, with an
+# _audio_YYYY-MM-DD_index.json mapping each row's filename to its offset (see comm_audio.py). The
+# individual AACs stay published for compatibility.
 
 
 COMM_TRANSCRIPTS_AACS = os.getenv("SG_RAW_FOLDER") + "comm_transcripts_aacs/"
+COMM_MANIFESTS = os.getenv("SG_RAW_FOLDER") + "comm_manifests/"
 COMM_S3 = os.getenv("S3_FOLDER") + "comm/"
 
+# Days are processed in parallel across processes; AAC copies within a day across threads
+MAX_DAY_WORKERS = os.cpu_count()
+AAC_COPY_THREADS = 8
 
-def is_invalid_utterance(text):
-    textStringsIndicateInvalidUtterance = [
-        "Thank you.",
-        "Bye.",
-        "...",
-        "Thanks for watching!",
-        "Thank you for watching.",
-        "Thank you for watching!",
-        "This video is a derivative work of the Touhou Project",
+FIELDNAMES = [
+    "utteranceTime",
+    "filename",
+    "start",
+    "end",
+    "language",
+    "text",
+    "textOriginalLang",
+]
+
+
+def scan_day_inputs(dir_path):
+    """
+    Returns {json filename: [size, mtime_ns]} for every transcript JSON in a day directory.
+    """
+    inputs = {}
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                stat = entry.stat()
+                inputs[entry.name] = [stat.st_size, stat.st_mtime_ns]
+    return inputs
+
+
+def get_manifest_path(date_str):
+    return os.path.join(COMM_MANIFESTS, f"{date_str}.json")
+
+
+def read_day_manifest(date_str):
+    manifest_path = get_manifest_path(date_str)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)["inputs"]
+
+
+def write_day_manifest(date_str, inputs):
+    os.makedirs(COMM_MANIFESTS, exist_ok=True)
+    with open(get_manifest_path(date_str), "w", encoding="utf-8") as f:
+        json.dump({"inputs": inputs}, f)
+
+
+def bootstrap_day_manifest(output_file, inputs):
+    """
+    Builds a manifest for a CSV written before manifests existed, from the filenames it contains.
+    JSONs that are not in the CSV (new, or dropped as invalid) are then treated as new inputs.
+    """
+    with open(output_file, "r", encoding="utf-8") as f:
+        included = set(
+            line.split("|")[1].replace(".aac", ".json") for line in f if "|" in line
+        )
+    return {name: stat for name, stat in inputs.items() if name in included}
+
+
+def publish_aacs(src_dir, dest_dir, aac_filenames):
+    """
+    Publishes the day's AAC files into the S3 staging tree. Both directories are listed once
+    instead of stat-ing every file. When they are on the same filesystem the AACs are hardlinked,
+    otherwise they are copied with a thread pool.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    available = set(os.listdir(src_dir))
+    with os.scandir(dest_dir) as entries:
+        existing = set(entry.name for entry in entries)
+    to_publish = [
+        aac_filename
+        for aac_filename in aac_filenames
+        if aac_filename in available and aac_filename not in existing
     ]
-    return text in textStringsIndicateInvalidUtterance
+    if not to_publish:
+        return 0
 
+    if os.stat(src_dir).st_dev == os.stat(dest_dir).st_dev:
+        try:
+            for aac_filename in to_publish:
+                os.link(
+                    os.path.join(src_dir, aac_filename),
+                    os.path.join(dest_dir, aac_filename),
+                )
+            return len(to_publish)
+        except OSError as e:
+            # e.g. a filesystem without hardlink support; copy whatever is left
+            print(f"Hardlinking AACs into {dest_dir} failed ({e}). Copying instead.")
+            to_publish = [
+                aac_filename
+                for aac_filename in to_publish
+                if not os.path.exists(os.path.join(dest_dir, aac_filename))
+            ]
 
-def create_daily_transcript(root_dir, date_str, output_dir):
-    # Split the date string into year, month, day
+    with ThreadPoolExecutor(max_workers=AAC_COPY_THREADS) as executor:
+        list(
+            executor.map(
+                lambda aac_filename: shutil.copy(
+                    os.path.join(src_dir, aac_filename), dest_dir
+                ),
+                to_publish,
+            )
+        )
+    return len(to_publish)
+
+
+def get_transcript_paths(output_dir, date_str):
     year, month, day = date_str.split("-")
-    dir_path = os.path.join(root_dir, year, month, day)
+    day_dir = os.path.join(output_dir, year, month, day)
+    return (
+        os.path.join(day_dir, f"_transcript_{date_str}.csv"),
+        os.path.join(day_dir, f"_transcript_{date_str}_index.json"),
+    )
 
-    print(f"Processing transcripts for {date_str}...")
 
-    # Initialize a list to collect data
-    data_list = []
-
-    # Loop over JSON files in the directory
-    for filename in os.listdir(dir_path):
-        if filename.endswith(".json"):
-            file_path = os.path.join(dir_path, filename)
-            with open(file_path, "r", encoding="utf-8") as f:
-                json_data = json.load(f)
-
-                # Extract and correct 'utteranceTime'
-                utteranceTime_str = json_data.get("utteranceTime", "")
-                # Remove 'Z' at the end
-                utteranceTime_str = utteranceTime_str.rstrip("Z")
-                # Parse datetime
-                local_dt = datetime.strptime(utteranceTime_str, "%Y-%m-%dT%H:%M:%S")
-                # Assign 'America/Chicago' timezone
-                local_dt = local_dt.replace(tzinfo=ZoneInfo("America/Chicago"))
-                # Convert to UTC
-                utc_dt = local_dt.astimezone(ZoneInfo("UTC"))
-                # Get ISO format string and extract time part
-                utteranceTime_utc = utc_dt.strftime("%H:%M:%S")
-
-                # Concatenate 'text' from all segments
-                segments = json_data.get("segments", [])
-                text = " ".join(
-                    segment.get("text", "").strip().replace("|", " ")
-                    for segment in segments
-                )
+def write_sorted_transcript(output_file, index_file, keyed_rows):
+    """
+    Writes (utc, row) pairs sorted by time, with "\n" line endings so byte offsets are the same
+    on every platform, then writes the UTC minute -> byte offset index for the CSV. Returns the
+    rows' filenames in time order.
+    """
+    keyed_rows.sort()
+    minutes = []
+    offset = 0
+    with open(output_file, "wb") as txtfile:
+        for utc_dt, row in keyed_rows:
+            minute = utc_dt.strftime("%Y-%m-%dT%H:%MZ")
+            if not minutes or minutes[-1][0] != minute:
+                minutes.append([minute, offset])
+            line = (row + "\n").encode("utf-8")
+            txtfile.write(line)
+            offset += len(line)
 
-                if is_invalid_utterance(text):
-                    continue
+    with open(index_file, "w", encoding="utf-8") as f:
+        json.dump({"size": offset, "minutes": minutes}, f, separators=(",", ":"))
 
-                start = segments[0].get("start", "") if segments else ""
-                end = segments[-1].get("end", "") if segments else ""
+    return [row.split("|")[1] for utc_dt, row in keyed_rows]
 
-                # Concatenate 'textOriginalLang' from all origLangSegments
-                origLangSegments = json_data.get("origLangSegments", [])
-                textOriginalLang = " ".join(
-                    segment.get("text", "").strip().replace("|", " ")
-                    for segment in origLangSegments
-                )
 
-                # Append to data list
-                data_list.append(
-                    {
-                        "utteranceTime": utteranceTime_utc,
-                        "filename": filename.replace(
-                            ".json", ".aac"
-                        ),  # Replace JSON extension with AAC
-                        "text": text,
-                        "textOriginalLang": textOriginalLang,
-                        "start": str(start),
-                        "end": str(end),
-                        "language": json_data.get("language", "en"),
-                    }
-                )
+def is_current_index(index_file):
+    """
+    False for a missing index, or one written before minutes were keyed by UTC date and time.
+    """
+    if not os.path.exists(index_file):
+        return False
+    with open(index_file, "r", encoding="utf-8") as f:
+        minutes = json.load(f)["minutes"]
+    return not minutes or "T" in minutes[0][0]
 
-                # Copy corresponding AAC file to output directory
-                aac_filename = json_data.get("filename", "")
-                if aac_filename:
-                    aac_file_path = os.path.join(dir_path, aac_filename)
-                    if os.path.exists(aac_file_path):
-                        dest_dir = os.path.join(output_dir, year, month, day)
-                        os.makedirs(dest_dir, exist_ok=True)
-                        if not os.path.exists(os.path.join(dest_dir, aac_filename)):
-                            shutil.copy(aac_file_path, dest_dir)
 
-    # Write the data to a pipe-delimited file
-    output_file = os.path.join(
-        output_dir, year, month, day, f"_transcript_{date_str}.csv"
+def create_daily_transcript(
+    root_dir, date_str, output_dir, json_filenames=None, append=False
+):
+    """
+    Writes the day's transcript CSV. When json_filenames is given only those JSONs are parsed,
+    and with append=True their rows are merged into the existing CSV instead of replacing it.
+    """
+    # Split the date string into year, month, day
+    year, month, day = date_str.split("-")
+    dir_path = os.path.join(root_dir, year, month, day)
+
+    print(f"Processing transcripts for {date_str}...")
+
+    if json_filenames is None:
+        json_filenames = os.listdir(dir_path)
+
+    utterances = load_day_utterances(dir_path, json_filenames)
+
+    # Copy corresponding AAC files to output directory
+    publish_aacs(
+        dir_path,
+        os.path.join(output_dir, year, month, day),
+        [utterance.aacFilename for utterance in utterances if utterance.aacFilename],
     )
+
+    # Write the data to a pipe-delimited file
+    output_file, index_file = get_transcript_paths(output_dir, date_str)
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
-    fieldnames = [
-        "utteranceTime",
-        "filename",
-        "start",
-        "end",
-        "language",
-        "text",
-        "textOriginalLang",
+    keyed_rows = [
+        (utterance.utc, "|".join(getattr(utterance, field) for field in FIELDNAMES))
+        for utterance in utterances
     ]
+    if append:
+        # Existing rows are kept as they are; their times come from the AAC filenames
+        with open(output_file, "r", encoding="utf-8") as txtfile:
+            existing_rows = [line.rstrip("\r\n") for line in txtfile if "|" in line]
+        existing_utc = utc_times_from_aac_filenames(
+            row.split("|")[1] for row in existing_rows
+        )
+        keyed_rows.extend(zip(existing_utc, existing_rows))
 
-    with open(output_file, "w", encoding="utf-8") as txtfile:
-        # txtfile.write('|'.join(fieldnames) + '\n')
-        for data in data_list:
-            row = [data[field] for field in fieldnames]
-            txtfile.write("|".join(row) + "\n")
+    sorted_filenames = write_sorted_transcript(output_file, index_file, keyed_rows)
+    build_day_audio(os.path.dirname(output_file), date_str, sorted_filenames)
 
-    print(f"Transcript for {date_str} has been created: {output_file}")
+    if append:
+        print(f"Merged {len(utterances)} new utterances into {output_file}")
+    else:
+        print(f"Transcript for {date_str} has been created: {output_file}")
     return date_str
 
 
+def update_daily_transcript(root_dir, date_str, output_dir):
+    """
+    Brings one day's CSV up to date with its input JSONs. Returns date_str if the CSV was
+    written, or None if the day was already up to date.
+    """
+    year, month, day = date_str.split("-")
+    inputs = scan_day_inputs(os.path.join(root_dir, year, month, day))
+    output_file, index_file = get_transcript_paths(output_dir, date_str)
+
+    manifest = None
+    if os.path.exists(output_file):
+        manifest = read_day_manifest(date_str)
+        if manifest is None:
+            manifest = bootstrap_day_manifest(output_file, inputs)
+
+    audio_index_file = os.path.join(
+        os.path.dirname(output_file), get_day_audio_index_filename(date_str)
+    )
+    if (
+        manifest == inputs
+        and is_current_index(index_file)
+        and os.path.exists(audio_index_file)
+    ):
+        print(f"Transcript for {date_str} is up to date. Skipping.")
+        return None
+
+    if manifest is not None and all(
+        inputs.get(name) == stat for name, stat in manifest.items()
+    ):
+        # Only new JSONs have arrived for this day (or the CSV predates the sidecar files)
+        new_filenames = [name for name in inputs if name not in manifest]
+        processed_date = create_daily_transcript(
+            root_dir, date_str, output_dir, json_filenames=new_filenames, append=True
+        )
+    else:
+        processed_date = create_daily_transcript(
+            root_dir, date_str, output_dir, json_filenames=list(inputs)
+        )
+
+    write_day_manifest(date_str, inputs)
+    return processed_date
+
+
 def process_all_transcripts(root_dir, output_dir):
-    processed_dates = []
+    date_strs = []
     for year in os.listdir(root_dir):
         year_path = os.path.join(root_dir, year)
         if os.path.isdir(year_path):
@@ -143,26 +287,16 @@ def process_all_transcripts(root_dir, output_dir):
                     for day in os.listdir(month_path):
                         day_path = os.path.join(month_path, day)
                         if os.path.isdir(day_path):
-                            date_str = f"{year}-{month}-{day}"
-                            # if transcriptions for the date already exist, skip
-                            if os.path.exists(
-                                os.path.join(
-                                    output_dir,
-                                    year,
-                                    month,
-                                    day,
-                                    f"_transcript_{date_str}.csv",
-                                )
-                            ):
-                                print(
-                                    f"Transcript for {date_str} already exists. Skipping."
-                                )
-                                continue
-                            print(f"Processing date: {date_str}")
-                            processed_date = create_daily_transcript(
-                                root_dir, date_str, output_dir
-                            )
-                            processed_dates.append(processed_date)
+                            date_strs.append(f"{year}-{month}-{day}")
+
+    with ProcessPoolExecutor(max_workers=MAX_DAY_WORKERS) as executor:
+        results = executor.map(
+            update_daily_transcript,
+            [root_dir] * len(date_strs),
+            date_strs,
+            [output_dir] * len(date_strs),
+        )
+        processed_dates = [date_str for date_str in results if date_str]
     return processed_dates
 
 
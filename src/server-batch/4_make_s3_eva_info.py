@@ -1,5 +1,7 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse
+from http_cache import cached_get
+from output_files import write_json_if_changed
+from wikitable import iter_rows, parse_wikitables
 import json
 from itertools import count
 import os
@@ -7,18 +9,29 @@ import datetime  # ...existing code...
 
 S3_FOLDER = os.getenv("S3_FOLDER")
 
+# Manual corrections, applied on top of the scraped rows on every run:
+#   {"<number>": {"field": value, ...}} to patch fields, or {"<number>": null} to drop an EVA
+EVA_OVERRIDES_FILE = os.getenv("EVA_OVERRIDES_FILE", "eva_overrides.json")
+
+parser = argparse.ArgumentParser(
+    description="Scrape ISS spacewalks from Wikipedia into eva_details.json."
+)
+parser.add_argument(
+    "--full",
+    action="store_true",
+    help="Rebuild from the scraped rows only instead of merging into the existing file",
+)
+args = parser.parse_args()
+
 # URL of the Wikipedia page
 url = "https://en.wikipedia.org/wiki/List_of_International_Space_Station_spacewalks"
 
 # Send a GET request to fetch the page content
-response = requests.get(url)
+response = cached_get(url)
 response.raise_for_status()  # Raise an exception for HTTP errors
 
-# Parse the page content with BeautifulSoup
-soup = BeautifulSoup(response.text, "html.parser")
-
-# Find all tables in the page
-tables = soup.find_all("table", {"class": "wikitable"})
+# Parse only the wikitables in the page
+tables = parse_wikitables(response.text)
 
 # List to hold all EVA details
 eva_details = []
@@ -26,12 +39,11 @@ eva_details = []
 # Iterate over each table to extract data
 for table in tables:
     # Iterate over each row in the table
-    for row in table.find_all("tr")[1:]:  # Skip the header row
-        cells = row.find_all(["td", "th"])
+    for cells in iter_rows(table):  # Skip the header row
 
         if len(cells) == 6:
             # Extract data with improved handling
-            number = cells[0].get_text(strip=True).replace(".", "")
+            number = cells.text(0).replace(".", "")
             mission = cells[1].find("a").get_text(strip=True)
             mission_eva_tag = cells[1].find("small")
             mission_eva_num = (
@@ -52,9 +64,9 @@ for table in tables:
                 for link in crew_links
                 if link.get_text(strip=True)
             ]
-            start_time_raw = cells[3].get_text(strip=True)
-            end_time_raw = cells[4].get_text(strip=True)
-            duration = cells[5].get_text(strip=True)
+            start_time_raw = cells.text(3)
+            end_time_raw = cells.text(4)
+            duration = cells.text(5)
 
             # Correctly map the data
             eva = {
@@ -70,7 +82,7 @@ for table in tables:
 
         if len(cells) == 7:
             # Extract data with improved handling
-            number = cells[0].get_text(strip=True).replace(".", "")
+            number = cells.text(0).replace(".", "")
             mission = cells[1].find("a").get_text(strip=True)
             mission_eva_tag = cells[1].find("small")
             mission_eva_num = (
@@ -100,9 +112,9 @@ for table in tables:
                 for link in groundIVcrew_links
                 if link.get_text(strip=True)
             ]
-            start_time_raw = cells[4].get_text(strip=True)
-            end_time_raw = cells[5].get_text(strip=True)
-            duration = cells[6].get_text(strip=True)
+            start_time_raw = cells.text(4)
+            end_time_raw = cells.text(5)
+            duration = cells.text(6)
 
             # Correctly map the data
             eva = {
@@ -123,19 +135,18 @@ for table in tables:
             if cell.get("bgcolor") == "#ccccff":
                 continue
 
-            # Extract the mission name with HTML and remove reference hyperlinks
-            description_html = cells[0].decode_contents()
-            soup_desc = BeautifulSoup(description_html, "html.parser")
+            # Extract the mission name with HTML and remove reference hyperlinks. The cell
+            # is edited in place rather than re-parsed, as it isn't used again.
 
             # Remove all <sup class="reference"> tags
-            for sup in soup_desc.find_all("sup", {"class": "reference"}):
+            for sup in cell.find_all("sup", {"class": "reference"}):
                 sup.decompose()
 
-            for a in soup_desc.find_all("a", href=True):
+            for a in cell.find_all("a", href=True):
                 if a["href"].startswith("/wiki/"):
                     a["href"] = f"https://en.wikipedia.org{a['href']}"
                     a["target"] = "_blank"
-            description = str(soup_desc)
+            description = cell.decode_contents()
 
             eva["description"] = description
 
@@ -183,10 +194,58 @@ eva_details = [
     and datetime.datetime.fromisoformat(eva["startTime"]) >= cutoff_date
 ]
 
-# Convert the list to a JSON object
-eva_json = json.dumps(eva_details, indent=4)
-
-# Write the JSON object to a file in S3_FOLDER
 output_path = os.path.join(S3_FOLDER, "eva_details.json")
-with open(output_path, "w") as f:
-    f.write(eva_json)
+
+overrides = {}
+if os.path.exists(EVA_OVERRIDES_FILE):
+    with open(EVA_OVERRIDES_FILE, "r", encoding="utf-8") as f:
+        overrides = json.load(f)
+
+# Merge the scraped rows into the existing EVAs by number, so EVAs that drop off the page
+# or fail to parse are kept
+existing_evas = {}
+if os.path.exists(output_path) and not args.full:
+    with open(output_path, "r", encoding="utf-8") as f:
+        existing_evas = {eva["number"]: eva for eva in json.load(f)}
+
+merged_evas = dict(existing_evas)
+new_count = changed_count = 0
+for eva in eva_details:
+    if eva["number"] in overrides and overrides[eva["number"]] is None:
+        continue
+    # The existing file has the overrides applied. Patch both sides before comparing, so only
+    # changes on the page count, not the overrides or edits to them.
+    patch = overrides.get(eva["number"]) or {}
+    eva = {**eva, **patch}
+    previous = existing_evas.get(eva["number"])
+    if previous is None:
+        new_count += 1
+    elif {**previous, **patch} != eva:
+        changed_count += 1
+    merged_evas[eva["number"]] = eva
+
+# Apply the manual overrides to the kept EVAs too, so they survive re-scrapes
+for number, patch in overrides.items():
+    if patch is None:
+        merged_evas.pop(number, None)
+    elif number in merged_evas:
+        merged_evas[number] = {**merged_evas[number], **patch}
+    else:
+        print(f"Override for EVA {number} doesn't match any EVA, skipping")
+
+eva_details = sorted(
+    merged_evas.values(),
+    key=lambda eva: (
+        int(eva["number"]) if eva["number"].isdigit() else float("inf"),
+        eva["number"],
+    ),
+)
+
+# Only write when the content changed, so downstream stages and caches see the same file
+if not write_json_if_changed(output_path, eva_details):
+    print(f"eva_details.json is unchanged ({len(eva_details)} EVAs)")
+else:
+    print(
+        f"Wrote {len(eva_details)} EVAs to eva_details.json "
+        f"({new_count} new, {changed_count} changed)"
+    )
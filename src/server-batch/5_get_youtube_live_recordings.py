@@ -1,11 +1,27 @@
-import requests
 import os
+import json
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from http_client import client
+from youtube_title_rules import compile_title_filter, load_rules
 
 API_KEY = os.getenv("YOUTUBE_API_KEY")
 CHANNEL_ID = "UCLA_DiR1FfKNvjuUpBHmylQ"  # NASA's official YouTube Channel ID
-YOUTUBE_API_URL = "https://www.googleapis.com/youtube/v3"
+# Point at a local mock_youtube_api.py to test without using quota
+YOUTUBE_API_URL = os.getenv("YOUTUBE_API_URL", "https://www.googleapis.com/youtube/v3")
 S3_FOLDER = os.getenv("S3_FOLDER")
 
+# The publishedAfter watermark of the last complete search and the quota units used per day
+YOUTUBE_STATE_FILE = "youtube_state.json"
+# Searches start this long before the watermark. A broadcast that was still live during a run
+# only shows up as completed later, possibly after later videos moved the watermark past it.
+WATERMARK_LOOKBACK = timedelta(days=2)
+# Data API quota costs, which reset at midnight Pacific time
+SEARCH_QUOTA_UNITS = 100
+VIDEOS_QUOTA_UNITS = 1
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+VIDEOS_BATCH_SIZE = 50
+
 
 def seconds_from_duration_str(duration):
     """
@@ -29,9 +45,32 @@ def seconds_from_duration_str(duration):
     return total_seconds
 
 
-def get_live_videos(channel_id, api_key):
+def read_state():
+    if os.path.exists(YOUTUBE_STATE_FILE):
+        with open(YOUTUBE_STATE_FILE, "r") as f:
+            return json.load(f)
+    return {"publishedAfter": None, "quotaUsed": {}}
+
+
+def write_state(state):
+    with open(YOUTUBE_STATE_FILE, "w") as f:
+        json.dump(state, f, indent=4)
+
+
+def get_search_start(watermark):
+    start = datetime.fromisoformat(watermark) - WATERMARK_LOOKBACK
+    return start.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def add_quota(state, units):
+    quota_day = datetime.now(QUOTA_TZ).strftime("%Y-%m-%d")
+    state["quotaUsed"][quota_day] = state["quotaUsed"].get(quota_day, 0) + units
+
+
+def get_live_videos(channel_id, api_key, state, published_after=None):
     """
-    Fetch all recorded live broadcast videos from a YouTube channel.
+    Fetch recorded live broadcast videos from a YouTube channel, only those published after the
+    watermark if given. Returns (videos, complete), complete being False if a page failed.
     """
     videos = []
     next_page_token = None
@@ -46,15 +85,17 @@ def get_live_videos(channel_id, api_key):
             "type": "video",
             "maxResults": 50,
             "pageToken": next_page_token,
+            "publishedAfter": published_after,
             "key": api_key,
         }
 
-        response = requests.get(search_url, params=params)
+        response = client.get(search_url, params=params)
+        add_quota(state, SEARCH_QUOTA_UNITS)
         response_data = response.json()
 
         if "items" not in response_data:
             print("Error fetching live video data:", response_data)
-            break
+            return videos, False
 
         for item in response_data["items"]:
             video = {
@@ -69,78 +110,128 @@ def get_live_videos(channel_id, api_key):
         if not next_page_token:
             break
 
-    return videos
+    return videos, True
+
+
+def update_video_durations(videos, state):
+    """
+    Sets each video's duration in seconds from the videos endpoint, 50 IDs per request. Videos
+    missing from the response are left as "Live" and retried on the next run.
+    """
+    batches = [
+        videos[i : i + VIDEOS_BATCH_SIZE]
+        for i in range(0, len(videos), VIDEOS_BATCH_SIZE)
+    ]
+
+    def fetch_batch(batch):
+        params = {
+            "part": "contentDetails",
+            "id": ",".join(video["videoId"] for video in batch),
+            "maxResults": VIDEOS_BATCH_SIZE,
+            "key": API_KEY,
+        }
+        response = client.get(f"{YOUTUBE_API_URL}/videos", params=params)
+        response_data = response.json()
+        if "items" not in response_data:
+            print("Error fetching video data:", response_data)
+            return {}
+        return {
+            item["id"]: seconds_from_duration_str(item["contentDetails"]["duration"])
+            for item in response_data["items"]
+        }
+
+    durations = {}
+    for batch_durations in client.map(fetch_batch, batches):
+        durations.update(batch_durations)
+    add_quota(state, VIDEOS_QUOTA_UNITS * len(batches))
+
+    for video in videos:
+        if video["videoId"] in durations:
+            video["duration"] = durations[video["videoId"]]
+
+
+def read_recordings(csv_path):
+    recordings = {}
+    if os.path.exists(csv_path):
+        with open(csv_path, "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.rstrip("\n").split("|", 3)
+                if len(fields) != 4:
+                    continue
+                publishedAt, videoId, duration, title = fields
+                recordings[videoId] = {
+                    "publishedAt": publishedAt,
+                    "videoId": videoId,
+                    "duration": int(duration) if duration.isdigit() else duration,
+                    "title": title,
+                }
+    return recordings
 
 
 def main():
-    print("Fetching videos from NASA channel...")
+    csv_path = f"{S3_FOLDER}/youtube_live_recordings.csv"
+    state = read_state()
+    recordings = read_recordings(csv_path)
+
+    # Only search for videos published since the last complete run, less the lookback, unless
+    # the CSV is missing. Videos found again are merged by videoId.
+    published_after = state["publishedAfter"] if recordings else None
+    search_start = get_search_start(published_after) if published_after else None
+    print(
+        f"Fetching videos from NASA channel published after {search_start}..."
+        if search_start
+        else "Fetching videos from NASA channel..."
+    )
 
     # perform a search for all video are recorded live streams.
     # these are most likey to be timeable in context
-    live_videos = get_live_videos(CHANNEL_ID, API_KEY)
+    live_videos, complete = get_live_videos(CHANNEL_ID, API_KEY, state, search_start)
 
     # sort the videos by publishedAt
     live_videos = sorted(live_videos, key=lambda x: x["publishedAt"])
 
-    # filter out videos that are returned by this function that aren't relevant (bunch of string matches)
-    filtered_videos = []
-    for video in live_videos:
-        title_lower = video["title"].lower()
-        if (
-            (
-                "station" in title_lower
-                or "spacewalk" in title_lower
-                or "iss" in title_lower
-            )
-            and "google+" not in title_lower
-            and "preview" not in title_lower
-            and "update" not in title_lower
-            and "overview" not in title_lower
-            and "artemis" not in title_lower
-            and "meet the astronauts" not in title_lower
-            and "arrival at kennedy" not in title_lower
-            and "discuss" not in title_lower
-            and "ingenuity" not in title_lower
-            and "perseverance" not in title_lower
-            and "insight" not in title_lower
-            and "anniversary panel" not in title_lower
-            and "dart" not in title_lower
-            and "james webb" not in title_lower
-            and "weather satellite" not in title_lower
-            and "swot" not in title_lower
-            and "25 years" not in title_lower
-            and "atmosphere and oceans" not in title_lower
-            and "satellite-u" not in title_lower
-            and "science &amp; spacewalks" not in title_lower
-        ):
-            filtered_videos.append(video)
+    # filter out videos that aren't relevant using the include/exclude rules in
+    # youtube_title_rules.json
+    title_filter = compile_title_filter(load_rules())
+    filtered_videos = [video for video in live_videos if title_filter(video["title"])]
 
-    # get the duration of each video from the youtube api and update the duration field
+    # Merge into the existing recordings, also retrying any whose duration is still unknown
+    new_videos = [
+        video for video in filtered_videos if video["videoId"] not in recordings
+    ]
     for video in filtered_videos:
-        video_details_url = f"{YOUTUBE_API_URL}/videos"
-        params = {
-            "part": "contentDetails",
-            "id": video["videoId"],
-            "key": API_KEY,
-        }
-
-        response = requests.get(video_details_url, params=params)
-        response_data = response.json()
-
-        if "items" not in response_data:
-            print("Error fetching video data:", response_data)
-            break
+        known = recordings.get(video["videoId"])
+        if known and isinstance(known["duration"], int):
+            # found again within the lookback; its duration is already known
+            video["duration"] = known["duration"]
+        recordings[video["videoId"]] = video
+    pending = [
+        video for video in recordings.values() if not isinstance(video["duration"], int)
+    ]
 
-        video["duration"] = seconds_from_duration_str(
-            response_data["items"][0]["contentDetails"]["duration"]
-        )
+    # get the duration of each video from the youtube api and update the duration field
+    update_video_durations(pending, state)
 
-    with open(f"{S3_FOLDER}/youtube_live_recordings.csv", "w", encoding="utf-8") as f:
-        for video in filtered_videos:
+    with open(csv_path, "w", encoding="utf-8") as f:
+        for video in sorted(recordings.values(), key=lambda x: x["publishedAt"]):
             f.write(
                 f"{video['publishedAt']}|{video['videoId']}|{video['duration']}|{video['title']}\n"
             )
 
+    # Only advance the watermark when every search page was read
+    if complete and live_videos:
+        state["publishedAfter"] = max(
+            [video["publishedAt"] for video in live_videos]
+            + ([published_after] if published_after else [])
+        )
+    write_state(state)
+
+    quota_day = datetime.now(QUOTA_TZ).strftime("%Y-%m-%d")
+    print(
+        f"{len(new_videos)} new videos, {len(recordings)} in total. "
+        f"Quota used today: {state['quotaUsed'].get(quota_day, 0)} units"
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,9 @@
 import datetime
 import re
 from typing import Any, Dict, List
-import requests
-from bs4 import BeautifulSoup
+from http_cache import cached_get
+from output_files import write_if_changed
+from wikitable import iter_rows, parse_wikitables
 import json
 import os
 
@@ -13,14 +14,11 @@ S3_FOLDER = os.getenv("S3_FOLDER")
 url = "https://en.wikipedia.org/wiki/List_of_International_Space_Station_expeditions"
 
 # Send a GET request to fetch the raw HTML content
-response = requests.get(url)
+response = cached_get(url)
 html_content = response.content
 
-# Parse the HTML content using BeautifulSoup
-soup = BeautifulSoup(html_content, "html.parser")
-
-# Find all tables with the class 'wikitable' (which contain the expeditions data)
-tables = soup.find_all("table", {"class": "wikitable"})
+# Parse only the tables with the class 'wikitable' (which contain the expeditions data)
+tables = parse_wikitables(html_content)
 
 # Remove the last table as it contains cancelled expeditions
 tables = tables[:-1]
@@ -29,15 +27,8 @@ expeditions = []
 
 # Iterate over each table found
 for table in tables:
-    # Get all rows in the table
-    rows = table.find_all("tr")
-    # Skip the header row
-    rows = rows[1:]
-
-    # Process each row
-    for row in rows:
-        # Get all cells in the row
-        cells = row.find_all(["td", "th"])
+    # Process each row, skipping the header row. Cell text is cached per row.
+    for cells in iter_rows(table):
 
         # Skip empty rows
         if not cells:
@@ -53,7 +44,7 @@ for table in tables:
 
         # set indexes of different cells depending on row type
         # if cell 0 contains a number, then it's a main expedition row
-        if cells[0].get_text(strip=True).isnumeric():
+        if cells.text(0).isnumeric():
             # Exp 71 is only 2 cells for some reason so we need to handle it separately
             if len(cells) == 2:
                 expedition_index = 0
@@ -65,8 +56,8 @@ for table in tables:
                 departureFlight_index = None
                 duration_index = None
             # if both incoming and outgoing are a transfer
-            elif "transferred" in cells[3].get_text(strip=True).lower() and (
-                "transferred" in cells[4].get_text(strip=True).lower()
+            elif "transferred" in cells.text(3).lower() and (
+                "transferred" in cells.text(4).lower()
             ):
                 expedition_index = 0
                 expedition_patch_img = 1
@@ -77,7 +68,7 @@ for table in tables:
                 departureFlight_index = None
                 duration_index = None
             # incoming crew assignment is a transfer
-            elif "transferred" in cells[3].get_text(strip=True).lower():
+            elif "transferred" in cells.text(3).lower():
                 # if so, the row has 7 cells
                 expedition_index = 0
                 expedition_patch_img = 1
@@ -88,7 +79,7 @@ for table in tables:
                 departureFlight_index = 5
                 duration_index = 6
             # outgoing crew assignment is a transfer
-            elif "transferred" in cells[5].get_text(strip=True).lower():
+            elif "transferred" in cells.text(5).lower():
                 expedition_index = 0
                 expedition_patch_img = 1
                 crew_index = 2
@@ -130,7 +121,7 @@ for table in tables:
                 departureFlight_index = None
                 duration_index = None
             # incoming crew assignment is a transfer
-            elif "transferred" in cells[1].get_text(strip=True).lower():
+            elif "transferred" in cells.text(1).lower():
                 expedition_index = None
                 expedition_patch_img = None
                 crew_index = 0
@@ -140,7 +131,7 @@ for table in tables:
                 departureFlight_index = 3
                 duration_index = 4
             # outgoing crew assignment is a transfer
-            elif "transferred" in cells[3].get_text(strip=True).lower():
+            elif "transferred" in cells.text(3).lower():
                 expedition_index = None
                 expedition_patch_img = None
                 crew_index = 0
@@ -172,7 +163,7 @@ for table in tables:
 
         # Extract data from the cells based on the indexes
         if expedition_index is not None:
-            expedition_number = cells[expedition_index].get_text(strip=True)
+            expedition_number = cells.text(expedition_index)
         if expedition_patch_img is not None:
             img_tag = cells[expedition_patch_img].find("img")
             mission_patch_url = img_tag.get("src")
@@ -187,9 +178,7 @@ for table in tables:
             crew_members.append({"name": name, "nationality": nationality})
         if arrival_index is not None:
             # Remove references using regex
-            cleaned_text = re.sub(
-                r"\[\d+(?:\]\[\d+)*\]", "", cells[arrival_index].get_text(strip=True)
-            )
+            cleaned_text = re.sub(r"\[\d+(?:\]\[\d+)*\]", "", cells.text(arrival_index))
             # remove seconds from times (if any)
             cleaned_text = re.sub(r"(\d{2}:\d{2}):\d{2}", r"\1", cleaned_text)
             if "planned" not in cleaned_text.lower():
@@ -200,12 +189,12 @@ for table in tables:
                     + "Z"
                 )
         if arrivalFlight_index is not None:
-            arrivalFlight = cells[arrivalFlight_index].get_text(strip=True)
+            arrivalFlight = cells.text(arrivalFlight_index)
 
         if departure_index is not None:
             # Remove references using regex
             cleaned_text = re.sub(
-                r"\[\d+(?:\]\[\d+)*\]", "", cells[departure_index].get_text(strip=True)
+                r"\[\d+(?:\]\[\d+)*\]", "", cells.text(departure_index)
             )
             # remove seconds from times (if any)
             cleaned_text = re.sub(r"(\d{2}:\d{2}):\d{2}", r"\1", cleaned_text)
@@ -219,10 +208,10 @@ for table in tables:
                     + "Z"
                 )
         if departureFlight_index is not None:
-            departureFlight = cells[departureFlight_index].get_text(strip=True)
+            departureFlight = cells.text(departureFlight_index)
 
         if duration_index is not None:
-            durationDays = cells[duration_index].get_text(strip=True)
+            durationDays = cells.text(duration_index)
 
         # Create a dictionary for the expedition data
         expedition_data = {
@@ -283,9 +272,11 @@ for item in expeditions:
 onboard_crew: List[Dict[str, Any]] = list(crew_tracker.values())
 
 
-# Write the data to a JSON file
-with open(f"{S3_FOLDER}iss_crew_arr_dep_temp.json", "w", encoding="utf-8") as jsonfile:
-    json.dump(onboard_crew, jsonfile, ensure_ascii=False, indent=4)
+# Write the data to a JSON file, indented since it is reviewed by hand before it is promoted
+write_if_changed(
+    f"{S3_FOLDER}iss_crew_arr_dep_temp.json",
+    json.dumps(onboard_crew, ensure_ascii=False, indent=2),
+)
 
 print(
     "Expedition data has been successfully extracted to json. Requires manual review to fix some of the time values."
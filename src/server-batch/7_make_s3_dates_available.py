@@ -1,63 +1,356 @@
 import os
 import json
+import hashlib
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
+from comm_audio import (
+    get_day_audio_index_filename,
+    read_day_durations,
+    utterance_duration,
+)
+from ephemera import read_ephemera_month
+from output_files import to_compact_json, write_if_changed, write_json_if_changed
 
 # Load environment variables from .env file
 load_dotenv(dotenv_path="../../.env")
 
+# This script builds the dataset catalog: for every date with a 'comm' folder, how many
+# utterances, seconds of audio, images, YouTube recordings, EVAs and TLEs it has, plus content
+# hashes of its transcript and image manifest. The S3 tree is listed in one os.scandir pass and
+# joined by date with dicts and sets. Transcripts, image manifests and ephemera months are only
+# re-read when their size or mtime changed since the last run (CATALOG_CACHE). Output:
+#   catalog/summary.json   {"firstDate", "lastDate", "totals", "years": {year: totals + hash}}
+#   catalog/2023.json      {"2023-11-01": {"utterances", "audioSeconds", "images", "videos",
+#                                          "evas", "tles", "hashes": {...}}, ...}
+#   available_dates.json   [{"date", "youtube", "eva"}, ...] as before
+# Year files are only rewritten when their content changes; the summary carries their hashes.
+
 S3_FOLDER = os.getenv("S3_FOLDER")
 COMM_S3 = S3_FOLDER + "comm/"
+IMAGES_S3 = S3_FOLDER + "images/"
+EPHEMERA_S3 = S3_FOLDER + "ephemera/"
+CATALOG_S3 = S3_FOLDER + "catalog/"
+CATALOG_CACHE = "catalog_cache.json"
+# Per-month index of the YouTube recordings overlapping each UTC date:
+#   youtube/2023/2023-11.json  {"2023-11-01": [{"startTime", "videoId", "duration", "title",
+#                                               "dayOffset", "videoOffset", "length"}, ...]}
+# dayOffset is the seconds after midnight where the overlap starts, videoOffset how far into
+# the video that is and length the seconds of overlap, so broadcasts that run past midnight are
+# listed on both dates.
+YOUTUBE_INDEX_S3 = S3_FOLDER + "youtube/"
+CATALOG_COUNTS = ["utterances", "audioSeconds", "images", "videos", "evas", "tles"]
+
+
+def scan_tree(root_dir, depth, wanted):
+    """
+    Lists the files depth directories below root_dir with os.scandir. Only the files for which
+    wanted(dir names, filename) is true are stat'ed, so the per-utterance audio next to the
+    transcripts costs no system calls. Returns {(dir names...): {filename: [size, mtime_ns]}}.
+    """
+    found = {}
+
+    def walk(path, names):
+        try:
+            entries = list(os.scandir(path))
+        except FileNotFoundError:
+            return
+        if len(names) == depth:
+            files = {}
+            for entry in entries:
+                if wanted(names, entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    files[entry.name] = [stat.st_size, stat.st_mtime_ns]
+            found[names] = files
+            return
+        for entry in entries:
+            if entry.is_dir():
+                walk(entry.path, names + (entry.name,))
+
+    walk(root_dir, ())
+    return found
+
+
+def is_comm_source(names, filename):
+    date_str = "-".join(names)
+    return filename in (
+        f"_transcript_{date_str}.csv",
+        get_day_audio_index_filename(date_str),
+    )
+
+
+def hash_bytes(content):
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def read_transcript_counts(day_dir, date_str):
+    """
+    Returns utterances, audio seconds and the content hash of a day's transcript. Audio
+    seconds are counted per row as in comm_audio.utterance_duration.
+    """
+    with open(os.path.join(day_dir, f"_transcript_{date_str}.csv"), "rb") as f:
+        content = f.read()
+    rows = [
+        fields
+        for fields in (line.split("|") for line in content.decode("utf-8").splitlines())
+        if len(fields) == 7
+    ]
+
+    durations = read_day_durations(day_dir, date_str)
+    audio_seconds = sum(
+        utterance_duration(durations, fields[1], fields[3]) or 0.0 for fields in rows
+    )
+
+    return {
+        "utterances": len(rows),
+        "audioSeconds": round(audio_seconds, 1),
+        "hash": hash_bytes(content),
+    }
+
+
+def read_image_counts(manifest_path):
+    with open(manifest_path, "rb") as f:
+        content = f.read()
+    return {"images": len(json.loads(content)), "hash": hash_bytes(content)}
+
+
+def read_tle_counts(month_path):
+    """
+    Returns {date: number of TLEs with an epoch on that date} for an ephemera month.
+    """
+    counts = defaultdict(int)
+    for epoch in read_ephemera_month(month_path)["epoch"]:
+        counts[epoch[:10]] += 1
+    return counts
+
+
+def cached(cache, section, key, stat, read):
+    """
+    Returns the cached value for key if its source stat is unchanged, else re-reads it.
+    """
+    entry = cache[section].get(key)
+    if entry is None or entry["stat"] != stat:
+        entry = {"stat": stat, "value": read()}
+        cache[section][key] = entry
+    return entry["value"]
+
+
+def read_youtube_recordings(csv_path):
+    recordings = []
+    with open(csv_path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("|", 3)
+            if len(fields) == 4:
+                publishedAt, videoId, duration, title = fields
+                recordings.append(
+                    {
+                        "startTime": publishedAt,
+                        "videoId": videoId,
+                        # Recordings whose duration is unknown only cover their start
+                        "duration": int(duration) if duration.isdigit() else 0,
+                        "title": title,
+                    }
+                )
+    return recordings
 
 
-def collect_available_dates(comm_dir):
-    available_dates = []
-    for year in os.listdir(comm_dir):
-        year_path = os.path.join(comm_dir, year)
-        if os.path.isdir(year_path):
-            for month in os.listdir(year_path):
-                month_path = os.path.join(year_path, month)
-                if os.path.isdir(month_path):
-                    for day in os.listdir(month_path):
-                        day_path = os.path.join(month_path, day)
-                        if os.path.isdir(day_path):
-                            date_str = f"{year}-{month}-{day}"
-                            available_dates.append(date_str)
-    return available_dates
+def build_youtube_date_index(recordings):
+    """
+    Returns {date: [recording with the overlap's dayOffset, videoOffset and length]}.
+    """
+    index = defaultdict(list)
+    for recording in recordings:
+        start = datetime.strptime(recording["startTime"], "%Y-%m-%dT%H:%M:%SZ").replace(
+            tzinfo=timezone.utc
+        )
+        end = start + timedelta(seconds=recording["duration"])
+        day_start = start.replace(hour=0, minute=0, second=0)
+        while True:
+            day_end = day_start + timedelta(days=1)
+            overlap_start = max(start, day_start)
+            overlap_end = min(end, day_end)
+            index[day_start.strftime("%Y-%m-%d")].append(
+                {
+                    **recording,
+                    "dayOffset": int((overlap_start - day_start).total_seconds()),
+                    "videoOffset": int((overlap_start - start).total_seconds()),
+                    "length": int((overlap_end - overlap_start).total_seconds()),
+                }
+            )
+            if end <= day_end:
+                break
+            day_start = day_end
 
+    for entries in index.values():
+        entries.sort(key=lambda entry: entry["dayOffset"])
+    return index
 
-# for each available date, make an object with the date and the media available
+
+def write_youtube_date_index(index, output_dir):
+    """
+    Writes one file per month, skipping months whose content hasn't changed.
+    """
+    months = defaultdict(dict)
+    for date_str in sorted(index):
+        months[date_str[:7]][date_str] = index[date_str]
+
+    written = 0
+    for month_str, month_index in months.items():
+        output_path = os.path.join(output_dir, month_str[:4], f"{month_str}.json")
+        if write_json_if_changed(output_path, month_index):
+            written += 1
+    print(f"YouTube date index: {len(months)} months, {written} rewritten")
+
+
+def build_catalog(cache, youtube_index, eva_counts):
+    """
+    Returns {date: catalog entry} for every date with a comm folder.
+    """
+    comm_files = scan_tree(COMM_S3, 3, is_comm_source)
+    image_files = scan_tree(
+        IMAGES_S3, 2, lambda names, filename: filename.startswith("images-manifest_")
+    )
+    ephemera_files = scan_tree(
+        EPHEMERA_S3, 1, lambda names, filename: filename.endswith(".json")
+    )
+
+    tle_counts = {}
+    for (year,), files in ephemera_files.items():
+        for filename, stat in files.items():
+            if filename.endswith(".json"):
+                month_path = os.path.join(EPHEMERA_S3, year, filename)
+                month_counts = cached(
+                    cache,
+                    "ephemera",
+                    filename,
+                    stat,
+                    lambda: read_tle_counts(month_path),
+                )
+                # Month files are padded with a day either side, so take the fuller count
+                for date_str, count in month_counts.items():
+                    tle_counts[date_str] = max(tle_counts.get(date_str, 0), count)
+
+    catalog = {}
+    seen = {"transcripts": set(), "images": set(), "ephemera": set()}
+    for (year, month, day), files in sorted(comm_files.items()):
+        date_str = f"{year}-{month}-{day}"
+        day_dir = os.path.join(COMM_S3, year, month, day)
+        entry = {key: 0 for key in CATALOG_COUNTS}
+        entry["hashes"] = {}
+
+        transcript_stat = files.get(f"_transcript_{date_str}.csv")
+        if transcript_stat is not None:
+            audio_index_stat = files.get(get_day_audio_index_filename(date_str))
+            transcript = cached(
+                cache,
+                "transcripts",
+                date_str,
+                [transcript_stat, audio_index_stat],
+                lambda: read_transcript_counts(day_dir, date_str),
+            )
+            seen["transcripts"].add(date_str)
+            entry["utterances"] = transcript["utterances"]
+            entry["audioSeconds"] = transcript["audioSeconds"]
+            entry["hashes"]["transcript"] = transcript["hash"]
+
+        manifest_name = f"images-manifest_{date_str}.json"
+        manifest_stat = image_files.get((year, month), {}).get(manifest_name)
+        if manifest_stat is not None:
+            manifest_path = os.path.join(IMAGES_S3, year, month, manifest_name)
+            images = cached(
+                cache,
+                "images",
+                date_str,
+                manifest_stat,
+                lambda: read_image_counts(manifest_path),
+            )
+            seen["images"].add(date_str)
+            entry["images"] = images["images"]
+            entry["hashes"]["images"] = images["hash"]
+
+        entry["videos"] = len(youtube_index.get(date_str, []))
+        entry["evas"] = eva_counts.get(date_str, 0)
+        entry["tles"] = tle_counts.get(date_str, 0)
+        catalog[date_str] = entry
+
+    # Forget sources that no longer exist
+    seen["ephemera"] = set(
+        filename for files in ephemera_files.values() for filename in files
+    )
+    for section, keys in seen.items():
+        cache[section] = {k: v for k, v in cache[section].items() if k in keys}
+    return catalog
+
+
+def write_catalog(catalog):
+    years = defaultdict(dict)
+    for date_str, entry in catalog.items():
+        years[date_str[:4]][date_str] = entry
+
+    summary_years = {}
+    written = 0
+    for year, dates in sorted(years.items()):
+        content = to_compact_json(dates)
+        if write_if_changed(os.path.join(CATALOG_S3, f"{year}.json"), content):
+            written += 1
+        totals = {
+            key: sum(entry[key] for entry in dates.values()) for key in CATALOG_COUNTS
+        }
+        totals["audioSeconds"] = round(totals["audioSeconds"], 1)
+        summary_years[year] = {
+            "dates": len(dates),
+            **totals,
+            "hash": hash_bytes(content.encode("utf-8")),
+        }
+
+    dates = sorted(catalog)
+    summary = {
+        "firstDate": dates[0] if dates else None,
+        "lastDate": dates[-1] if dates else None,
+        "totals": {
+            "dates": len(dates),
+            **{
+                key: round(sum(year[key] for year in summary_years.values()), 1)
+                for key in CATALOG_COUNTS
+            },
+        },
+        "years": summary_years,
+    }
+    write_json_if_changed(os.path.join(CATALOG_S3, "summary.json"), summary)
+    print(f"Catalog: {len(dates):,} dates in {len(years)} years, {written} rewritten")
 
 
 if __name__ == "__main__":
-    available_dates = collect_available_dates(COMM_S3)
-
-    # get all of the dates that have youtube available
-    youtube_dates = []
-    with open(f"{S3_FOLDER}/youtube_live_recordings.csv", "r", encoding="utf-8") as f:
-        youtube_live_recordings = f.readlines()
-        for i in range(len(youtube_live_recordings)):
-            youtube_live_recordings[i] = youtube_live_recordings[i].strip()
-            datestamp = youtube_live_recordings[i].split("|")[0].split("T")[0]
-            youtube_dates.append(datestamp)
-
-    # get all of the dates that have EVAs available
-    eva_dates = []
+    cache = {"transcripts": {}, "images": {}, "ephemera": {}}
+    if os.path.exists(CATALOG_CACHE):
+        with open(CATALOG_CACHE, "r") as f:
+            cache = json.load(f)
+
+    # get all of the dates that have youtube available, including those that a broadcast
+    # started on the day before runs into
+    youtube_index = build_youtube_date_index(
+        read_youtube_recordings(f"{S3_FOLDER}/youtube_live_recordings.csv")
+    )
+    write_youtube_date_index(youtube_index, YOUTUBE_INDEX_S3)
+
+    # count the EVAs starting on each date
+    eva_counts = defaultdict(int)
     with open(f"{S3_FOLDER}/eva_details.json") as f:
-        evas = json.load(f)
-        for eva in evas:
-            eva_dates.append(eva["startTime"].split("T")[0])
+        for eva in json.load(f):
+            if eva.get("startTime"):
+                eva_counts[eva["startTime"][:10]] += 1
+
+    catalog = build_catalog(cache, youtube_index, eva_counts)
+    write_catalog(catalog)
+    with open(CATALOG_CACHE, "w") as f:
+        json.dump(cache, f)
 
     # compile the available media for each date
-    date_records = []
-    for date in available_dates:
-        date_record = {
-            "date": date,
-            "youtube": date in youtube_dates,
-            "eva": date in eva_dates,
-        }
-        date_records.append(date_record)
+    date_records = [
+        {"date": date, "youtube": entry["videos"] > 0, "eva": entry["evas"] > 0}
+        for date, entry in catalog.items()
+    ]
 
     outputPath = os.path.join(S3_FOLDER, "available_dates.json")
-    with open(outputPath, "w") as f:
-        json.dump(date_records, f, indent=4)
+    write_json_if_changed(outputPath, date_records)
     print(f"Available dates have been saved to {outputPath}")
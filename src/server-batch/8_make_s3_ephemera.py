@@ -1,186 +1,298 @@
-import requests
-import getpass
-import time
-import pandas as pd
-from datetime import datetime, timedelta
-from urllib.parse import quote
 import os
 import json
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from http_client import HttpClient
+from ephemera import (
+    format_epoch,
+    get_month_path,
+    parse_epoch,
+    read_ephemera_month,
+    write_ephemera_index,
+    write_ephemera_month,
+)
 
 # Load environment variables from .env file
 load_dotenv(dotenv_path="../../.env")
 
+# Missing months are fetched with as few Space-Track queries as possible. Runs of consecutive
+# months are coalesced into one EPOCH range query of up to MAX_MONTHS_PER_QUERY months, and the
+# result is split locally into ephemera/YYYY/YYYY-MM.json, each padded by a day on both sides.
+# Space-Track often lists an epoch more than once when an element set is corrected; only the
+# latest publication is kept. Months are written in the sorted columnar format described in
+# ephemera.py, and ephemera/index.json lists the epoch range of every month.
+# If a query returns QUERY_LIMIT rows it may have been truncated, so its range is split in two
+# and fetched again. The login session cookie is kept in SPACETRACK_COOKIES_FILE and reused
+# until Space-Track rejects it. Requests stay within Space-Track's per-minute and per-hour
+# limits through HttpClient (see HOST_LIMITS in http_client.py).
+#
+# To test against a local stand-in, run `python mock_spacetrack_api.py` and set
+# SPACETRACK_URL=http://127.0.0.1:8091
+
 # Constants
-LOGIN_URL = "https://www.space-track.org/ajaxauth/login"
-API_BASE_URL = "https://www.space-track.org/basicspacedata/query"
+SPACETRACK_URL = os.getenv("SPACETRACK_URL", "https://www.space-track.org")
+LOGIN_URL = SPACETRACK_URL + "/ajaxauth/login"
+API_BASE_URL = SPACETRACK_URL + "/basicspacedata/query"
 NORAD_ID = 25544  # ISS NORAD ID
+SPACETRACK_COOKIES_FILE = "spacetrack_cookies.json"
+MAX_MONTHS_PER_QUERY = 12
+QUERY_LIMIT = 20000
 
 EPHEMERA_S3 = os.getenv("S3_FOLDER") + "ephemera/"
 AVAILABLE_DATES_S3 = os.getenv("S3_FOLDER") + "/available_dates.json"
 
 
-# Function to create an authenticated session
-def create_session(username, password):
-    session = requests.Session()
+class SpaceTrackAuthError(Exception):
+    pass
+
+
+def load_cookies(session, path=SPACETRACK_COOKIES_FILE):
+    """
+    Loads the saved, unexpired session cookies into the session. Returns True if any were loaded.
+    """
+    if not os.path.exists(path):
+        return False
+    with open(path, "r") as f:
+        cookies = json.load(f)
+    now = datetime.now().timestamp()
+    loaded = 0
+    for cookie in cookies:
+        if cookie.get("expires") and cookie["expires"] <= now:
+            continue
+        session.session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie["domain"],
+            path=cookie["path"],
+            expires=cookie.get("expires"),
+        )
+        loaded += 1
+    return loaded > 0
+
+
+def save_cookies(session, path=SPACETRACK_COOKIES_FILE):
+    cookies = [
+        {
+            "name": cookie.name,
+            "value": cookie.value,
+            "domain": cookie.domain,
+            "path": cookie.path,
+            "expires": cookie.expires,
+        }
+        for cookie in session.session.cookies
+    ]
+    with open(path, "w") as f:
+        json.dump(cookies, f, indent=4)
+
+
+# Logs the session in and saves its cookies for the next run
+def login(session, username, password):
+    session.session.cookies.clear()
     login_payload = {"identity": username, "password": password}
     headers = {"User-Agent": "ISS_TLE_Retriever/1.0"}
 
     response = session.post(LOGIN_URL, data=login_payload, headers=headers)
 
-    if response.status_code == 200:
-        # Attempt to verify authentication
-        try:
-            response_json = response.json()
-            if "error" in response_json:
-                raise Exception(f"Login failed: {response_json['error']}")
-            else:
-                print("Successfully logged in to Space-Track.org")
-                return session
-        except ValueError:
-            # If response is not JSON, perform a fallback check
-            if "logout" in response.text.lower():
-                print("Successfully logged in to Space-Track.org")
-                return session
-            else:
-                raise Exception("Login failed. Please check your credentials.")
-    else:
+    if response.status_code != 200:
         raise Exception(f"Login request failed with status code {response.status_code}")
+    # Attempt to verify authentication
+    try:
+        response_json = response.json()
+        if "error" in response_json:
+            raise Exception(f"Login failed: {response_json['error']}")
+    except ValueError:
+        # If response is not JSON, perform a fallback check
+        if "logout" not in response.text.lower():
+            raise Exception("Login failed. Please check your credentials.")
+    print("Successfully logged in to Space-Track.org")
+    save_cookies(session)
+
+
+# Function to create a session, reusing the saved login when there is one. Requests made with it
+# are pooled and kept within Space-Track's rate limits by HttpClient.
+def create_session(username, password):
+    session = HttpClient()
+    if load_cookies(session):
+        print(f"Reusing the Space-Track session saved in {SPACETRACK_COOKIES_FILE}")
+    else:
+        login(session, username, password)
+    return session
 
 
 # Function to fetch TLE data for a specific date range
-def fetch_tle(session, start_date, end_date, norad_id=NORAD_ID, limit=1000):
+def fetch_tle(session, start_date, end_date, norad_id=NORAD_ID, limit=QUERY_LIMIT):
     """
     Fetch TLE data for a specific NORAD ID between start_date and end_date.
 
     Parameters:
-        session (requests.Session): Authenticated session.
+        session (HttpClient): Authenticated session.
         start_date (str): Start date in YYYY-MM-DD format.
         end_date (str): End date in YYYY-MM-DD format.
         norad_id (int): NORAD ID of the object (25544 for ISS).
-        limit (int): Maximum number of records per request.
+        limit (int): Maximum number of records to return.
 
     Returns:
         list: List of TLE records.
     """
-    all_tle = []
-    step = limit  # Number of records per request
-    max_retries = 3
-    retry_delay = 5  # seconds
-
-    # Encode the 'orderby' parameter to handle spaces
-    orderby = "orderby/EPOCH asc"
-    orderby_encoded = orderby.replace(" ", "%20")  # Replace space with '%20'
-
-    # Construct the query string with proper encoding
     query = (
         f"/class/tle/EPOCH/{start_date}--{end_date}/NORAD_CAT_ID/{norad_id}/"
-        f"{orderby_encoded}/limit/{step}/format/json"
+        f"orderby/EPOCH%20asc/limit/{limit}/format/json"
     )
-
-    # Ensure the query is properly URL-encoded
-    # Note: Only specific parts that may contain special characters are encoded
-    # The rest of the URL structure remains unchanged
-    # For more complex encoding, consider using urllib.parse functions
-
     url = f"{API_BASE_URL}{query}"
     print(f"Fetching TLE data from {start_date} to {end_date}...")
-    print(f"Request URL: {url}")  # Debug: Display the constructed URL
-
-    retries = 0
-    while retries < max_retries:
-        response = session.get(url)
-
-        if response.status_code == 200:
-            try:
-                tle_batch = response.json()
-                if not tle_batch:
-                    print("No more records found in this date range.")
-                    break
-                all_tle.extend(tle_batch)
-                print(f"Retrieved {len(tle_batch)} records.")
-                break  # Successful retrieval
-            except ValueError:
-                print("Failed to parse JSON response.")
-                retries += 1
-                time.sleep(retry_delay)
-        else:
-            print(f"Failed to fetch TLE data: {response.status_code} - {response.text}")
-            retries += 1
-            time.sleep(retry_delay)
 
-    if retries == max_retries:
-        raise Exception("Exceeded maximum retries for fetching TLE data.")
+    # Transient failures are retried with backoff by the client
+    response = session.get(url)
+    if response.status_code == 401:
+        raise SpaceTrackAuthError("Space-Track session is not logged in")
+    if response.status_code != 200:
+        raise Exception(
+            f"Failed to fetch TLE data: {response.status_code} - {response.text}"
+        )
+    try:
+        tle_batch = response.json()
+    except ValueError:
+        raise Exception("Failed to parse JSON response.")
+    if isinstance(tle_batch, dict) and "error" in tle_batch:
+        raise SpaceTrackAuthError(tle_batch["error"])
 
-    return all_tle
+    print(f"Retrieved {len(tle_batch)} records.")
+    return tle_batch
 
 
-# Function to retrieve all TLE data from start_year to present
-def get_all_tle(session, start_year=2015, norad_id=NORAD_ID):
+def get_month_range(month_str):
     """
-    Retrieve all TLE data for the specified NORAD ID starting from start_year to present.
+    Returns the (start, end) datetimes of the month, including one day before and after it.
+    """
+    year, month = month_str.split("-")
+    start_dt = datetime(int(year), int(month), 1) - timedelta(days=1)
+    end_dt = (datetime(int(year), int(month), 1) + timedelta(days=32)).replace(day=1)
+    end_dt += timedelta(days=1)
+    return start_dt, end_dt
 
-    Parameters:
-        session (requests.Session): Authenticated session.
-        start_year (int): Year to start fetching data from.
-        norad_id (int): NORAD ID of the object (25544 for ISS).
 
-    Returns:
-        pd.DataFrame: DataFrame containing all TLE records.
+def group_months(months, max_months=MAX_MONTHS_PER_QUERY):
+    """
+    Groups the sorted months into runs of consecutive months, at most max_months long.
     """
-    all_tle = []
-    current_date = datetime(start_year, 1, 1)
-    end_date = datetime.now()
+    groups = []
+    previous_index = None
+    for month_str in months:
+        year, month = month_str.split("-")
+        month_index = int(year) * 12 + int(month) - 1
+        if (
+            groups
+            and month_index == previous_index + 1
+            and len(groups[-1]) < max_months
+        ):
+            groups[-1].append(month_str)
+        else:
+            groups.append([month_str])
+        previous_index = month_index
+    return groups
 
-    # Define batch size (e.g., 1 month)
-    batch_delta = timedelta(days=30)
 
-    while current_date < end_date:
-        batch_end_date = current_date + batch_delta
-        if batch_end_date > end_date:
-            batch_end_date = end_date
+def fetch_months(session, months):
+    """
+    Fetches the padded range covering the consecutive months in one query, splitting the range
+    when the result may have been truncated by the query limit.
+    """
+    start_dt, _ = get_month_range(months[0])
+    _, end_dt = get_month_range(months[-1])
+    tle_batch = fetch_tle(
+        session, start_dt.strftime("%Y-%m-%d"), end_dt.strftime("%Y-%m-%d")
+    )
+    if len(tle_batch) >= QUERY_LIMIT:
+        if len(months) == 1:
+            raise Exception(f"More than {QUERY_LIMIT} TLEs for {months[0]}")
+        print(f"Query limit reached for {months[0]} to {months[-1]}, splitting it")
+        middle = len(months) // 2
+        return fetch_months(session, months[:middle]) + fetch_months(
+            session, months[middle:]
+        )
+    return tle_batch
+
+
+def publication_order(tle):
+    """
+    Sort key for element sets with the same epoch; the last one published supersedes the others.
+    """
+    return tuple(
+        int(tle[field]) if str(tle.get(field, "")).isdigit() else -1
+        for field in ("FILE", "ELEMENT_SET_NO")
+    )
 
-        start_str = current_date.strftime("%Y-%m-%d")
-        end_str = batch_end_date.strftime("%Y-%m-%d")
 
-        try:
-            tle_batch = fetch_tle(session, start_str, end_str, norad_id)
-            all_tle.extend(tle_batch)
-        except Exception as e:
-            print(f"Error fetching data for {start_str} to {end_str}: {e}")
-            # Optionally, continue to next batch or halt
-            # Here, we'll continue
+def select_element_sets(tle_batch):
+    """
+    Returns the (epoch, line1, line2) element sets sorted by epoch, one per epoch. Where the
+    same epoch was published more than once, only the latest publication is kept.
+    """
+    by_epoch = {}
+    for tle in tle_batch:
+        epoch = datetime.fromisoformat(tle["EPOCH"])
+        current = by_epoch.get(epoch)
+        # Ranges that were split overlap by their padding days, so the same publication can
+        # appear twice; later items in the batch win ties
+        if current is None or publication_order(tle) >= publication_order(current):
+            by_epoch[epoch] = tle
+    return [
+        (epoch, by_epoch[epoch]["TLE_LINE1"], by_epoch[epoch]["TLE_LINE2"])
+        for epoch in sorted(by_epoch)
+    ]
+
+
+def save_monthly_tle(element_sets, output_file):
+    columns = {
+        "epoch": [format_epoch(epoch) for epoch, _, _ in element_sets],
+        "tle_line1": [line1 for _, line1, _ in element_sets],
+        "tle_line2": [line2 for _, _, line2 in element_sets],
+    }
+    if write_ephemera_month(output_file, columns):
+        print(f"Saved {len(element_sets)} TLEs to {output_file}")
+
+
+def split_months(tle_batch, months):
+    """
+    Splits the TLEs of a range query into the padded month files.
+    """
+    if not tle_batch:
+        print(f"No TLE data available for {months[0]} to {months[-1]}")
+        return
+    element_sets = select_element_sets(tle_batch)
+    print(f"{len(tle_batch)} TLEs, {len(element_sets)} after dropping superseded sets")
+    for month_str in months:
+        start_dt, end_dt = get_month_range(month_str)
+        month_sets = [
+            element_set
+            for element_set in element_sets
+            if start_dt <= element_set[0] <= end_dt
+        ]
+        if not month_sets:
+            print(f"No TLE data available for {month_str}")
             continue
+        save_monthly_tle(month_sets, get_month_path(EPHEMERA_S3, month_str))
 
-        current_date = batch_end_date + timedelta(days=1)  # Avoid overlapping
-
-        # Respect API rate limits
-        time.sleep(1)
 
-    # Convert to DataFrame for easier handling
-    df = pd.DataFrame(all_tle)
-    return df
-
-
-def save_monthly_tle(tle_df, output_file):
-    tle_df = tle_df[["EPOCH", "TLE_LINE1", "TLE_LINE2"]]
-    tle_df.loc[:, "EPOCH"] = pd.to_datetime(tle_df["EPOCH"])
-    tle_df = tle_df.rename(
-        columns={
-            "EPOCH": "epoch",
-            "TLE_LINE1": "tle_line1",
-            "TLE_LINE2": "tle_line2",
-        }
-    )
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    tle_df.to_json(
-        output_file,
-        orient="records",
-        date_format="iso",
-        indent=4,
-        force_ascii=False,
+def compact_month(month_path):
+    """
+    Rewrites a month in the sorted columnar format, keeping the last TLE listed for each
+    epoch. Month files saved as indented record lists are converted this way.
+    """
+    columns = read_ephemera_month(month_path)
+    by_epoch = {}
+    for epoch, line1, line2 in zip(
+        columns["epoch"], columns["tle_line1"], columns["tle_line2"]
+    ):
+        by_epoch[parse_epoch(epoch).replace(tzinfo=None)] = (line1, line2)
+    return write_ephemera_month(
+        month_path,
+        {
+            "epoch": [format_epoch(epoch) for epoch in sorted(by_epoch)],
+            "tle_line1": [by_epoch[epoch][0] for epoch in sorted(by_epoch)],
+            "tle_line2": [by_epoch[epoch][1] for epoch in sorted(by_epoch)],
+        },
     )
-    print(f"Saved TLE data to {output_file}")
 
 
 # Main function
@@ -203,42 +315,40 @@ def main():
         year, month, day = date_str.split("-")
         required_months.add(f"{year}-{month}")
 
-    required_months = sorted(required_months)
+    missing_months = []
+    compacted = 0
+    for month_str in sorted(required_months):
+        output_file = get_month_path(EPHEMERA_S3, month_str)
+        if os.path.exists(output_file):
+            print(f"Ephemera file for {month_str} already exists. Skipping API call.")
+            if compact_month(output_file):
+                compacted += 1
+            continue
+        missing_months.append(month_str)
+    if compacted:
+        print(f"Converted {compacted} existing months to the columnar format")
 
-    try:
-        # Create an authenticated session
-        session = create_session(username, password)
-
-        # Fetch TLE data for required months
-        for month_str in required_months:
-            year, month = month_str.split("-")
-            output_file = os.path.join(EPHEMERA_S3, year, f"{year}-{month}.json")
-            if os.path.exists(output_file):
-                print(
-                    f"Ephemera file for {year}-{month} already exists. Skipping API call."
-                )
-                continue
-
-            # Include one day before and after the month
-            start_date_dt = datetime(int(year), int(month), 1) - timedelta(days=1)
-            start_date = start_date_dt.strftime("%Y-%m-%d")
-            end_date_dt = (
-                datetime(int(year), int(month), 1) + timedelta(days=32)
-            ).replace(day=1)
-            end_date_dt += timedelta(days=1)
-            end_str = end_date_dt.strftime("%Y-%m-%d")
-
-            tle_batch = fetch_tle(session, start_date, end_str, NORAD_ID)
-            if not tle_batch:
-                print(f"No TLE data available for {year}-{month}")
-                continue
-
-            tle_df = pd.DataFrame(tle_batch)
-            save_monthly_tle(tle_df, output_file)
-            time.sleep(1)  # Respect API rate limits
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    if missing_months:
+        groups = group_months(missing_months)
+        print(f"Fetching {len(missing_months)} missing months in {len(groups)} queries")
+
+        try:
+            session = create_session(username, password)
+            for months in groups:
+                try:
+                    tle_batch = fetch_months(session, months)
+                except SpaceTrackAuthError:
+                    # The saved session has expired
+                    login(session, username, password)
+                    tle_batch = fetch_months(session, months)
+                split_months(tle_batch, months)
+
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+    if os.path.isdir(EPHEMERA_S3):
+        index = write_ephemera_index(EPHEMERA_S3)
+        print(f"Ephemera index: {len(index)} months")
 
 
 if __name__ == "__main__":
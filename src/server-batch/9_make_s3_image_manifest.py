@@ -6,6 +6,8 @@ from datetime import datetime
 from collections import defaultdict
 import sys
 import os  # Add import for os
+from http_client import client
+from output_files import write_json_if_changed
 
 # Load environment variables from .env file
 load_dotenv(dotenv_path="../../.env")
@@ -57,7 +59,7 @@ def fetch_api_data(formatted_date):
     params = {"query": query, "return": return_fields, "key": api_key}
 
     try:
-        response = requests.get(API_ENDPOINT, params=params)
+        response = client.get(API_ENDPOINT, params=params)
         response.raise_for_status()
         data = response.json()
 
@@ -166,14 +168,56 @@ def generate_manifest(grouped_data):
 
 def save_manifest(manifest, output_filename):
     try:
-        with open(output_filename, "w") as f:
-            json.dump(manifest, f, indent=4)
-        print(f"Manifest saved to {output_filename}")
+        if write_json_if_changed(output_filename, manifest):
+            print(f"Manifest saved to {output_filename}")
     except IOError as e:
         print(f"Error writing to file {output_filename}: {e}")
         sys.exit(1)
 
 
+def update_date_manifest(available_date):
+    images_root = IMAGES_S3
+    no_data = False
+    print(f"Processing date: {available_date}")
+    [year, month, day] = available_date.split("-")
+    formatted_date = f"{year}{month}{day}"
+
+    data = fetch_api_data(formatted_date)  # Fetch data for the day
+
+    if not data:
+        print(f"No data returned from API for {available_date}.")
+        no_data = True
+
+    if not no_data:
+        grouped_data = process_data(data)
+
+        if not grouped_data:
+            print(f"No valid photo records found for {available_date}.")
+            no_data = True
+
+    if not no_data:
+        manifest = generate_manifest(grouped_data)
+
+        if not manifest:
+            print(f"No manifest entries to save for {available_date}.")
+            no_data = True
+
+    # Define output folder with nested month directory
+    output_folder = os.path.join(images_root, year, month)
+    os.makedirs(output_folder, exist_ok=True)
+
+    output_file = os.path.join(
+        output_folder,
+        f"images-manifest_{year}-{month}-{day}.json",  # Use hyphens for the date
+    )
+    if no_data:
+        print(f"No data available for {available_date}. Writing empty manifest.")
+        with open(output_file, "w") as f:
+            f.write("[]")
+    else:
+        save_manifest(manifest, output_file)
+
+
 def main():
 
     images_root = IMAGES_S3  # Define images_root
@@ -184,12 +228,10 @@ def main():
         with open(AVAILABLE_DATES_S3, "r") as f:
             available_dates = json.load(f)
 
+    missing_dates = []
     for item in available_dates:
         available_date = item["date"]
-        no_data = False
-        print(f"Processing date: {available_date}")
         [year, month, day] = available_date.split("-")
-        formatted_date = f"{year}{month}{day}"
 
         # check if the json file for this date already exists
         output_file = os.path.join(
@@ -198,41 +240,10 @@ def main():
         if os.path.exists(output_file):
             print(f"Manifest for {available_date} already exists. Skipping API call.")
             continue
+        missing_dates.append(available_date)
 
-        data = fetch_api_data(formatted_date)  # Fetch data for the day
-
-        if not data:
-            print(f"No data returned from API for {available_date}.")
-            no_data = True
-
-        if not no_data:
-            grouped_data = process_data(data)
-
-            if not grouped_data:
-                print(f"No valid photo records found for {available_date}.")
-                no_data = True
-
-        if not no_data:
-            manifest = generate_manifest(grouped_data)
-
-            if not manifest:
-                print(f"No manifest entries to save for {available_date}.")
-                no_data = True
-
-        # Define output folder with nested month directory
-        output_folder = os.path.join(images_root, year, month)
-        os.makedirs(output_folder, exist_ok=True)
-
-        output_file = os.path.join(
-            output_folder,
-            f"images-manifest_{year}-{month}-{day}.json",  # Use hyphens for the date
-        )
-        if no_data:
-            print(f"No data available for {available_date}. Writing empty manifest.")
-            with open(output_file, "w") as f:
-                f.write("[]")
-        else:
-            save_manifest(manifest, output_file)
+    # Days are independent, so fetch them concurrently within the EOL API's limits
+    client.map(update_date_manifest, missing_dates)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from dotenv import load_dotenv
+from comm_transcripts import load_day_utterances
+
+# Benchmarks the WhisperX JSON ingestion used by 3_make_s3_comm.py against the previous
+# json.load based path. Point it at a month of raw transcripts, e.g.
+#   python bench_comm_transcripts.py 2023 11
+
+load_dotenv(dotenv_path="../../.env")
+
+COMM_TRANSCRIPTS_AACS = os.getenv("SG_RAW_FOLDER") + "comm_transcripts_aacs/"
+
+
+def legacy_load_day(dir_path, json_filenames):
+    # The per-file path 3_make_s3_comm.py used before comm_transcripts.py
+    rows = []
+    for filename in json_filenames:
+        with open(os.path.join(dir_path, filename), "r", encoding="utf-8") as f:
+            json_data = json.load(f)
+        local_dt = datetime.strptime(
+            json_data.get("utteranceTime", "").rstrip("Z"), "%Y-%m-%dT%H:%M:%S"
+        )
+        local_dt = local_dt.replace(tzinfo=ZoneInfo("America/Chicago"))
+        utc_dt = local_dt.astimezone(ZoneInfo("UTC"))
+        segments = json_data.get("segments", [])
+        rows.append(
+            (
+                utc_dt.strftime("%H:%M:%S"),
+                " ".join(s.get("text", "").strip() for s in segments),
+                " ".join(
+                    s.get("text", "").strip()
+                    for s in json_data.get("origLangSegments", [])
+                ),
+            )
+        )
+    return rows
+
+
+def run(label, load_day, days):
+    start = time.perf_counter()
+    count = 0
+    for dir_path, json_filenames in days:
+        count += len(load_day(dir_path, json_filenames))
+    elapsed = time.perf_counter() - start
+    print(f"{label:>8}: {count:,} utterances in {elapsed:.2f}s")
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark WhisperX JSON ingestion over a month of transcripts."
+    )
+    parser.add_argument("year", type=str)
+    parser.add_argument("month", type=str)
+    args = parser.parse_args()
+
+    month_path = os.path.join(COMM_TRANSCRIPTS_AACS, args.year, args.month.zfill(2))
+    days = []
+    total_bytes = 0
+    for day in sorted(os.listdir(month_path)):
+        dir_path = os.path.join(month_path, day)
+        json_filenames = [f for f in os.listdir(dir_path) if f.endswith(".json")]
+        total_bytes += sum(
+            os.path.getsize(os.path.join(dir_path, f)) for f in json_filenames
+        )
+        days.append((dir_path, json_filenames))
+    print(
+        f"{sum(len(f) for _, f in days):,} JSON files, {total_bytes / 1e6:,.1f} MB "
+        f"across {len(days)} days"
+    )
+
+    # Warm the OS file cache so both paths are measured on equal terms
+    run("warmup", load_day_utterances, days)
+    legacy = run("json", legacy_load_day, days)
+    fast = run("msgspec", load_day_utterances, days)
+    print(f"Speedup: {legacy / fast:.1f}x")
@@ -0,0 +1,69 @@
+import argparse
+import os
+import time
+from dotenv import load_dotenv
+from comm_transcripts import channel_from_filename, utc_times_from_aac_filenames
+from search_index import search, tokenize
+
+# Compares a query against the static search index built by 14_make_s3_search_index.py with a
+# brute-force scan of every transcript CSV, e.g.
+#   python bench_search_index.py "docking"
+
+load_dotenv(dotenv_path="../../.env")
+
+COMM_S3 = os.getenv("S3_FOLDER") + "comm/"
+SEARCH_S3 = os.getenv("S3_FOLDER") + "search/"
+
+
+def brute_force_search(comm_dir, query):
+    terms = set(tokenize(query))
+    results = []
+    for dirpath, dirnames, filenames in os.walk(comm_dir):
+        for filename in filenames:
+            if not (filename.startswith("_transcript_") and filename.endswith(".csv")):
+                continue
+            with open(os.path.join(dirpath, filename), "r", encoding="utf-8") as f:
+                rows = [line.rstrip("\n").split("|") for line in f]
+            matches = [
+                fields[1]
+                for fields in rows
+                if len(fields) == 7
+                and terms <= set(tokenize(fields[5])) | set(tokenize(fields[6]))
+            ]
+            for aac_filename, utc_dt in zip(
+                matches, utc_times_from_aac_filenames(matches)
+            ):
+                results.append(
+                    (
+                        utc_dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        channel_from_filename(aac_filename),
+                        aac_filename,
+                    )
+                )
+    return sorted(results)
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    results = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>11}: {len(results):,} matches in {elapsed * 1000:,.1f} ms")
+    return results, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the static search index against a brute-force scan."
+    )
+    parser.add_argument("query", type=str)
+    args = parser.parse_args()
+
+    brute_results, brute_time = timed(
+        "brute force", lambda: brute_force_search(COMM_S3, args.query)
+    )
+    index_results, index_time = timed(
+        "index", lambda: [tuple(p) for p in search(SEARCH_S3, args.query)]
+    )
+    if brute_results != index_results:
+        print("Warning: index results differ from the brute-force scan")
+    print(f"Speedup: {brute_time / max(index_time, 1e-9):.1f}x")
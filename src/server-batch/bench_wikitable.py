@@ -0,0 +1,100 @@
+import argparse
+import glob
+import os
+import time
+from bs4 import BeautifulSoup
+from wikitable import PARSER, iter_rows, parse_wikitables
+
+# Offline parse benchmark for wikitable.py over saved copies of the pages scraped by stages 4
+# and 6. Save the snapshots once with --fetch, then
+#   python bench_wikitable.py
+# compares a full html.parser parse with the strained parse and cached cell text.
+
+SNAPSHOT_DIR = "wiki_snapshots"
+PAGES = {
+    "spacewalks": "https://en.wikipedia.org/wiki/List_of_International_Space_Station_spacewalks",
+    "expeditions": "https://en.wikipedia.org/wiki/List_of_International_Space_Station_expeditions",
+}
+# How many times the stages read each cell's text while classifying a row, roughly
+TEXT_READS_PER_CELL = 3
+
+
+def fetch_snapshots():
+    from http_cache import cached_get
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    for name, url in PAGES.items():
+        response = cached_get(url)
+        response.raise_for_status()
+        with open(os.path.join(SNAPSHOT_DIR, f"{name}.html"), "wb") as f:
+            f.write(response.content)
+        print(f"Saved {url}")
+
+
+def legacy_extract(html):
+    soup = BeautifulSoup(html, "html.parser")
+    rows = []
+    for table in soup.find_all("table", {"class": "wikitable"}):
+        for row in table.find_all("tr")[1:]:
+            cells = row.find_all(["td", "th"])
+            for _ in range(TEXT_READS_PER_CELL):
+                texts = [cell.get_text(strip=True) for cell in cells]
+            rows.append(texts)
+    return rows
+
+
+def wikitable_extract(html, parser=PARSER):
+    rows = []
+    for table in parse_wikitables(html, parser):
+        for cells in iter_rows(table):
+            for _ in range(TEXT_READS_PER_CELL):
+                texts = [cells.text(i) for i in range(len(cells))]
+            rows.append(texts)
+    return rows
+
+
+def timed(fn, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = fn(html)
+    return rows, (time.perf_counter() - start) / repeat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark wikitable extraction over saved Wikipedia pages."
+    )
+    parser.add_argument("snapshots", nargs="*", help="Saved HTML pages")
+    parser.add_argument(
+        "--fetch", action="store_true", help=f"Save the pages into {SNAPSHOT_DIR}/"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_snapshots()
+    snapshots = args.snapshots or sorted(
+        glob.glob(os.path.join(SNAPSHOT_DIR, "*.html"))
+    )
+    if not snapshots:
+        parser.error(f"No snapshots given and none in {SNAPSHOT_DIR}/, use --fetch")
+
+    variants = {
+        "legacy html.parser": legacy_extract,
+        "strained html.parser": lambda html: wikitable_extract(html, "html.parser"),
+        f"strained {PARSER}": wikitable_extract,
+    }
+    for snapshot in snapshots:
+        with open(snapshot, "rb") as f:
+            html = f.read()
+        print(f"{os.path.basename(snapshot)} ({len(html) / 1024:,.0f} KiB)")
+        baseline_rows, baseline_time = None, None
+        for label, fn in variants.items():
+            rows, elapsed = timed(fn, html, args.repeat)
+            if baseline_rows is None:
+                baseline_rows, baseline_time = rows, elapsed
+            note = "" if rows == baseline_rows else "  (rows differ from legacy)"
+            print(
+                f"  {label:>20}: {len(rows):,} rows in {elapsed * 1000:,.1f} ms, "
+                f"{baseline_time / elapsed:.1f}x{note}"
+            )
@@ -0,0 +1,160 @@
+import json
+import os
+from comm_transcripts import channel_from_filename
+
+# Consolidated per-day audio. The utterance AACs written by 2_process_transcribe_ia_zips.py are
+# ADTS streams, which are self-framing, so a day's utterances on one SG channel can be concatenated
+# byte for byte into a single playable file. An index maps each transcript row's filename to its
+# byte range and time offset in that file so the UI can range-request or seek into it.
+
+ADTS_SAMPLE_RATES = [
+    96000,
+    88200,
+    64000,
+    48000,
+    44100,
+    32000,
+    24000,
+    22050,
+    16000,
+    12000,
+    11025,
+    8000,
+    7350,
+]
+ADTS_SAMPLES_PER_BLOCK = 1024
+
+
+def adts_duration(data):
+    """
+    Returns the duration in seconds of an ADTS AAC stream by walking its frame headers.
+    """
+    samples = 0
+    sample_rate = None
+    offset = 0
+    while offset + 7 <= len(data):
+        if data[offset] != 0xFF or data[offset + 1] & 0xF6 != 0xF0:
+            # Lost sync, e.g. a truncated file; count what was read so far
+            break
+        sample_rate_index = (data[offset + 2] >> 2) & 0x0F
+        if sample_rate_index >= len(ADTS_SAMPLE_RATES):
+            break
+        sample_rate = ADTS_SAMPLE_RATES[sample_rate_index]
+        frame_length = (
+            ((data[offset + 3] & 0x03) << 11)
+            | (data[offset + 4] << 3)
+            | (data[offset + 5] >> 5)
+        )
+        if frame_length < 7:
+            break
+        raw_data_blocks = (data[offset + 6] & 0x03) + 1
+        samples += ADTS_SAMPLES_PER_BLOCK * raw_data_blocks
+        offset += frame_length
+    return samples / sample_rate if sample_rate else 0.0
+
+
+def get_day_audio_filename(date_str, channel):
+    return f"_audio_{date_str}_SG_{channel}.aac"
+
+
+def get_day_audio_index_filename(date_str):
+    return f"_audio_{date_str}_index.json"
+
+
+def build_day_audio(day_dir, date_str, aac_filenames):
+    """
+    Concatenates the day's AACs, in the given (time sorted) order, into one file per SG channel
+    and writes the index:
+        {"channels": {channel: audio filename},
+         "utterances": {aac filename: [channel, byte offset, byte length, time offset, duration]}}
+    """
+    channel_files = {}
+    channel_positions = {}
+    utterances = {}
+    try:
+        for aac_filename in aac_filenames:
+            aac_path = os.path.join(day_dir, aac_filename)
+            if not os.path.exists(aac_path):
+                continue
+            with open(aac_path, "rb") as f:
+                data = f.read()
+
+            channel = channel_from_filename(aac_filename)
+            if channel not in channel_files:
+                channel_files[channel] = open(
+                    os.path.join(day_dir, get_day_audio_filename(date_str, channel)),
+                    "wb",
+                )
+                channel_positions[channel] = [0, 0.0]
+
+            byte_offset, time_offset = channel_positions[channel]
+            duration = adts_duration(data)
+            channel_files[channel].write(data)
+            utterances[aac_filename] = [
+                channel,
+                byte_offset,
+                len(data),
+                round(time_offset, 3),
+                round(duration, 3),
+            ]
+            channel_positions[channel] = [
+                byte_offset + len(data),
+                time_offset + duration,
+            ]
+    finally:
+        for channel_file in channel_files.values():
+            channel_file.close()
+
+    # Remove files for channels that no longer have utterances on this day
+    audio_filenames = set(
+        get_day_audio_filename(date_str, channel) for channel in channel_files
+    )
+    for filename in os.listdir(day_dir):
+        if (
+            filename.startswith(f"_audio_{date_str}_SG_")
+            and filename not in audio_filenames
+        ):
+            os.remove(os.path.join(day_dir, filename))
+
+    index = {
+        "channels": {
+            channel: get_day_audio_filename(date_str, channel)
+            for channel in sorted(channel_files)
+        },
+        "utterances": utterances,
+    }
+    with open(
+        os.path.join(day_dir, get_day_audio_index_filename(date_str)),
+        "w",
+        encoding="utf-8",
+    ) as f:
+        json.dump(index, f, separators=(",", ":"))
+    return index
+
+
+def read_day_durations(day_dir, date_str):
+    """
+    Returns {aac filename: duration in seconds} from the day's audio index, or {} if the day has
+    none.
+    """
+    index_path = os.path.join(day_dir, get_day_audio_index_filename(date_str))
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path, "r", encoding="utf-8") as f:
+        return {
+            filename: entry[4] for filename, entry in json.load(f)["utterances"].items()
+        }
+
+
+def utterance_duration(durations, filename, end):
+    """
+    The audio seconds counted for one transcript row, the same in every stage: the AAC's
+    duration from the audio index, else the row's end offset into its AAC. None when neither
+    is known.
+    """
+    if filename in durations:
+        return durations[filename]
+    try:
+        return float(end)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,53 @@
+import os
+import pyarrow as pa
+import pyarrow.dataset as ds
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv(dotenv_path="../../.env")
+
+# The columnar corpus of every utterance in the daily transcript CSVs, built by
+# 13_make_comm_corpus.py. It is a Parquet dataset with hive-style year/month partitions and one
+# file per day, so rebuilding a day in stage 3 only rewrites that day's file:
+#   comm_corpus/year=2019/month=1/2019-01-29.parquet
+#
+# Example, everything said on SG3 in 2019:
+#   open_corpus().to_table(filter=(ds.field("year") == 2019) & (ds.field("channel") == 3))
+
+CORPUS_DIR = os.getenv("SG_RAW_FOLDER") + "comm_corpus/"
+
+SCHEMA = pa.schema(
+    [
+        ("utc", pa.timestamp("s", tz="UTC")),
+        # The transcript (comm folder) date, which is not always the UTC date
+        ("date", pa.string()),
+        ("channel", pa.int8()),
+        ("language", pa.dictionary(pa.int8(), pa.string())),
+        ("start", pa.float32()),
+        ("end", pa.float32()),
+        # Seconds of audio, from the day's audio index when available
+        ("duration", pa.float32()),
+        ("filename", pa.string()),
+        ("text", pa.string()),
+        ("textOriginalLang", pa.string()),
+    ]
+)
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("year", pa.int16()), ("month", pa.int8())]), flavor="hive"
+)
+
+
+def get_day_path(corpus_dir, date_str):
+    year, month, day = date_str.split("-")
+    return os.path.join(
+        corpus_dir, f"year={int(year)}", f"month={int(month)}", f"{date_str}.parquet"
+    )
+
+
+def open_corpus(corpus_dir=CORPUS_DIR):
+    return ds.dataset(
+        corpus_dir,
+        format="parquet",
+        partitioning=PARTITIONING,
+    )
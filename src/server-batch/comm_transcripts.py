@@ -0,0 +1,143 @@
+import os
+import re
+from datetime import datetime
+from typing import List, NamedTuple, Union
+from zoneinfo import ZoneInfo
+
+import msgspec
+
+# Ingestion of the WhisperX result JSONs written by 2_process_transcribe_ia_zips.py. Only the
+# fields the transcript CSVs need are decoded; tokens, words and everything else in each segment
+# are skipped by the decoder without being turned into Python objects.
+
+LOCAL_TZ = ZoneInfo("America/Chicago")
+UTC = ZoneInfo("UTC")
+
+
+class Segment(msgspec.Struct):
+    text: str = ""
+    start: Union[int, float, None] = None
+    end: Union[int, float, None] = None
+
+
+class WhisperxResult(msgspec.Struct):
+    utteranceTime: str = ""
+    filename: str = ""
+    language: str = "en"
+    segments: List[Segment] = []
+    origLangSegments: List[Segment] = []
+
+
+class Utterance(NamedTuple):
+    utc: datetime
+    utteranceTime: str
+    filename: str
+    start: str
+    end: str
+    language: str
+    text: str
+    textOriginalLang: str
+    aacFilename: str
+
+
+whisperx_decoder = msgspec.json.Decoder(WhisperxResult)
+
+# filename format is 2019-01-29T020513-1_SG_1_IA.aac, the digits after SG_ are the channel
+CHANNEL_PATTERN = re.compile(r"\d+_SG_(\d+)")
+
+
+def is_invalid_utterance(text):
+    textStringsIndicateInvalidUtterance = [
+        "Thank you.",
+        "Bye.",
+        "...",
+        "Thanks for watching!",
+        "Thank you for watching.",
+        "Thank you for watching!",
+        "This video is a derivative work of the Touhou Project",
+    ]
+    return text in textStringsIndicateInvalidUtterance
+
+
+def read_whisperx_result(file_path):
+    with open(file_path, "rb") as f:
+        return whisperx_decoder.decode(f.read())
+
+
+def local_times_to_utc(utterance_time_strs):
+    """
+    Converts a batch of America/Chicago wall-clock times ("2023-11-01T09:15:00Z", the Z is
+    not meaningful) to UTC datetimes. DST changes only happen on the hour, so the UTC offset
+    is looked up once per distinct local hour instead of once per utterance.
+    """
+    offsets = {}
+    utc_times = []
+    for utterance_time_str in utterance_time_strs:
+        local_dt = datetime.fromisoformat(utterance_time_str.rstrip("Z"))
+        hour_key = utterance_time_str[:13]
+        offset = offsets.get(hour_key)
+        if offset is None:
+            offset = local_dt.replace(tzinfo=LOCAL_TZ).utcoffset()
+            offsets[hour_key] = offset
+        utc_times.append((local_dt - offset).replace(tzinfo=UTC))
+    return utc_times
+
+
+def channel_from_filename(filename):
+    match = CHANNEL_PATTERN.search(filename)
+    return match.group(1) if match else "unknown"
+
+
+def utc_times_from_aac_filenames(aac_filenames):
+    """
+    Recovers the UTC start time of utterances from their filenames, which begin with the local
+    start time, e.g. 2019-01-29T020513-1_SG_1_IA.aac.
+    """
+    return local_times_to_utc(
+        f"{name[:10]}T{name[11:13]}:{name[13:15]}:{name[15:17]}"
+        for name in aac_filenames
+    )
+
+
+def join_segment_text(segments):
+    return " ".join(segment.text.strip().replace("|", " ") for segment in segments)
+
+
+def segment_time_str(value):
+    return "" if value is None else str(value)
+
+
+def load_day_utterances(dir_path, json_filenames):
+    """
+    Reads the given WhisperX JSONs from a day directory and returns their valid utterances.
+    """
+    results = []
+    for filename in json_filenames:
+        if filename.endswith(".json"):
+            results.append(
+                (filename, read_whisperx_result(os.path.join(dir_path, filename)))
+            )
+
+    utc_times = local_times_to_utc(result.utteranceTime for _, result in results)
+
+    utterances = []
+    for (filename, result), utc_dt in zip(results, utc_times):
+        text = join_segment_text(result.segments)
+        if is_invalid_utterance(text):
+            continue
+
+        segments = result.segments
+        utterances.append(
+            Utterance(
+                utc=utc_dt,
+                utteranceTime=utc_dt.strftime("%H:%M:%S"),
+                filename=filename.replace(".json", ".aac"),
+                start=segment_time_str(segments[0].start) if segments else "",
+                end=segment_time_str(segments[-1].end) if segments else "",
+                language=result.language,
+                text=text,
+                textOriginalLang=join_segment_text(result.origLangSegments),
+                aacFilename=result.filename,
+            )
+        )
+    return utterances
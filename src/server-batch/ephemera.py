@@ -0,0 +1,85 @@
+import os
+import json
+from datetime import datetime
+from output_files import write_json_if_changed
+
+# The TLE archive written by 8_make_s3_ephemera.py. Each month is one compact columnar file,
+# sorted by epoch with one element set per epoch, padded with a day either side:
+#   ephemera/2023/2023-11.json
+#     {"epoch": ["2023-10-31T02:00:00.000Z", ...], "tle_line1": [...], "tle_line2": [...]}
+# Epochs are fixed-width ISO 8601 UTC strings, so they sort as text. The element set that applies
+# at a time is the one with the closest epoch (see nearest_tle_indexes in orbit.py).
+#   ephemera/index.json
+#     {"2023-11": {"first": epoch, "last": epoch, "count": n}, ...}
+# lists every month in the archive with its epoch range.
+
+EPHEMERA_INDEX_FILENAME = "index.json"
+
+
+def get_month_path(ephemera_dir, month_str):
+    return os.path.join(ephemera_dir, month_str[:4], f"{month_str}.json")
+
+
+def format_epoch(dt):
+    """
+    Formats a UTC datetime like the archive's epochs, to the millisecond.
+    """
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{dt.microsecond // 1000:03d}Z"
+
+
+def parse_epoch(epoch):
+    return datetime.fromisoformat(epoch.replace("Z", "+00:00"))
+
+
+def read_ephemera_month(path):
+    """
+    Returns the month's columns. Month files written before the columnar format (a list of
+    {epoch, tle_line1, tle_line2} records) are read into the same columns.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        month = json.load(f)
+    if isinstance(month, list):
+        month = sorted(month, key=lambda tle: tle["epoch"])
+        return {
+            "epoch": [tle["epoch"] for tle in month],
+            "tle_line1": [tle["tle_line1"] for tle in month],
+            "tle_line2": [tle["tle_line2"] for tle in month],
+        }
+    return month
+
+
+def write_ephemera_month(path, columns):
+    """
+    Writes the month compactly, only if its content changed. Returns True if it was written.
+    """
+    return write_json_if_changed(
+        path,
+        {
+            "epoch": columns["epoch"],
+            "tle_line1": columns["tle_line1"],
+            "tle_line2": columns["tle_line2"],
+        },
+    )
+
+
+def write_ephemera_index(ephemera_dir):
+    """
+    Rebuilds index.json from the month files. Returns the index.
+    """
+    index = {}
+    for year in sorted(os.listdir(ephemera_dir)):
+        year_dir = os.path.join(ephemera_dir, year)
+        if not os.path.isdir(year_dir):
+            continue
+        for filename in sorted(os.listdir(year_dir)):
+            if not filename.endswith(".json"):
+                continue
+            epochs = read_ephemera_month(os.path.join(year_dir, filename))["epoch"]
+            if epochs:
+                index[filename[:-5]] = {
+                    "first": epochs[0],
+                    "last": epochs[-1],
+                    "count": len(epochs),
+                }
+    write_json_if_changed(os.path.join(ephemera_dir, EPHEMERA_INDEX_FILENAME), index)
+    return index
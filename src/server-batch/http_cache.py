@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import hashlib
+from urllib.parse import urlencode, urlparse
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from http_client import client
+
+# On-disk HTTP cache shared by the scraping stages. Each successful GET is stored in
+# HTTP_CACHE_DIR as <key>.body plus <key>.json (url, headers, storedAt), keyed by the URL and
+# query parameters. Within a host's TTL the stored response is returned without touching the
+# network. After it, the request is revalidated with If-None-Match / If-Modified-Since and a
+# 304 just refreshes storedAt.
+#
+# Set HTTP_CACHE_OFFLINE=1 to replay only from the cache, e.g. to test parser changes without
+# network access. Requests that were never cached then raise requests.ConnectionError.
+
+DEFAULT_TTL_SECONDS = 60 * 60
+HOST_TTL_SECONDS = {
+    "en.wikipedia.org": 6 * 60 * 60,
+    "commons.wikimedia.org": 7 * 24 * 60 * 60,
+    "www.nasa.gov": 24 * 60 * 60,
+    "blogs.nasa.gov": 24 * 60 * 60,
+    "ares-iss-in-real-time.s3.us-gov-west-1.amazonaws.com": 24 * 60 * 60,
+}
+STORED_HEADERS = ["Content-Type", "ETag", "Last-Modified"]
+
+
+# The settings are read on each call rather than at import, because the stages import this module
+# before load_dotenv() has loaded .env
+def get_cache_dir():
+    return os.getenv("HTTP_CACHE_DIR", "http_cache")
+
+
+def is_offline():
+    return os.getenv("HTTP_CACHE_OFFLINE", "") not in ["", "0"]
+
+
+def get_cache_key(url, params=None):
+    if params:
+        url = f"{url}?{urlencode(sorted(params.items()))}"
+    return url, hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def get_ttl(url):
+    return HOST_TTL_SECONDS.get(urlparse(url).hostname, DEFAULT_TTL_SECONDS)
+
+
+def read_entry(key):
+    meta_path = os.path.join(get_cache_dir(), f"{key}.json")
+    body_path = os.path.join(get_cache_dir(), f"{key}.body")
+    if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+        return None, None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    with open(body_path, "rb") as f:
+        return meta, f.read()
+
+
+def write_entry(key, meta, body=None):
+    cache_dir = get_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    if body is not None:
+        with open(os.path.join(cache_dir, f"{key}.body"), "wb") as f:
+            f.write(body)
+    with open(os.path.join(cache_dir, f"{key}.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=4)
+
+
+def build_response(meta, body):
+    """
+    Rebuilds a requests.Response from a cache entry so callers can use .text, .json() etc.
+    """
+    response = requests.Response()
+    response.status_code = 200
+    response.url = meta["url"]
+    response.headers = CaseInsensitiveDict(meta["headers"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = body
+    response.from_cache = True
+    return response
+
+
+def cached_get(url, params=None, ttl=None, **kwargs):
+    """
+    GET through the on-disk cache. ttl overrides the host's TTL in seconds.
+    """
+    full_url, key = get_cache_key(url, params)
+    meta, body = read_entry(key)
+    if ttl is None:
+        ttl = get_ttl(url)
+
+    offline = is_offline()
+    if meta is not None and (offline or time.time() - meta["storedAt"] < ttl):
+        return build_response(meta, body)
+    if offline:
+        raise requests.ConnectionError(f"{full_url} is not in the HTTP cache (offline)")
+
+    headers = dict(kwargs.pop("headers", {}))
+    if meta is not None:
+        if "ETag" in meta["headers"]:
+            headers["If-None-Match"] = meta["headers"]["ETag"]
+        if "Last-Modified" in meta["headers"]:
+            headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+    response = client.get(url, params=params, headers=headers, **kwargs)
+    if response.status_code == 304 and meta is not None:
+        meta["storedAt"] = time.time()
+        write_entry(key, meta)
+        return build_response(meta, body)
+
+    response.from_cache = False
+    if response.status_code == 200:
+        meta = {
+            "url": full_url,
+            "headers": {
+                name: response.headers[name]
+                for name in STORED_HEADERS
+                if name in response.headers
+            },
+            "storedAt": time.time(),
+        }
+        write_entry(key, meta, response.content)
+    return response
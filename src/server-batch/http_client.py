@@ -0,0 +1,143 @@
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+# Pooled, rate-limited HTTP client shared by the batch scripts. Every request goes through a
+# per-host limiter that caps how many requests are in flight and how often they start, so
+# client.map() can fan out many independent requests across threads and stay within each
+# API's limits. Connection errors and 429/5xx responses are retried with jittered exponential
+# backoff, honouring Retry-After when the server sends it.
+
+# host: (max concurrent requests, max requests per second[, max requests per hour])
+HOST_LIMITS = {
+    "www.googleapis.com": (8, 10.0),
+    # Space-Track allows 30 requests per minute and 300 per hour
+    "www.space-track.org": (1, 0.4, 300),
+    "eol.jsc.nasa.gov": (4, 4.0),
+    "en.wikipedia.org": (4, 5.0),
+    "commons.wikimedia.org": (4, 5.0),
+    "www.nasa.gov": (4, 4.0),
+    "blogs.nasa.gov": (2, 2.0),
+}
+DEFAULT_HOST_LIMIT = (4, 4.0)
+
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+POOL_SIZE = 16
+USER_AGENT = "ares-iss-in-real-time-batch/1.0"
+
+
+class HostLimiter:
+    def __init__(self, max_concurrent, per_second, per_hour=None):
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.interval = 1.0 / per_second
+        self.per_hour = per_hour
+        # Start times of the last per_hour requests, oldest first
+        self.hour_starts = deque()
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            if self.per_hour and len(self.hour_starts) == self.per_hour:
+                # Wait until the oldest of them is an hour old
+                start = max(start, self.hour_starts.popleft() + 3600)
+            if self.per_hour:
+                self.hour_starts.append(start)
+            self.next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.semaphore.release()
+
+
+class HttpClient:
+    def __init__(self, host_limits=None, max_retries=MAX_RETRIES):
+        self.host_limits = dict(HOST_LIMITS, **(host_limits or {}))
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.limiters = {}
+        self.limiters_lock = threading.Lock()
+
+    def get_limiter(self, url):
+        host = urlparse(url).hostname
+        with self.limiters_lock:
+            if host not in self.limiters:
+                self.limiters[host] = HostLimiter(
+                    *self.host_limits.get(host, DEFAULT_HOST_LIMIT)
+                )
+            return self.limiters[host]
+
+    def get_backoff(self, attempt, response=None):
+        retry_after = (
+            response.headers.get("Retry-After") if response is not None else None
+        )
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        # Full jitter, so parallel workers that failed together don't retry together
+        return random.uniform(
+            0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+        )
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a request within the host's limits, retrying transient failures. Returns the last
+        response, or raises the last connection error once retries are exhausted.
+        """
+        kwargs.setdefault("timeout", 60)
+        limiter = self.get_limiter(url)
+        for attempt in range(self.max_retries + 1):
+            try:
+                with limiter:
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.get_backoff(attempt)
+                print(f"{method} {url} failed ({e}), retrying in {delay:.1f}s")
+            else:
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt == self.max_retries
+                ):
+                    return response
+                delay = self.get_backoff(attempt, response)
+                print(
+                    f"{method} {url} returned {response.status_code}, "
+                    f"retrying in {delay:.1f}s"
+                )
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def map(self, fn, items, max_workers=POOL_SIZE):
+        """
+        Runs fn over items on a thread pool and returns the results in order. The host limiters
+        decide how many of the requests actually run at once.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(fn, items))
+
+
+# Shared client for scripts that don't need their own session
+client = HttpClient()
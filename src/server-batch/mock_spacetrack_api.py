@@ -0,0 +1,134 @@
+import argparse
+import secrets
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+import json
+
+# Local stand-in for the Space-Track login and TLE query used by 8_make_s3_ephemera.py:
+#   python mock_spacetrack_api.py [--tles-per-day 4] [--port 8091]
+#   SPACETRACK_URL=http://127.0.0.1:8091 python 8_make_s3_ephemera.py
+# It serves synthetic but well-formed ISS TLEs (valid checksums, a plausible orbit) for any
+# EPOCH range, so the files it produces can also be propagated. Queries without a logged-in
+# session cookie get a 401. Every fifth epoch is published twice, the second time with a newer
+# FILE number, like Space-Track's corrected element sets. Logins and queries are counted and
+# printed so tests can check query coalescing and session reuse.
+
+SESSION_COOKIE = "chocolatechip"
+MEAN_MOTION = 15.50  # revolutions per day
+RAAN_RATE = -5.0  # degrees per day of nodal precession
+
+
+def tle_checksum(line):
+    return sum(int(c) if c.isdigit() else c == "-" for c in line[:68]) % 10
+
+
+def make_tle(epoch, element_number):
+    """
+    Returns (line1, line2) for a synthetic ISS element set at epoch.
+    """
+    days = (epoch - datetime(2000, 1, 1)).total_seconds() / 86400
+    day_of_year = (epoch - datetime(epoch.year, 1, 1)).total_seconds() / 86400 + 1
+    raan = (247.46 + RAAN_RATE * days) % 360
+    mean_anomaly = (325.03 + MEAN_MOTION * 360 * days) % 360
+    revolution = int(MEAN_MOTION * days) % 100000
+    line1 = (
+        f"1 25544U 98067A   {epoch.year % 100:02d}{day_of_year:012.8f} "
+        f" .00016717  00000-0  30149-3 0 {element_number % 10000:4d}"
+    )
+    line2 = (
+        f"2 25544  51.6416 {raan:8.4f} 0006703 130.5360 {mean_anomaly:8.4f} "
+        f"{MEAN_MOTION:11.8f}{revolution:5d}"
+    )
+    return line1 + str(tle_checksum(line1)), line2 + str(tle_checksum(line2))
+
+
+def generate_tles(start_date, end_date, tles_per_day):
+    start = datetime.strptime(start_date[:10], "%Y-%m-%d")
+    end = datetime.strptime(end_date[:10], "%Y-%m-%d")
+    step = timedelta(days=1) / tles_per_day
+    # Offset the epochs from midnight like real element sets
+    epoch = start + step / 3
+    tles = []
+    while epoch <= end:
+        element_number = int((epoch - datetime(2000, 1, 1)) / step)
+        for correction in range(2 if element_number % 5 == 0 else 1):
+            line1, line2 = make_tle(epoch, element_number + correction)
+            tles.append(
+                {
+                    "NORAD_CAT_ID": "25544",
+                    "EPOCH": epoch.strftime("%Y-%m-%d %H:%M:%S"),
+                    "FILE": str(element_number * 2 + correction),
+                    "ELEMENT_SET_NO": str(element_number % 1000 + correction),
+                    "TLE_LINE0": "0 ISS (ZARYA)",
+                    "TLE_LINE1": line1,
+                    "TLE_LINE2": line2,
+                }
+            )
+        epoch += step
+    return tles
+
+
+def make_handler(tles_per_day, counts, sessions):
+    class MockSpaceTrackHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            form = parse_qs(self.rfile.read(length).decode("utf-8"))
+            if not self.path.startswith("/ajaxauth/login"):
+                self.send_body(404, "Not found")
+                return
+            counts["login"] = counts.get("login", 0) + 1
+            if not form.get("identity") or not form.get("password"):
+                self.send_body(
+                    200, json.dumps({"error": "Failed: missing credentials"})
+                )
+                return
+            token = secrets.token_hex(16)
+            sessions.add(token)
+            self.send_body(200, '""', cookie=token)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [unquote(part) for part in url.path.strip("/").split("/")]
+            if parts[:3] != ["basicspacedata", "query", "class"]:
+                self.send_body(404, "Not found")
+                return
+            counts["query"] = counts.get("query", 0) + 1
+            cookie = self.headers.get("Cookie", "")
+            token = cookie.split(f"{SESSION_COOKIE}=")[-1].split(";")[0]
+            if f"{SESSION_COOKIE}=" not in cookie or token not in sessions:
+                self.send_body(401, "Unauthorized")
+                return
+            predicates = dict(zip(parts[2::2], parts[3::2]))
+            start_date, end_date = predicates["EPOCH"].split("--")
+            limit = int(predicates.get("limit", 100000))
+            tles = generate_tles(start_date, end_date, tles_per_day)[:limit]
+            self.send_body(200, json.dumps(tles))
+
+        def send_body(self, status, body, cookie=None):
+            content = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            if cookie:
+                self.send_header("Set-Cookie", f"{SESSION_COOKIE}={cookie}; Path=/")
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            print(f"{self.path.split('?')[0]} requests: {counts}")
+
+    return MockSpaceTrackHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock Space-Track API server.")
+    parser.add_argument("--tles-per-day", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8091)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", args.port), make_handler(args.tles_per_day, {}, set())
+    )
+    print(f"Mock Space-Track API on port {args.port}")
+    server.serve_forever()
@@ -0,0 +1,131 @@
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for the two YouTube Data API endpoints used by 5_get_youtube_live_recordings.py,
+# serving videos from a fixture file:
+#   python mock_youtube_api.py fixture.json [--generate 1200]
+#   YOUTUBE_API_URL=http://127.0.0.1:8090 python 5_get_youtube_live_recordings.py
+# The fixture is a list of {"videoId", "publishedAt", "title", "duration"} (ISO 8601 duration).
+# Request counts are printed so tests can check batching and the watermark.
+
+SAMPLE_TITLES = [
+    "Spacewalk {n} at the International Space Station",
+    "Space Station Crew News Conference {n}",
+    "Expedition {n} Crew Launches to the Space Station",
+    "ISS Expedition {n} Docking",
+    "Artemis Update {n}",
+    "James Webb Space Telescope Briefing {n}",
+]
+
+
+def generate_fixture(count):
+    start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    videos = []
+    for n in range(count):
+        published = start + timedelta(hours=n * 61)
+        videos.append(
+            {
+                "videoId": f"vid{n:07d}",
+                "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "title": random.choice(SAMPLE_TITLES).format(n=n),
+                "duration": f"PT{random.randint(0, 8)}H{random.randint(0, 59)}M{random.randint(0, 59)}S",
+            }
+        )
+    return videos
+
+
+def make_handler(videos, counts):
+    by_id = {video["videoId"]: video for video in videos}
+
+    class MockYouTubeHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            endpoint = url.path.rstrip("/").split("/")[-1]
+            counts[endpoint] = counts.get(endpoint, 0) + 1
+
+            if endpoint == "search":
+                matches = sorted(
+                    (
+                        video
+                        for video in videos
+                        if video["publishedAt"] > params.get("publishedAfter", "")
+                    ),
+                    key=lambda video: video["publishedAt"],
+                    reverse=True,
+                )
+                offset = int(params.get("pageToken", 0))
+                page_size = int(params.get("maxResults", 5))
+                body = {
+                    "items": [
+                        {
+                            "id": {"videoId": video["videoId"]},
+                            "snippet": {
+                                "publishedAt": video["publishedAt"],
+                                "title": video["title"],
+                            },
+                        }
+                        for video in matches[offset : offset + page_size]
+                    ]
+                }
+                if offset + page_size < len(matches):
+                    body["nextPageToken"] = str(offset + page_size)
+            elif endpoint == "videos":
+                ids = params.get("id", "").split(",")
+                if len(ids) > 50:
+                    self.send_json(400, {"error": {"message": "Too many ids"}})
+                    return
+                body = {
+                    "items": [
+                        {
+                            "id": video_id,
+                            "contentDetails": {"duration": by_id[video_id]["duration"]},
+                        }
+                        for video_id in ids
+                        if video_id in by_id
+                    ]
+                }
+            else:
+                self.send_json(404, {"error": {"message": "Not found"}})
+                return
+            self.send_json(200, body)
+
+        def send_json(self, status, body):
+            content = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            print(f"{self.path.split('?')[0]} requests: {counts}")
+
+    return MockYouTubeHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock YouTube Data API server.")
+    parser.add_argument("fixture", type=str, help="JSON list of videos")
+    parser.add_argument(
+        "--generate",
+        type=int,
+        default=None,
+        help="Write this many synthetic videos to the fixture first",
+    )
+    parser.add_argument("--port", type=int, default=8090)
+    args = parser.parse_args()
+
+    if args.generate:
+        with open(args.fixture, "w", encoding="utf-8") as f:
+            json.dump(generate_fixture(args.generate), f, indent=4)
+    with open(args.fixture, "r", encoding="utf-8") as f:
+        videos = json.load(f)
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(videos, {}))
+    print(f"Mock YouTube API serving {len(videos):,} videos on port {args.port}")
+    server.serve_forever()
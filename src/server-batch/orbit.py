@@ -0,0 +1,211 @@
+import os
+import numpy as np
+from sgp4.api import Satrec
+from ephemera import get_month_path, read_ephemera_month
+
+# ISS position from the ephemera TLEs, for whole arrays of times at once. Each time is propagated
+# with the TLE whose epoch is closest to it, using sgp4's vectorized Satrec.sgp4_array once per
+# TLE. Positions come out of SGP4 in the TEME frame. They are rotated into the Earth-fixed frame
+# by Greenwich mean sidereal time and converted to WGS84 geodetic coordinates. Polar motion is
+# ignored, which moves the ground track by well under 100 m.
+#
+# The sun's direction uses the Astronomical Almanac's low-precision formulae (about 0.01 degree
+# over 1950-2050). The ISS counts as sunlit unless it is inside the Earth's cylindrical shadow.
+#
+# Example, lat/lon/alt/sunlit every minute of a day:
+#   tles = load_tles(EPHEMERA_DIR, ["2023-11"])
+#   times = np.datetime64("2023-11-01") + np.arange(1440) * np.timedelta64(60, "s")
+#   track = ground_track(tles, times)
+
+EARTH_RADIUS_KM = 6378.137
+WGS84_FLATTENING = 1 / 298.257223563
+UNIX_EPOCH_JD = 2440587.5
+
+
+class Tles:
+    """
+    The TLEs of one or more ephemera months, sorted by epoch with duplicate epochs removed.
+    """
+
+    def __init__(self, satrecs):
+        by_epoch = {
+            satrec.jdsatepoch + satrec.jdsatepochF: satrec for satrec in satrecs
+        }
+        self.epochs = np.array(sorted(by_epoch))
+        self.satrecs = [by_epoch[epoch] for epoch in self.epochs]
+
+    def __len__(self):
+        return len(self.satrecs)
+
+
+def load_tles(ephemera_dir, months):
+    satrecs = []
+    for month_str in months:
+        path = get_month_path(ephemera_dir, month_str)
+        if os.path.exists(path):
+            columns = read_ephemera_month(path)
+            satrecs.extend(
+                Satrec.twoline2rv(line1, line2)
+                for line1, line2 in zip(columns["tle_line1"], columns["tle_line2"])
+            )
+    return Tles(satrecs)
+
+
+def get_months(start, end):
+    """
+    The ephemera months from datetime64 start to end inclusive, as the YYYY-MM strings
+    load_tles expects.
+    """
+    months = np.arange(start.astype("datetime64[M]"), end.astype("datetime64[M]") + 1)
+    return tuple(str(month) for month in months)
+
+
+def to_julian(times):
+    """
+    Splits datetime64 UTC times into the whole and fractional Julian dates sgp4 expects.
+    """
+    days = times.astype("datetime64[us]").astype(np.int64) / 86400e6
+    whole = np.floor(days)
+    return whole + UNIX_EPOCH_JD, days - whole
+
+
+def nearest_tle_indexes(epochs, jd):
+    """
+    Index of the closest-epoch TLE for each Julian date.
+    """
+    after = np.clip(np.searchsorted(epochs, jd), 1, len(epochs) - 1)
+    before = after - 1
+    return np.where(jd - epochs[before] <= epochs[after] - jd, before, after)
+
+
+def propagate(tles, jd, fr):
+    """
+    Returns the TEME positions (n, 3) in km and a mask of the times SGP4 propagated without
+    error.
+    """
+    positions = np.full((len(jd), 3), np.nan)
+    if len(tles) == 1:
+        indexes = np.zeros(len(jd), dtype=np.int64)
+    else:
+        indexes = nearest_tle_indexes(tles.epochs, jd + fr)
+    for index in np.unique(indexes):
+        selected = indexes == index
+        errors, r, v = tles.satrecs[index].sgp4_array(jd[selected], fr[selected])
+        r[errors != 0] = np.nan
+        positions[selected] = r
+    return positions, ~np.isnan(positions[:, 0])
+
+
+def gmst(jd, fr):
+    """
+    Greenwich mean sidereal time in radians (IAU 1982, as used with TEME).
+    """
+    t = (jd - 2451545.0 + fr) / 36525
+    seconds = (
+        -6.2e-6 * t**3
+        + 0.093104 * t**2
+        + (876600 * 3600 + 8640184.812866) * t
+        + 67310.54841
+    )
+    return np.radians(seconds / 240) % (2 * np.pi)
+
+
+def teme_to_geodetic(positions, jd, fr):
+    """
+    Returns WGS84 latitude and longitude in degrees and altitude in km.
+    """
+    theta = gmst(jd, fr)
+    x = positions[:, 0] * np.cos(theta) + positions[:, 1] * np.sin(theta)
+    y = -positions[:, 0] * np.sin(theta) + positions[:, 1] * np.cos(theta)
+    z = positions[:, 2]
+
+    # Bowring's method, accurate to millimetres at orbital altitudes
+    a = EARTH_RADIUS_KM
+    b = a * (1 - WGS84_FLATTENING)
+    e2 = WGS84_FLATTENING * (2 - WGS84_FLATTENING)
+    ep2 = e2 / (1 - e2)
+    p = np.hypot(x, y)
+    beta = np.arctan2(z * a, p * b)
+    lat = np.arctan2(z + ep2 * b * np.sin(beta) ** 3, p - e2 * a * np.cos(beta) ** 3)
+    n = a / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+    alt = p / np.cos(lat) - n
+    return np.degrees(lat), np.degrees(np.arctan2(y, x)), alt
+
+
+def sun_ecliptic(jd, fr):
+    """
+    Returns the sun's ecliptic longitude and the obliquity of the ecliptic, in radians.
+    """
+    n = jd - 2451545.0 + fr
+    mean_longitude = np.radians(280.460 + 0.9856474 * n)
+    mean_anomaly = np.radians(357.528 + 0.9856003 * n)
+    longitude = (
+        mean_longitude
+        + np.radians(1.915) * np.sin(mean_anomaly)
+        + np.radians(0.020) * np.sin(2 * mean_anomaly)
+    )
+    obliquity = np.radians(23.439 - 0.0000004 * n)
+    return longitude, obliquity
+
+
+def sun_direction(jd, fr):
+    """
+    Unit vectors (n, 3) towards the sun in the equatorial frame of date.
+    """
+    longitude, obliquity = sun_ecliptic(jd, fr)
+    return np.column_stack(
+        [
+            np.cos(longitude),
+            np.cos(obliquity) * np.sin(longitude),
+            np.sin(obliquity) * np.sin(longitude),
+        ]
+    )
+
+
+def subsolar_point(jd, fr):
+    """
+    Latitude and longitude in degrees of the point with the sun at the zenith.
+    """
+    longitude, obliquity = sun_ecliptic(jd, fr)
+    declination = np.arcsin(np.sin(obliquity) * np.sin(longitude))
+    right_ascension = np.arctan2(
+        np.cos(obliquity) * np.sin(longitude), np.cos(longitude)
+    )
+    lon = (right_ascension - gmst(jd, fr) + np.pi) % (2 * np.pi) - np.pi
+    return np.degrees(declination), np.degrees(lon)
+
+
+def shadow_margin(positions, sun):
+    """
+    Distance in km from the edge of the Earth's cylindrical shadow: positive when sunlit,
+    negative inside the shadow. It changes sign smoothly at orbital sunrise and sunset.
+    """
+    along = np.einsum("ij,ij->i", positions, sun)
+    across = np.linalg.norm(positions - along[:, None] * sun, axis=1)
+    # The shadow only extends away from the sun, so the sunward side is always sunlit
+    return np.where(
+        along > 0, np.maximum(along, across - EARTH_RADIUS_KM), across - EARTH_RADIUS_KM
+    )
+
+
+def is_sunlit(positions, sun):
+    """
+    False inside the Earth's cylindrical shadow.
+    """
+    return shadow_margin(positions, sun) > 0
+
+
+def ground_track(tles, times):
+    """
+    Returns {"lat", "lon", "alt", "sunlit", "valid"} arrays for datetime64 UTC times.
+    """
+    jd, fr = to_julian(times)
+    positions, valid = propagate(tles, jd, fr)
+    lat, lon, alt = teme_to_geodetic(positions, jd, fr)
+    return {
+        "lat": lat,
+        "lon": lon,
+        "alt": alt,
+        "sunlit": is_sunlit(positions, sun_direction(jd, fr)),
+        "valid": valid,
+    }
@@ -0,0 +1,34 @@
+import os
+import json
+
+# Writes the artifacts the stages publish into the S3 folder. Files are written compactly as
+# UTF-8, without newline translation, and only when their content changes. Unchanged files then
+# keep their mtimes, which the incremental stages compare, and keep their published hashes (see
+# 12_publish_s3_static.py).
+
+
+def to_compact_json(data):
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def write_if_changed(output_path, content, touch=False):
+    """
+    Writes the text only if it differs from the file. Returns True if it was written. With
+    touch, an unchanged file's mtime is updated so it reads as up to date.
+    """
+    if os.path.exists(output_path):
+        with open(output_path, "r", encoding="utf-8", newline="") as f:
+            if f.read() == content:
+                if touch:
+                    os.utime(output_path)
+                return False
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        f.write(content)
+    return True
+
+
+def write_json_if_changed(output_path, data, touch=False):
+    return write_if_changed(output_path, to_compact_json(data), touch)
@@ -0,0 +1,96 @@
+import os
+import re
+import gzip
+import json
+
+# Static full-text search index over the transcript CSVs, built by 14_make_s3_search_index.py into
+# the 'search' directory on S3 next to 'comm'. It is an inverted index sharded by year and by the
+# first two characters of each term, one gzipped JSON file per shard:
+#   search/index.json                 {"years": {"2019": [shard ids...], ...}}
+#   search/2019/<shard id>.json.gz    {term: [["2019-01-29T06:05:13Z", channel, filename], ...]}
+# Each posting starts with the utterance's UTC time, so postings sort in time order and date
+# ranges are UTC dates. Years are those of the local (America/Chicago) comm folders, so a
+# folder year's shards can hold utterances from the first hours of the next UTC year.
+# The shard id is the hex of the UTF-8 bytes of the term's first two characters, so any client
+# can compute it. Both the English text and the original-language text are indexed.
+
+TOKEN_PATTERN = re.compile(r"\w+")
+MIN_TERM_LENGTH = 2
+SHARD_PREFIX_LENGTH = 2
+SEARCH_INDEX_FILENAME = "index.json"
+
+
+def tokenize(text):
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) >= MIN_TERM_LENGTH
+    ]
+
+
+def get_shard_id(term):
+    return term[:SHARD_PREFIX_LENGTH].encode("utf-8").hex()
+
+
+def get_shard_path(search_dir, year, shard_id):
+    return os.path.join(search_dir, str(year), f"{shard_id}.json.gz")
+
+
+def read_shard(search_dir, year, shard_id):
+    shard_path = get_shard_path(search_dir, year, shard_id)
+    if not os.path.exists(shard_path):
+        return {}
+    with gzip.open(shard_path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_shard(search_dir, year, shard_id, postings):
+    shard_path = get_shard_path(search_dir, year, shard_id)
+    os.makedirs(os.path.dirname(shard_path), exist_ok=True)
+    content = json.dumps(postings, separators=(",", ":"), ensure_ascii=False)
+    with open(shard_path, "wb") as f:
+        f.write(gzip.compress(content.encode("utf-8"), compresslevel=9, mtime=0))
+
+
+def read_search_index(search_dir):
+    with open(os.path.join(search_dir, SEARCH_INDEX_FILENAME), "r") as f:
+        return json.load(f)
+
+
+def search(search_dir, query, start_date=None, end_date=None):
+    """
+    Returns the postings [utc time, channel, filename] of utterances containing every term of
+    the query, in time order, optionally limited to a range of UTC dates (YYYY-MM-DD).
+    """
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return []
+
+    years = read_search_index(search_dir)["years"]
+    results = []
+    for year, shard_ids in sorted(years.items()):
+        # A folder year also covers the first hours of the next UTC year
+        if (start_date and int(year) + 1 < int(start_date[:4])) or (
+            end_date and year > end_date[:4]
+        ):
+            continue
+        matches = None
+        shards = {}
+        for term in terms:
+            shard_id = get_shard_id(term)
+            if shard_id not in shard_ids:
+                matches = set()
+                break
+            if shard_id not in shards:
+                shards[shard_id] = read_shard(search_dir, year, shard_id)
+            postings = set(tuple(p) for p in shards[shard_id].get(term, []))
+            matches = postings if matches is None else matches & postings
+            if not matches:
+                break
+        results.extend(
+            posting
+            for posting in matches or []
+            if (not start_date or posting[0][:10] >= start_date)
+            and (not end_date or posting[0][:10] <= end_date)
+        )
+    return sorted(results)
@@ -1,99 +1,362 @@
 import os
 import json
-import csv
-import re
-import shutil
-from datetime import datetime
-from zoneinfo import ZoneInfo
+import argparse
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 import pycountry
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from comm_audio import (
+    get_day_audio_index_filename,
+    read_day_durations,
+    utterance_duration,
+)
+from comm_corpus import open_corpus
+from comm_transcripts import channel_from_filename
+from output_files import write_json_if_changed
 
 # Load environment variables from .env file
 load_dotenv(dotenv_path="../../.env")
 
+# Corpus statistics over the daily transcript CSVs. Per-day aggregates are cached in STATS_CACHE
+# keyed by the transcript's content hash, so only new or changed days are read again; those are
+# scanned in parallel. The merged totals plus per-month and per-channel time series are written
+# to stats.json at the root of S3. Audio seconds are counted per utterance as in
+# comm_audio.utterance_duration, from the day's audio index where there is one.
+#
+# With --dataset the same statistics are computed from the columnar corpus built by
+# 13_make_comm_corpus.py instead, whose duration column uses the same definition, and written to
+# the same stats.json. With --start or --end they are only printed, so a partial range never
+# replaces the published stats.
+
 COMM_S3 = os.getenv("S3_FOLDER") + "comm/"
 AVAILABLE_DATES_S3 = os.getenv("S3_FOLDER") + "/available_dates.json"
+STATS_S3 = os.getenv("S3_FOLDER") + "stats.json"
+STATS_CACHE = "stats_cache.json"
 
-# Remove LANGUAGE_CODES mapping
 
-if __name__ == "__main__":
-    # get dates available json in S3 root. Array of strings in format 2022-09-27
-    available_dates = []
-    if os.path.exists(AVAILABLE_DATES_S3):
-        with open(AVAILABLE_DATES_S3, "r") as f:
-            available_dates = json.load(f)
-
-    total_words = 0
-    days = 0
-    languages = set()
-    word_counts = {}
-    channel_word_counts = {}
-    for available_date in available_dates:
-        no_data = False
-        # print(f"Processing date: {available_date}")
-        [year, month, day] = available_date.split("-")
-        formatted_date = f"{year}-{month}-{day}"
-
-        # transcript csv path
-        transcriptPath = os.path.join(
-            COMM_S3,
-            year,
-            month,
-            day,
-            f"_transcript_{formatted_date}.csv",
+def new_aggregates():
+    return {
+        "utterances": 0,
+        "words": 0,
+        "audioSeconds": 0.0,
+        "languages": {},
+        "channels": {},
+    }
+
+
+def add_to_bucket(buckets, key, words, audio_seconds):
+    bucket = buckets.setdefault(key, {"utterances": 0, "words": 0, "audioSeconds": 0.0})
+    bucket["utterances"] += 1
+    bucket["words"] += words
+    bucket["audioSeconds"] += audio_seconds
+
+
+def aggregate_rows(rows, durations):
+    """
+    Aggregates (filename, end, language, text, textOriginalLang) rows into utterance, word and
+    audio second counts, in total and per language and per channel. durations are the day's
+    audio index durations by filename.
+    """
+    aggregates = new_aggregates()
+    for filename, end, language, text, textOriginalLang in rows:
+        if language == "en":
+            word_count = len(text.split())
+        else:
+            word_count = len(textOriginalLang.split())
+        audio_seconds = utterance_duration(durations, filename, end) or 0.0
+
+        aggregates["utterances"] += 1
+        aggregates["words"] += word_count
+        aggregates["audioSeconds"] += audio_seconds
+        add_to_bucket(aggregates["languages"], language, word_count, audio_seconds)
+        add_to_bucket(
+            aggregates["channels"],
+            channel_from_filename(filename),
+            word_count,
+            audio_seconds,
         )
+    return aggregates
+
+
+def read_transcript_rows(content):
+    for line in content.decode("utf-8").splitlines():
+        fields = line.split("|")
+        if len(fields) == 7:
+            time, filename, start, end, language, text, textOriginalLang = fields
+            yield filename, end, language, text, textOriginalLang
+
+
+def scan_day(date_str, transcript_path):
+    """
+    Reads one transcript CSV and its audio index. Returns (content hash, aggregates).
+    """
+    with open(transcript_path, "rb") as f:
+        content = f.read()
+    content_hash = hashlib.sha256(content).hexdigest()
+    durations = read_day_durations(os.path.dirname(transcript_path), date_str)
+    return content_hash, aggregate_rows(read_transcript_rows(content), durations)
+
+
+def get_audio_index_stat(transcript_path, date_str):
+    audio_index_path = os.path.join(
+        os.path.dirname(transcript_path), get_day_audio_index_filename(date_str)
+    )
+    if not os.path.exists(audio_index_path):
+        return None
+    stat = os.stat(audio_index_path)
+    return [stat.st_size, stat.st_mtime_ns]
 
-        if not os.path.exists(transcriptPath):
-            print(
-                f"Transcript for {available_date} does not exist. Skipping reading it call."
+
+def merge_aggregates(total, aggregates):
+    total["utterances"] += aggregates["utterances"]
+    total["words"] += aggregates["words"]
+    total["audioSeconds"] += aggregates["audioSeconds"]
+    for group in ["languages", "channels"]:
+        for key, bucket in aggregates[group].items():
+            total_bucket = total[group].setdefault(
+                key, {"utterances": 0, "words": 0, "audioSeconds": 0.0}
             )
+            for field in total_bucket:
+                total_bucket[field] += bucket[field]
+
+
+def update_day_aggregates(dates, cache):
+    """
+    Returns {date: aggregates} for every date with a transcript, reusing cached aggregates for
+    transcripts whose size and mtime, or failing that content hash, are unchanged and whose
+    audio index is unchanged.
+    """
+    day_aggregates = {}
+    to_scan = {}
+    for date_str in dates:
+        year, month, day = date_str.split("-")
+        transcript_path = os.path.join(
+            COMM_S3, year, month, day, f"_transcript_{date_str}.csv"
+        )
+        if not os.path.exists(transcript_path):
+            print(f"Transcript for {date_str} does not exist. Skipping reading it.")
             continue
+        stat = os.stat(transcript_path)
+        audio_index_stat = get_audio_index_stat(transcript_path, date_str)
+        cached = cache.get(date_str)
+        if (
+            cached
+            and [cached["size"], cached["mtimeNs"]] == [stat.st_size, stat.st_mtime_ns]
+            and cached.get("audioIndex", False) == audio_index_stat
+        ):
+            day_aggregates[date_str] = cached["aggregates"]
+        else:
+            to_scan[date_str] = (transcript_path, stat, audio_index_stat)
+
+    if to_scan:
+        print(f"Scanning {len(to_scan):,} new or changed transcripts...")
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(
+                scan_day, list(to_scan), [path for path, _, _ in to_scan.values()]
+            )
+            for (date_str, (_, stat, audio_index_stat)), (
+                content_hash,
+                aggregates,
+            ) in zip(to_scan.items(), results):
+                cached = cache.get(date_str)
+                if (
+                    cached
+                    and cached["hash"] == content_hash
+                    and cached.get("audioIndex", False) == audio_index_stat
+                ):
+                    # Touched but not changed
+                    aggregates = cached["aggregates"]
+                cache[date_str] = {
+                    "size": stat.st_size,
+                    "mtimeNs": stat.st_mtime_ns,
+                    "audioIndex": audio_index_stat,
+                    "hash": content_hash,
+                    "aggregates": aggregates,
+                }
+                day_aggregates[date_str] = aggregates
+    return day_aggregates
+
 
-        days += 1
-        with open(transcriptPath, "r", encoding="utf-8") as f:
-            rows = f.readlines()
-            for row in rows:
-                time, filename, start, end, language, text, textOriginalLang = (
-                    row.strip().split("|")
-                )
-
-                if language == "en":
-                    word_count = len(text.split())
-                else:
-                    word_count = len(textOriginalLang.split())
-                total_words += word_count
-
-                # look for strings like 1_SG_1 or 1_SG_2 in the filename, the last digit is the channel number
-                # filename format is 2019-01-29T020513-1_SG_1_IA.aac
-                # use regex to match 1_SG_? and get the last digit
-                pattern = re.compile(r"\d+_SG_(\d+)")
-                match = pattern.search(filename)
-                channel = match.group(1) if match else "unknown"
-
-                if channel in channel_word_counts:
-                    channel_word_counts[channel] += word_count
-                else:
-                    channel_word_counts[channel] = word_count
-
-                languages.add(language)
-                if language in word_counts:
-                    word_counts[language] += word_count
-                else:
-                    word_counts[language] = word_count
+def day_aggregates_from_corpus(start_date=None, end_date=None):
+    """
+    Computes the per-day aggregates from the columnar corpus in one grouped, vectorized pass.
+    Date bounds are pushed down to the year/month partitions and the date column.
+    """
+    condition = None
+    if start_date:
+        condition = (ds.field("year") >= int(start_date[:4])) & (
+            ds.field("date") >= start_date
+        )
+    if end_date:
+        end_condition = (ds.field("year") <= int(end_date[:4])) & (
+            ds.field("date") <= end_date
+        )
+        condition = end_condition if condition is None else condition & end_condition
+
+    table = open_corpus().to_table(
+        columns=[
+            "date",
+            "channel",
+            "language",
+            "duration",
+            "text",
+            "textOriginalLang",
+        ],
+        filter=condition,
+    )
+    language = pc.cast(table["language"], "string")
+    # Counted like str.split(): splitting keeps empty tokens at the ends and returns [""] for an
+    # empty string, so trim first and count empty text as no words
+    text = pc.utf8_trim_whitespace(
+        pc.if_else(pc.equal(language, "en"), table["text"], table["textOriginalLang"])
+    )
+    words = pc.if_else(
+        pc.equal(text, ""),
+        0,
+        pc.list_value_length(pc.utf8_split_whitespace(text)),
+    )
+    grouped = (
+        table.select(["date", "channel", "duration"])
+        .append_column("language", language)
+        .append_column("words", words)
+        .group_by(["date", "language", "channel"])
+        .aggregate([("words", "sum"), ("duration", "sum"), ("words", "count")])
+    )
 
+    day_aggregates = {}
+    for row in grouped.to_pylist():
+        aggregates = day_aggregates.setdefault(row["date"], new_aggregates())
+        bucket = {
+            "utterances": row["words_count"],
+            "words": row["words_sum"] or 0,
+            "audioSeconds": row["duration_sum"] or 0.0,
+        }
+        channel = "unknown" if row["channel"] is None else str(row["channel"])
+        merge_aggregates(
+            aggregates,
+            {
+                **bucket,
+                "languages": {row["language"]: bucket},
+                "channels": {channel: bucket},
+            },
+        )
+    return day_aggregates
+
+
+def build_stats(day_aggregates):
+    """
+    Merges per-day aggregates into totals and per-month and per-channel monthly series.
+    """
+    totals = new_aggregates()
+    months = {}
+    channel_months = {}
+    for date_str in sorted(day_aggregates):
+        aggregates = day_aggregates[date_str]
+        month_str = date_str[:7]
+        merge_aggregates(totals, aggregates)
+
+        month = months.setdefault(
+            month_str, {"days": 0, "utterances": 0, "words": 0, "audioSeconds": 0.0}
+        )
+        month["days"] += 1
+        for field in ["utterances", "words", "audioSeconds"]:
+            month[field] += aggregates[field]
+
+        for channel, bucket in aggregates["channels"].items():
+            channel_month = channel_months.setdefault(channel, {}).setdefault(
+                month_str, {"utterances": 0, "words": 0, "audioSeconds": 0.0}
+            )
+            for field in channel_month:
+                channel_month[field] += bucket[field]
+
+    return {
+        "days": len(day_aggregates),
+        "firstDate": min(day_aggregates) if day_aggregates else None,
+        "lastDate": max(day_aggregates) if day_aggregates else None,
+        "totals": totals,
+        "months": months,
+        "channelMonths": channel_months,
+    }
+
+
+def print_stats(stats):
+    totals = stats["totals"]
     # sort languages by word count
     word_counts = dict(
-        sorted(word_counts.items(), key=lambda item: item[1], reverse=True)
+        sorted(
+            ((lang, bucket["words"]) for lang, bucket in totals["languages"].items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
     )
 
-    print(f"Total days with transcripts: {days:,}")
+    print(f"Total days with transcripts: {stats['days']:,}")
     print(f"Channel word counts:")
-    for channel, count in channel_word_counts.items():
-        print(f"{channel}: {count:,}")
-    print(f"Total languages: {len(languages):,}")
-    print(f"Total words in all transcripts: {total_words:,}")
+    for channel, bucket in sorted(totals["channels"].items()):
+        print(f"{channel}: {bucket['words']:,}")
+    print(f"Total languages: {len(word_counts):,}")
+    print(f"Total utterances: {totals['utterances']:,}")
+    print(f"Total audio hours: {totals['audioSeconds'] / 3600:,.1f}")
+    print(f"Total words in all transcripts: {totals['words']:,}")
     print("Word counts per language:")
     for lang, count in word_counts.items():
         lang_obj = pycountry.languages.get(alpha_2=lang)
         full_lang = lang_obj.name if lang_obj else lang
         print(f"{full_lang} ({lang}): {count:,}")
+
+
+def write_stats(stats):
+    if write_json_if_changed(STATS_S3, stats):
+        print(f"Stats have been saved to {STATS_S3}")
+    else:
+        print(f"{STATS_S3} is unchanged")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compute transcript corpus statistics."
+    )
+    parser.add_argument(
+        "--dataset",
+        action="store_true",
+        help="Read the columnar corpus from 13_make_comm_corpus.py instead of the CSVs.",
+    )
+    parser.add_argument(
+        "--start", type=str, help="With --dataset: first YYYY-MM-DD, print only"
+    )
+    parser.add_argument(
+        "--end", type=str, help="With --dataset: last YYYY-MM-DD, print only"
+    )
+    args = parser.parse_args()
+
+    if args.dataset:
+        stats = build_stats(day_aggregates_from_corpus(args.start, args.end))
+        if args.start or args.end:
+            print("Date range given, so stats.json is not updated")
+        else:
+            write_stats(stats)
+    else:
+        # get dates available json in S3 root. Array of objects like {"date": "2022-09-27", ...}
+        available_dates = []
+        if os.path.exists(AVAILABLE_DATES_S3):
+            with open(AVAILABLE_DATES_S3, "r") as f:
+                available_dates = json.load(f)
+
+        cache = {}
+        if os.path.exists(STATS_CACHE):
+            with open(STATS_CACHE, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+
+        day_aggregates = update_day_aggregates(
+            [item["date"] for item in available_dates], cache
+        )
+
+        with open(STATS_CACHE, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+
+        stats = build_stats(day_aggregates)
+        write_stats(stats)
+
+    print_stats(stats)
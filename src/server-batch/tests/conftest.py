@@ -0,0 +1,27 @@
+import os
+import sys
+import importlib.util
+import pytest
+
+SERVER_BATCH_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_BATCH_DIR)
+
+# The stages build their paths from S3_FOLDER when they are imported
+os.environ.setdefault("S3_FOLDER", "s3/")
+os.environ.setdefault("SG_RAW_FOLDER", "sg_raw/")
+
+
+@pytest.fixture
+def load_stage():
+    """
+    Imports a numbered stage script, e.g. load_stage("15_make_s3_crew_roster.py").
+    """
+
+    def load(filename):
+        path = os.path.join(SERVER_BATCH_DIR, filename)
+        spec = importlib.util.spec_from_file_location(filename[:-3], path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
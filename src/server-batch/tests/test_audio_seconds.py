@@ -0,0 +1,51 @@
+import json
+import pytest
+import stats
+from comm_audio import get_day_audio_index_filename
+
+DATE = "2023-11-01"
+ROWS = [
+    # time|filename|start|end|language|text|textOriginalLang
+    "14:00:00|2023-11-01T090000-1_SG_1_IA.aac|0.0|4.5|en|Houston, Station|Houston, Station",
+    "14:01:00|2023-11-01T090100-1_SG_2_IA.aac|0.0|3.0|ru|privet|привет",
+    "14:02:00|2023-11-01T090200-1_SG_1_IA.aac|0.0|n/a|en|copy|copy",
+]
+
+
+def write_day(day_dir):
+    day_dir.mkdir(parents=True)
+    transcript_path = day_dir / f"_transcript_{DATE}.csv"
+    transcript_path.write_text("\n".join(ROWS) + "\n", encoding="utf-8")
+    # The index only covers the first utterance; the others fall back to the row's end
+    with open(day_dir / get_day_audio_index_filename(DATE), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "channels": {"1": f"_audio_{DATE}_SG_1.aac"},
+                "utterances": {
+                    "2023-11-01T090000-1_SG_1_IA.aac": [1, 0, 1000, 0.0, 5.12]
+                },
+            },
+            f,
+        )
+    return str(transcript_path)
+
+
+def test_every_stage_counts_the_same_audio_seconds(load_stage, tmp_path):
+    transcript_path = write_day(tmp_path / "2023" / "11" / "01")
+    expected = 5.12 + 3.0
+
+    _, aggregates = stats.scan_day(DATE, transcript_path)
+    assert aggregates["audioSeconds"] == expected
+    assert aggregates["channels"]["1"]["audioSeconds"] == 5.12
+
+    corpus_stage = load_stage("13_make_comm_corpus.py")
+    table = corpus_stage.build_day_table(DATE, transcript_path)
+    # The corpus stores durations as float32
+    assert table["duration"].to_pylist()[:2] == pytest.approx([5.12, 3.0])
+    assert table["duration"].to_pylist()[2] is None
+
+    catalog_stage = load_stage("7_make_s3_dates_available.py")
+    counts = catalog_stage.read_transcript_counts(
+        str(tmp_path / "2023" / "11" / "01"), DATE
+    )
+    assert counts["audioSeconds"] == round(expected, 1)
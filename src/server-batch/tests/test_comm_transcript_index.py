@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timezone
+
+
+def utc(value):
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+def row(utc_dt, text):
+    return f"{utc_dt:%H:%M:%S}|{utc_dt:%Y%m%d%H%M%S}_SG_1.aac|0.0|1.0|en|{text}|{text}"
+
+
+def read_index(load_stage, tmp_path, times):
+    stage = load_stage("3_make_s3_comm.py")
+    output_file = str(tmp_path / "transcript.csv")
+    index_file = str(tmp_path / "index.json")
+    keyed_rows = [(utc(t), row(utc(t), t)) for t in times]
+    stage.write_sorted_transcript(output_file, index_file, keyed_rows)
+    with open(index_file, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    with open(output_file, "rb") as f:
+        content = f.read()
+    return index, content
+
+
+def row_text_at(content, offset):
+    return content[offset:].split(b"\n", 1)[0].decode("utf-8").split("|")[5]
+
+
+def test_index_crosses_utc_midnight(load_stage, tmp_path):
+    # 2023-11-01 in Chicago runs from 05:00 UTC to 05:00 UTC the next day
+    times = [
+        "2023-11-02T00:00:30",
+        "2023-11-01T05:00:10",
+        "2023-11-01T23:59:50",
+        "2023-11-02T04:59:00",
+    ]
+    index, content = read_index(load_stage, tmp_path, times)
+
+    assert [minute for minute, _ in index["minutes"]] == [
+        "2023-11-01T05:00Z",
+        "2023-11-01T23:59Z",
+        "2023-11-02T00:00Z",
+        "2023-11-02T04:59Z",
+    ]
+    assert index["size"] == len(content)
+    for minute, offset in index["minutes"]:
+        assert row_text_at(content, offset).startswith(minute[:-1])
+
+
+def test_index_keeps_the_repeated_hour_of_the_fall_back_day(load_stage, tmp_path):
+    # 2023-11-05 in Chicago is 25 hours long, 05:00 UTC to 06:00 UTC the next day, so the
+    # 05:xx UTC hour occurs twice in the same day folder
+    times = [
+        "2023-11-05T05:30:00",
+        "2023-11-05T05:30:40",
+        "2023-11-05T06:30:00",
+        "2023-11-05T07:30:00",
+        "2023-11-06T05:30:00",
+    ]
+    index, content = read_index(load_stage, tmp_path, times)
+
+    minutes = [minute for minute, _ in index["minutes"]]
+    assert minutes == sorted(set(minutes))
+    assert minutes == [
+        "2023-11-05T05:30Z",
+        "2023-11-05T06:30Z",
+        "2023-11-05T07:30Z",
+        "2023-11-06T05:30Z",
+    ]
+    offsets = dict(index["minutes"])
+    assert row_text_at(content, offsets["2023-11-05T05:30Z"]) == "2023-11-05T05:30:00"
+    assert row_text_at(content, offsets["2023-11-06T05:30Z"]) == "2023-11-06T05:30:00"
@@ -0,0 +1,65 @@
+import json
+
+
+def crew_member(name, arrival, departure):
+    return {
+        "name": name,
+        "nationality": "Russia",
+        "arrivalDate": arrival,
+        "arrivalFlight": "",
+        "departureDate": departure,
+        "departureFlight": "",
+        "durationDays": "",
+    }
+
+
+KONONENKO_2018 = crew_member(
+    "Oleg Kononenko", "2018-12-03T17:33:00Z", "2019-06-24T23:25:00Z"
+)
+KONONENKO_2023 = crew_member(
+    "Oleg Kononenko", "2023-09-15T18:53:00Z", "2024-09-23T07:37:00Z"
+)
+PROKOPYEV = crew_member(
+    "Sergey Prokopyev", "2018-06-08T13:01:00Z", "2018-12-20T01:02:00Z"
+)
+
+
+def test_repeat_flyer_keeps_each_stint(load_stage, tmp_path):
+    stage = load_stage("15_make_s3_crew_roster.py")
+    stints = stage.get_stints([KONONENKO_2018, PROKOPYEV, KONONENKO_2023])
+    dates = ["2018-12-20", "2019-01-10", "2023-11-01"]
+    rosters = stage.build_rosters(dates, stage.get_crew_events(stints), [])
+
+    first_stay = "Oleg Kononenko|2018-12-03T17:33:00Z"
+    second_stay = "Oleg Kononenko|2023-09-15T18:53:00Z"
+    assert rosters["2018-12-20"]["onboard"] == [
+        first_stay,
+        "Sergey Prokopyev|2018-06-08T13:01:00Z",
+    ]
+    assert rosters["2018-12-20"]["changes"] == [
+        ["2018-12-20T01:02:00Z", "departure", "Sergey Prokopyev|2018-06-08T13:01:00Z"]
+    ]
+    assert rosters["2019-01-10"]["onboard"] == [first_stay]
+    assert rosters["2023-11-01"]["onboard"] == [second_stay]
+
+    stage.write_month_rosters(rosters, stints, str(tmp_path))
+    with open(tmp_path / "2019" / "2019-01.json", encoding="utf-8") as f:
+        january_2019 = json.load(f)
+    assert january_2019["crew"] == {first_stay: KONONENKO_2018}
+    with open(tmp_path / "2023" / "2023-11.json", encoding="utf-8") as f:
+        november_2023 = json.load(f)
+    assert november_2023["crew"] == {second_stay: KONONENKO_2023}
+
+
+def test_month_stints_include_stays_overlapping_the_month(load_stage):
+    stage = load_stage("15_make_s3_crew_roster.py")
+    stints = stage.get_stints([KONONENKO_2018, PROKOPYEV, KONONENKO_2023])
+
+    assert list(stage.get_month_stints(stints, "2018-12")) == [
+        "Oleg Kononenko|2018-12-03T17:33:00Z",
+        "Sergey Prokopyev|2018-06-08T13:01:00Z",
+    ]
+    assert list(stage.get_month_stints(stints, "2019-07")) == []
+    assert list(stage.get_month_stints(stints, "2024-09")) == [
+        "Oleg Kononenko|2023-09-15T18:53:00Z"
+    ]
@@ -0,0 +1,22 @@
+import pytest
+import requests
+import http_cache
+
+
+def test_settings_are_read_after_import(tmp_path, monkeypatch):
+    # Set after http_cache was imported, as load_dotenv() does in the stages
+    monkeypatch.setenv("HTTP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("HTTP_CACHE_OFFLINE", "1")
+    url = "https://en.wikipedia.org/wiki/List_of_International_Space_Station_spacewalks"
+
+    with pytest.raises(requests.ConnectionError):
+        http_cache.cached_get(url)
+
+    _, key = http_cache.get_cache_key(url)
+    meta = {"url": url, "headers": {"Content-Type": "text/html"}, "storedAt": 0}
+    http_cache.write_entry(key, meta, b"<table class='wikitable'></table>")
+    assert (tmp_path / f"{key}.body").exists()
+
+    response = http_cache.cached_get(url)
+    assert response.from_cache
+    assert response.text == "<table class='wikitable'></table>"
@@ -0,0 +1,37 @@
+import http_client
+from http_client import HostLimiter
+
+
+def test_host_limiter_enforces_the_hourly_cap(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(http_client.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(
+        http_client.time,
+        "sleep",
+        lambda seconds: clock.__setitem__(0, clock[0] + seconds),
+    )
+    limiter = HostLimiter(1, 1.0, per_hour=3)
+
+    starts = []
+    for _ in range(5):
+        with limiter:
+            starts.append(clock[0])
+    # Three a second apart, then the fourth waits for the first to be an hour old
+    assert starts == [1000.0, 1001.0, 1002.0, 4600.0, 4601.0]
+
+
+def test_host_limiter_without_hourly_cap(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(http_client.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(
+        http_client.time,
+        "sleep",
+        lambda seconds: clock.__setitem__(0, clock[0] + seconds),
+    )
+    limiter = HostLimiter(1, 2.0)
+
+    starts = []
+    for _ in range(4):
+        with limiter:
+            starts.append(clock[0])
+    assert starts == [0.0, 0.5, 1.0, 1.5]
@@ -0,0 +1,15 @@
+import numpy as np
+from orbit import get_months
+
+
+def test_months_span_the_range():
+    day = np.datetime64("2023-10-31T00:00:00")
+    assert get_months(day, day + np.timedelta64(1, "D")) == ("2023-10", "2023-11")
+    assert get_months(day, day) == ("2023-10",)
+    # Ground track padding before the date reaches back into the previous month
+    start = np.datetime64("2024-01-01") - np.timedelta64(4000, "s")
+    assert get_months(start, np.datetime64("2024-01-02")) == ("2023-12", "2024-01")
+    assert get_months(
+        np.datetime64("2023-11-20T10:00:00.000"),
+        np.datetime64("2024-01-03T00:00:00.000"),
+    ) == ("2023-11", "2023-12", "2024-01")
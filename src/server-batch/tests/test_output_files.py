@@ -0,0 +1,32 @@
+import os
+from output_files import write_if_changed, write_json_if_changed
+
+
+def test_unchanged_json_is_not_rewritten(tmp_path):
+    path = str(tmp_path / "nested" / "eva_details.json")
+    data = [{"number": "1", "description": "Zvezda – Pirs\nline two"}]
+
+    assert write_json_if_changed(path, data)
+    os.utime(path, (0, 0))
+    assert not write_json_if_changed(path, data)
+    assert os.path.getmtime(path) == 0
+
+    with open(path, "rb") as f:
+        content = f.read()
+    assert (
+        content
+        == '[{"number":"1","description":"Zvezda – Pirs\\nline two"}]'.encode("utf-8")
+    )
+
+
+def test_text_is_written_without_newline_translation(tmp_path):
+    path = str(tmp_path / "index.csv")
+
+    assert write_if_changed(path, "a\nb\r\n")
+    with open(path, "rb") as f:
+        assert f.read() == b"a\nb\r\n"
+    assert not write_if_changed(path, "a\nb\r\n")
+
+    os.utime(path, (0, 0))
+    assert not write_if_changed(path, "a\nb\r\n", touch=True)
+    assert os.path.getmtime(path) > 0
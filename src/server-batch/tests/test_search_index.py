@@ -0,0 +1,70 @@
+import search_index
+
+# 2023-11-01 in Chicago is UTC-5 (CDT until 2023-11-05)
+ROWS = [
+    # time|filename|start|end|language|text|textOriginalLang
+    "22:00:00|2023-11-01T170000-1_SG_1_IA.aac|0.0|2.0|en|hatch open|hatch open",
+    "23:59:00|2023-11-01T185900-1_SG_2_IA.aac|0.0|2.0|en|hatch closed|hatch closed",
+    "00:30:00|2023-11-01T193000-1_SG_1_IA.aac|0.0|2.0|en|hatch open again|hatch open again",
+]
+
+
+def build_index(load_stage, tmp_path, monkeypatch, days):
+    for date_str, rows in days.items():
+        year, month, day = date_str.split("-")
+        day_dir = tmp_path / "comm" / year / month / day
+        day_dir.mkdir(parents=True)
+        (day_dir / f"_transcript_{date_str}.csv").write_text(
+            "\n".join(rows) + "\n", encoding="utf-8"
+        )
+    stage = load_stage("14_make_s3_search_index.py")
+    search_dir = str(tmp_path / "search") + "/"
+    monkeypatch.setattr(stage, "COMM_S3", str(tmp_path / "comm") + "/")
+    monkeypatch.setattr(stage, "SEARCH_S3", search_dir)
+    monkeypatch.setattr(stage, "SEARCH_WORK", str(tmp_path / "search_work") + "/")
+    stage.main()
+    return search_dir
+
+
+def test_postings_sort_and_filter_on_utc_time(load_stage, tmp_path, monkeypatch):
+    # Written out of time order, so the order of the results comes from the postings
+    search_dir = build_index(
+        load_stage, tmp_path, monkeypatch, {"2023-11-01": [ROWS[2], ROWS[0], ROWS[1]]}
+    )
+
+    assert search_index.search(search_dir, "hatch") == [
+        ("2023-11-01T22:00:00Z", "1", "2023-11-01T170000-1_SG_1_IA.aac"),
+        ("2023-11-01T23:59:00Z", "2", "2023-11-01T185900-1_SG_2_IA.aac"),
+        ("2023-11-02T00:30:00Z", "1", "2023-11-01T193000-1_SG_1_IA.aac"),
+    ]
+    assert [
+        posting[0]
+        for posting in search_index.search(search_dir, "hatch open", "2023-11-02")
+    ] == ["2023-11-02T00:30:00Z"]
+    assert [
+        posting[0]
+        for posting in search_index.search(search_dir, "hatch", end_date="2023-11-01")
+    ] == ["2023-11-01T22:00:00Z", "2023-11-01T23:59:00Z"]
+
+
+def test_searches_the_previous_folder_year_for_early_utc_dates(
+    load_stage, tmp_path, monkeypatch
+):
+    # 19:30 on New Year's Eve in Chicago is 01:30 UTC on New Year's Day
+    search_dir = build_index(
+        load_stage,
+        tmp_path,
+        monkeypatch,
+        {
+            "2023-12-31": [
+                "01:30:00|2023-12-31T193000-1_SG_1_IA.aac|0.0|2.0|en|happy new year|"
+                "happy new year"
+            ]
+        },
+    )
+
+    assert [
+        posting[0]
+        for posting in search_index.search(search_dir, "new year", "2024-01-01")
+    ] == ["2024-01-01T01:30:00Z"]
+    assert search_index.search(search_dir, "new year", "2024-01-02") == []
@@ -0,0 +1,46 @@
+import pyarrow.parquet as pq
+import pytest
+import stats
+from comm_corpus import get_day_path, open_corpus
+
+DATE = "2023-11-01"
+ROWS = [
+    # time|filename|start|end|language|text|textOriginalLang
+    "14:00:00|2023-11-01T090000-1_SG_1_IA.aac|0.0|4.5|en| Houston,  Station |Houston, Station",
+    "14:01:00|2023-11-01T090100-1_SG_2_IA.aac|0.0|3.0|ru|hello|  privet\tkak dela ",
+    "14:02:00|2023-11-01T090200-1_SG_1_IA.aac|0.0|1.5|en||",
+    "14:03:00|2023-11-01T090300-1_SG_2_IA.aac|0.0|n/a|en|   |   ",
+]
+
+
+def assert_same_buckets(csv_bucket, dataset_bucket):
+    assert csv_bucket["utterances"] == dataset_bucket["utterances"]
+    assert csv_bucket["words"] == dataset_bucket["words"]
+    # The corpus stores durations as float32
+    assert csv_bucket["audioSeconds"] == pytest.approx(dataset_bucket["audioSeconds"])
+
+
+def test_csv_and_dataset_modes_give_the_same_aggregates(
+    load_stage, tmp_path, monkeypatch
+):
+    day_dir = tmp_path / "comm" / "2023" / "11" / "01"
+    day_dir.mkdir(parents=True)
+    transcript_path = day_dir / f"_transcript_{DATE}.csv"
+    transcript_path.write_text("\n".join(ROWS) + "\n", encoding="utf-8")
+
+    corpus_dir = str(tmp_path / "comm_corpus")
+    corpus_stage = load_stage("13_make_comm_corpus.py")
+    day_path = get_day_path(corpus_dir, DATE)
+    (tmp_path / "comm_corpus" / "year=2023" / "month=11").mkdir(parents=True)
+    pq.write_table(corpus_stage.build_day_table(DATE, str(transcript_path)), day_path)
+    monkeypatch.setattr(stats, "open_corpus", lambda: open_corpus(corpus_dir))
+
+    _, csv_aggregates = stats.scan_day(DATE, str(transcript_path))
+    dataset_aggregates = stats.day_aggregates_from_corpus()[DATE]
+
+    assert csv_aggregates["words"] == 2 + 3
+    assert_same_buckets(csv_aggregates, dataset_aggregates)
+    for group in ["languages", "channels"]:
+        assert csv_aggregates[group].keys() == dataset_aggregates[group].keys()
+        for key, bucket in csv_aggregates[group].items():
+            assert_same_buckets(bucket, dataset_aggregates[group][key])
@@ -0,0 +1,47 @@
+import numpy as np
+import pyarrow.parquet as pq
+import transcript_query_service
+from comm_corpus import get_day_path, open_corpus
+from transcript_query_service import TranscriptIndex, intersect_sorted
+
+DATE = "2023-11-01"
+ROWS = [
+    # time|filename|start|end|language|text|textOriginalLang
+    "14:00:00|2023-11-01T090000-1_SG_1_IA.aac|0.0|2.0|en|the hatch is open|the hatch is open",
+    "14:01:00|2023-11-01T090100-1_SG_2_IA.aac|0.0|2.0|en|open the hatch|open the hatch",
+    "14:02:00|2023-11-01T090200-1_SG_1_IA.aac|0.0|2.0|en|copy that|copy that",
+    "14:03:00|2023-11-01T090300-1_SG_1_IA.aac|0.0|2.0|ru|hatch is open|lyuk otkryt",
+]
+
+
+def test_intersect_sorted():
+    candidates = np.array([1, 4, 7, 9, 12], dtype="I")
+    row_ids = np.array([0, 4, 5, 9, 10, 11], dtype="I")
+    assert intersect_sorted(candidates, row_ids).tolist() == [4, 9]
+    assert intersect_sorted(candidates, row_ids[:0]).tolist() == []
+
+
+def test_search_matches_phrases_in_range(load_stage, tmp_path, monkeypatch):
+    day_dir = tmp_path / "comm" / "2023" / "11" / "01"
+    day_dir.mkdir(parents=True)
+    transcript_path = day_dir / f"_transcript_{DATE}.csv"
+    transcript_path.write_text("\n".join(ROWS) + "\n", encoding="utf-8")
+    corpus_dir = str(tmp_path / "comm_corpus")
+    (tmp_path / "comm_corpus" / "year=2023" / "month=11").mkdir(parents=True)
+    corpus_stage = load_stage("13_make_comm_corpus.py")
+    pq.write_table(
+        corpus_stage.build_day_table(DATE, str(transcript_path)),
+        get_day_path(corpus_dir, DATE),
+    )
+    monkeypatch.setattr(
+        transcript_query_service, "open_corpus", lambda: open_corpus(corpus_dir)
+    )
+    index = TranscriptIndex()
+
+    assert index.search("hatch") == [0, 1, 3]
+    assert index.search("hatch is open") == [0, 3]
+    assert index.search("hatch is open", channels={2}) == []
+    assert index.search("open hatch") == []
+    assert index.search("hatch missing") == []
+    start = transcript_query_service.parse_time("2023-11-01T14:00:30")
+    assert index.search("the hatch", start=start) == [1]
@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+from transcript_query_service import parse_time
+
+
+def test_parses_naive_times_as_utc():
+    assert parse_time("2019-01-29T06:00:00") == datetime(
+        2019, 1, 29, 6, tzinfo=timezone.utc
+    )
+    assert parse_time("2019-01-29T06:00:00Z") == datetime(
+        2019, 1, 29, 6, tzinfo=timezone.utc
+    )
+    assert parse_time("2019-01-29", end_of_day=True) == datetime(
+        2019, 1, 29, 23, 59, 59, tzinfo=timezone.utc
+    )
+    assert parse_time("") is None
+
+
+def test_converts_explicit_offsets_to_utc():
+    assert parse_time("2019-01-29T06:00:00+02:00") == datetime(
+        2019, 1, 29, 4, tzinfo=timezone.utc
+    )
+    assert parse_time("2019-01-28T22:30:00-06:00") == datetime(
+        2019, 1, 29, 4, 30, tzinfo=timezone.utc
+    )
+    assert parse_time("2019-01-28T22:30:00-06:00").tzinfo == timezone.utc
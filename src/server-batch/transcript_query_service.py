@@ -0,0 +1,241 @@
+import argparse
+import bisect
+import json
+import time
+from array import array
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+from comm_corpus import open_corpus
+from search_index import tokenize
+
+# Local query service over the transcript corpus built by 13_make_comm_corpus.py. The corpus is
+# loaded into memory sorted by UTC time, with an inverted index of sorted row ids per term, so
+# that time-range and phrase queries are answered with binary searches. A query starts from its
+# rarest term's rows and looks each of them up in the other terms' row ids.
+#
+#   GET /utterances?start=2019-01-29T00:00:00&end=2019-01-29T06:00:00&channels=1,2
+#   GET /search?q=hatch+open&start=2019-01-01&end=2019-12-31&channels=3
+#
+# Both accept page (from 1) and pageSize, and return
+#   {"total": n, "page": p, "pageSize": s, "tookMs": t, "results": [utterance, ...]}
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+COLUMNS = [
+    "utc",
+    "date",
+    "channel",
+    "filename",
+    "language",
+    "text",
+    "textOriginalLang",
+]
+
+
+NO_ROWS = np.array([], dtype=np.dtype("I"))
+
+
+def intersect_sorted(candidates, row_ids):
+    """
+    The candidates that are also in row_ids, both sorted. Each candidate is found by binary
+    search, so the cost depends on the number of candidates, not on the length of row_ids.
+    """
+    positions = np.searchsorted(row_ids, candidates)
+    found = positions < len(row_ids)
+    found[found] = row_ids[positions[found]] == candidates[found]
+    return candidates[found]
+
+
+class TranscriptIndex:
+    def __init__(self):
+        started = time.perf_counter()
+        table = open_corpus().to_table(columns=COLUMNS).sort_by("utc")
+        self.columns = {
+            name: table[name].to_pylist()
+            for name in COLUMNS
+            if name not in ["utc", "language"]
+        }
+        self.columns["language"] = table["language"].cast("string").to_pylist()
+        self.utc = [int(value.timestamp()) for value in table["utc"].to_pylist()]
+
+        terms = {}
+        for row_id, (text, textOriginalLang) in enumerate(
+            zip(self.columns["text"], self.columns["textOriginalLang"])
+        ):
+            for term in set(tokenize(text)) | set(tokenize(textOriginalLang)):
+                row_ids = terms.get(term)
+                if row_ids is None:
+                    row_ids = terms[term] = array("I")
+                row_ids.append(row_id)
+        # Row ids are appended in order, so each term's array is already sorted
+        self.terms = {
+            term: np.frombuffer(row_ids, dtype=np.dtype(row_ids.typecode))
+            for term, row_ids in terms.items()
+        }
+        print(
+            f"Indexed {len(self.utc):,} utterances and {len(terms):,} terms in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+
+    def get_row(self, row_id):
+        row = {name: values[row_id] for name, values in self.columns.items()}
+        row["utc"] = datetime.fromtimestamp(self.utc[row_id], timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+        return row
+
+    def row_range(self, start=None, end=None):
+        """
+        Returns the [first, last) row ids between two UTC datetimes (end inclusive).
+        """
+        first = bisect.bisect_left(self.utc, int(start.timestamp())) if start else 0
+        last = (
+            bisect.bisect_right(self.utc, int(end.timestamp()))
+            if end
+            else len(self.utc)
+        )
+        return first, last
+
+    def utterances(self, start=None, end=None, channels=None):
+        first, last = self.row_range(start, end)
+        if not channels:
+            return range(first, last)
+        channel_values = self.columns["channel"]
+        return [
+            row_id
+            for row_id in range(first, last)
+            if channel_values[row_id] in channels
+        ]
+
+    def search(self, query, start=None, end=None, channels=None):
+        """
+        Returns the row ids whose English or original-language text contains the query as a
+        phrase, in time order.
+        """
+        query_terms = tokenize(query)
+        if not query_terms:
+            return []
+        postings = sorted(
+            (self.terms.get(term, NO_ROWS) for term in set(query_terms)), key=len
+        )
+        first, last = self.row_range(start, end)
+
+        # Narrow to the rarest term's rows in range, then keep those found in the others
+        rarest = postings[0]
+        candidates = rarest[
+            np.searchsorted(rarest, first) : np.searchsorted(rarest, last)
+        ]
+        for row_ids in postings[1:]:
+            if not len(candidates):
+                break
+            candidates = intersect_sorted(candidates, row_ids)
+
+        channel_values = self.columns["channel"]
+        return [
+            row_id
+            for row_id in candidates.tolist()
+            if (not channels or channel_values[row_id] in channels)
+            and self.contains_phrase(row_id, query_terms)
+        ]
+
+    def contains_phrase(self, row_id, query_terms):
+        if len(query_terms) == 1:
+            return True
+        n = len(query_terms)
+        for text in [
+            self.columns["text"][row_id],
+            self.columns["textOriginalLang"][row_id],
+        ]:
+            tokens = tokenize(text)
+            if any(
+                tokens[i : i + n] == query_terms for i in range(len(tokens) - n + 1)
+            ):
+                return True
+        return False
+
+
+def parse_time(value, end_of_day=False):
+    """
+    Parses YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS as UTC, or converts a time with an offset
+    (YYYY-MM-DDTHH:MM:SS+HH:MM, with + encoded as %2B) to UTC. A bare end date covers the
+    whole day.
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.rstrip("Z"))
+    if end_of_day and len(value) == 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def make_handler(index):
+    class TranscriptQueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            started = time.perf_counter()
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            try:
+                start = parse_time(params.get("start"))
+                end = parse_time(params.get("end"), end_of_day=True)
+                channels = set(
+                    int(channel)
+                    for channel in params.get("channels", "").split(",")
+                    if channel
+                )
+                page = max(int(params.get("page", 1)), 1)
+                page_size = min(
+                    max(int(params.get("pageSize", DEFAULT_PAGE_SIZE)), 1),
+                    MAX_PAGE_SIZE,
+                )
+            except ValueError as e:
+                self.send_json(400, {"error": str(e)})
+                return
+
+            if url.path == "/utterances":
+                row_ids = index.utterances(start, end, channels)
+            elif url.path == "/search":
+                row_ids = index.search(params.get("q", ""), start, end, channels)
+            else:
+                self.send_json(404, {"error": f"Unknown endpoint {url.path}"})
+                return
+
+            page_row_ids = row_ids[(page - 1) * page_size : page * page_size]
+            self.send_json(
+                200,
+                {
+                    "total": len(row_ids),
+                    "page": page,
+                    "pageSize": page_size,
+                    "tookMs": round((time.perf_counter() - started) * 1000, 2),
+                    "results": [index.get_row(row_id) for row_id in page_row_ids],
+                },
+            )
+
+        def send_json(self, status, body):
+            content = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(content)
+
+    return TranscriptQueryHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve time-range and phrase queries over the transcript corpus."
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    index = TranscriptIndex()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(index))
+    print(f"Transcript query service listening on http://{args.host}:{args.port}")
+    server.serve_forever()
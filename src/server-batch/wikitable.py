@@ -0,0 +1,50 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Extraction helpers for the Wikipedia table scrapers (stages 4 and 6). Only the
+# <table class="wikitable"> subtrees of a page are parsed, with lxml when it is installed, and
+# each row's cell text is computed once however many times the row classification asks for it.
+
+try:
+    import lxml  # noqa: F401
+
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+WIKITABLE_STRAINER = SoupStrainer("table", class_="wikitable")
+
+
+def parse_wikitables(html, parser=PARSER):
+    """
+    Returns the wikitable elements of a page.
+    """
+    soup = BeautifulSoup(html, parser, parse_only=WIKITABLE_STRAINER)
+    return soup.find_all("table", class_="wikitable")
+
+
+class WikiRow:
+    """
+    A table row's cells, with get_text(strip=True) of each cell cached.
+    """
+
+    def __init__(self, row):
+        self.row = row
+        self.cells = row.find_all(["td", "th"])
+        self.texts = [None] * len(self.cells)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def text(self, index):
+        if self.texts[index] is None:
+            self.texts[index] = self.cells[index].get_text(strip=True)
+        return self.texts[index]
+
+
+def iter_rows(table, skip_header=True):
+    rows = table.find_all("tr")
+    for row in rows[1:] if skip_header else rows:
+        yield WikiRow(row)
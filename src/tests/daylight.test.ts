@@ -0,0 +1,41 @@
+import { decodeDaylight, getSubsolarIndex, getSubsolarPoint, isIssSunlit } from "utils/daylight";
+
+const daylightFile: DaylightFile = {
+  subsolar: {
+    start: "2023-11-01T00:00:00Z",
+    step: 300,
+    lat: [-14.2, -14.21, -14.22],
+    lon: [176.1, 174.85, 173.6],
+  },
+  iss: {
+    sunlitAtStart: true,
+    events: [
+      ["2023-11-01T00:05:00Z", "sunset"],
+      ["2023-11-01T00:08:00Z", "sunrise"],
+    ],
+  },
+};
+
+const start = new Date("2023-11-01T00:00:00Z").getTime();
+
+test("Picks the nearest subsolar sample, clamped to the date", async () => {
+  const daylight = decodeDaylight(daylightFile);
+
+  expect(getSubsolarIndex(daylight, start + 149000)).toEqual(0);
+  expect(getSubsolarIndex(daylight, start + 151000)).toEqual(1);
+  expect(getSubsolarIndex(daylight, start - 60000)).toEqual(0);
+  expect(getSubsolarIndex(daylight, start + 86400000)).toEqual(2);
+  expect(getSubsolarPoint(daylight, 1)).toEqual({ lat: -14.21, lng: 174.85 });
+});
+
+test("Follows the ISS sunrises and sunsets", async () => {
+  const daylight = decodeDaylight(daylightFile);
+
+  expect(isIssSunlit(daylight, start)).toEqual(true);
+  expect(isIssSunlit(daylight, start + 299000)).toEqual(true);
+  expect(isIssSunlit(daylight, start + 300000)).toEqual(false);
+  expect(isIssSunlit(daylight, start + 479000)).toEqual(false);
+  expect(isIssSunlit(daylight, start + 480000)).toEqual(true);
+
+  expect(isIssSunlit(decodeDaylight({ ...daylightFile, iss: null }), start)).toEqual(undefined);
+});
@@ -0,0 +1,41 @@
+import { decodeGroundTrack, getGroundTrackPosition } from "utils/groundTrack";
+
+const groundTrackFile: GroundTrackFile = {
+  start: "2023-11-01T00:00:00Z",
+  step: 10,
+  count: 3,
+  lat: [100000, 5000, 5000],
+  lon: [1795000, -3590000, 10000],
+  alt: [420000, 10, -20],
+  sunlitAtStart: true,
+  sunlitChanges: [2],
+};
+
+test("Decodes the delta-encoded ground track", async () => {
+  const track = decodeGroundTrack(groundTrackFile);
+
+  expect(track.start).toEqual(new Date("2023-11-01T00:00:00Z").getTime());
+  expect(track.step).toEqual(10000);
+  expect(Array.from(track.lat)).toEqual([10, 10.5, 11]);
+  expect(Array.from(track.lon)).toEqual([179.5, -179.5, -178.5]);
+  expect(Array.from(track.alt)).toEqual([420, 420.01, 419.99]);
+  expect(Array.from(track.sunlit)).toEqual([1, 1, 0]);
+});
+
+test("Interpolates between samples and across the antimeridian", async () => {
+  const track = decodeGroundTrack(groundTrackFile);
+
+  const crossing = getGroundTrackPosition(track, new Date("2023-11-01T00:00:02.500Z").getTime());
+  expect(crossing.lat).toBeCloseTo(10.125);
+  expect(crossing.lng).toBeCloseTo(179.75);
+  expect(crossing.sunlit).toEqual(true);
+
+  const position = getGroundTrackPosition(track, new Date("2023-11-01T00:00:15Z").getTime());
+  expect(position.lat).toBeCloseTo(10.75);
+  expect(position.lng).toBeCloseTo(-179);
+  expect(position.sunlit).toEqual(false);
+
+  expect(getGroundTrackPosition(track, new Date("2023-11-01T00:00:30Z").getTime())).toEqual(
+    undefined
+  );
+});
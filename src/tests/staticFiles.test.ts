@@ -0,0 +1,32 @@
+import { getStaticManifest, getStaticUrl } from "utils/staticFiles";
+
+const baseStaticUrl = "https://static.example.com";
+const files: StaticManifestFiles = {
+  "available_dates.json": "0123456789abcdef",
+  "comm/2023/11/01/_transcript_2023-11-01.csv": "fedcba9876543210",
+};
+
+test("Versions artifact URLs with their content hash", async () => {
+  expect(getStaticUrl(baseStaticUrl, files, "available_dates.json")).toEqual(
+    "https://static.example.com/available_dates.json?v=0123456789abcdef"
+  );
+  expect(getStaticUrl(baseStaticUrl, files, "comm/2023/11/01/_transcript_2023-11-01.csv")).toEqual(
+    "https://static.example.com/comm/2023/11/01/_transcript_2023-11-01.csv?v=fedcba9876543210"
+  );
+  // not published yet
+  expect(getStaticUrl(baseStaticUrl, files, "expeditions.json")).toEqual(
+    "https://static.example.com/expeditions.json"
+  );
+});
+
+test("Fetches the manifest once, bypassing the HTTP cache", async () => {
+  const fetchMock = jest.fn().mockResolvedValue({ ok: true, json: async () => ({ files }) });
+  global.fetch = fetchMock;
+
+  expect(await getStaticManifest(baseStaticUrl)).toEqual(files);
+  expect(await getStaticManifest(baseStaticUrl)).toEqual(files);
+  expect(fetchMock).toHaveBeenCalledTimes(1);
+  expect(fetchMock).toHaveBeenCalledWith("https://static.example.com/static_manifest.json", {
+    cache: "no-cache",
+  });
+});
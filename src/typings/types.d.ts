@@ -27,10 +27,84 @@ type EphemeraItem = {
   tle_line2: string;
 };
 
+// ephemera/YYYY/YYYY-MM.json: columns sorted by epoch
+type EphemeraMonthFile = {
+  epoch: string[];
+  tle_line1: string[];
+  tle_line2: string[];
+};
+
+// per-day file from stage 16: lat/lon in 1e-4 degrees and alt in metres, each the first
+// sample followed by the differences from the previous sample
+type GroundTrackFile = {
+  start: string;
+  step: number;
+  count: number;
+  lat: number[];
+  lon: number[];
+  alt: number[];
+  sunlitAtStart: boolean;
+  sunlitChanges: number[];
+};
+
+type GroundTrack = {
+  // unix ms of the first sample
+  start: number;
+  // ms between samples
+  step: number;
+  lat: Float64Array;
+  lon: Float64Array;
+  alt: Float64Array;
+  sunlit: Uint8Array;
+};
+
+type GroundTrackPosition = {
+  lat: number;
+  lng: number;
+  alt: number;
+  sunlit: boolean;
+};
+
+// per-day file from stage 18: the subsolar point from 00:00 to 24:00 UTC and the ISS's
+// orbital sunrises and sunsets, null when the ephemera do not cover the date
+// static_manifest.json: content hash by artifact path under the static base URL
+type StaticManifestFiles = Record<string, string>;
+
+type StaticManifest = {
+  files: StaticManifestFiles;
+};
+
+type DaylightFile = {
+  subsolar: {
+    start: string;
+    step: number;
+    lat: number[];
+    lon: number[];
+  };
+  iss: {
+    sunlitAtStart: boolean;
+    events: [string, "sunrise" | "sunset"][];
+  } | null;
+};
+
+type Daylight = {
+  // unix ms of the first subsolar sample
+  start: number;
+  // ms between subsolar samples
+  step: number;
+  subsolarLat: number[];
+  subsolarLng: number[];
+  issSunlitAtStart: boolean | null;
+  // unix ms of each sunrise or sunset, and whether the ISS is sunlit after it
+  issEvents: { time: number; sunlit: boolean }[];
+};
+
 type GetDatePageDataResponse = {
   transcriptItems: TranscriptItem[];
   imageItems: ImageItem[];
   ephemeraItems: EphemeraItem[];
+  groundTrack: GroundTrack | null;
+  daylight: Daylight | null;
   evaDetails: EvaDetail[];
   availableDates: string[];
   youtubeLiveRecordings: YoutubeLiveRecording[];
@@ -38,10 +112,6 @@ type GetDatePageDataResponse = {
   expeditionInfo: ExpeditionInfo[];
 };
 
-type GetCesiumPageDataResponse = {
-  ephemeraItems: EphemeraItem[];
-};
-
 type TimeDef = {
   // hh:mm:ss
   startValue: string;
@@ -66,6 +136,19 @@ type CrewArrDepItem = {
   durationDays: string;
 };
 
+// crew are keyed per stint, "name|arrivalDate", so repeat flyers keep each stay
+type CrewRosterDay = {
+  onboard: string[];
+  // [utc time, "arrival" | "departure", stint]
+  changes: [string, string, string][];
+  expedition: number | null;
+};
+
+type CrewRosterMonth = {
+  crew: { [stint: string]: CrewArrDepItem };
+  days: { [date: string]: CrewRosterDay };
+};
+
 type ExpeditionInfo = {
   expedition: number;
   start: string;
@@ -91,4 +174,8 @@ type YoutubeLiveRecording = {
   videoId: string;
   duration: number;
   title: string;
+  // from the per-month date index: where the recording overlaps the date, in seconds
+  dayOffset?: number;
+  videoOffset?: number;
+  length?: number;
 };
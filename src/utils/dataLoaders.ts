@@ -1,6 +1,9 @@
 import { LoaderFunctionArgs } from "react-router-dom";
 import { processTranscriptCsv } from "utils/transcript";
-import { processYoutubeVideosCsv } from "./youtubeVideos";
+import { decodeGroundTrack } from "utils/groundTrack";
+import { decodeDaylight } from "utils/daylight";
+import { ephemeraItemsFromMonth } from "utils/map";
+import { getStaticManifest, getStaticUrl } from "utils/staticFiles";
 
 export async function getDatePageData({
   params,
@@ -9,24 +12,31 @@ export async function getDatePageData({
   const baseStaticUrl = import.meta.env.VITE_BASE_STATIC_URL;
   const [year, month, day] = date!.split("-");
 
-  const transcriptUrl = `${baseStaticUrl}/comm/${year}/${month}/${day}/_transcript_${date}.csv`;
-  const imagesUrl = `${baseStaticUrl}/images/${year}/${month}/images-manifest_${date}.json`;
-  const ephemeraUrl = `${baseStaticUrl}/ephemera/${year}/${year}-${month}.json`;
-  const evaDetailsUrl = `${baseStaticUrl}/eva_details.json`;
-  const availableDatesUrl = `${baseStaticUrl}/available_dates.json`;
-  const youtubeLiveRecordingsUrl = `${baseStaticUrl}/youtube_live_recordings.csv`;
-  const crewArrDepUrl = `${baseStaticUrl}/iss_crew_arr_dep.json`;
-  const expeditionInfoUrl = `${baseStaticUrl}/expeditions.json`;
-
   try {
+    // artifact URLs carry their content hash, so cached copies are never stale
+    const files = await getStaticManifest(baseStaticUrl);
+    const url = (path: string) => getStaticUrl(baseStaticUrl, files, path);
+    const transcriptUrl = url(`comm/${year}/${month}/${day}/_transcript_${date}.csv`);
+    const imagesUrl = url(`images/${year}/${month}/images-manifest_${date}.json`);
+    const ephemeraUrl = url(`ephemera/${year}/${year}-${month}.json`);
+    const groundTrackUrl = url(`groundtrack/${year}/${month}/groundtrack_${date}.json`);
+    const daylightUrl = url(`daylight/${year}/${month}/daylight_${date}.json`);
+    const evaDetailsUrl = url("eva_details.json");
+    const availableDatesUrl = url("available_dates.json");
+    const youtubeLiveRecordingsUrl = url(`youtube/${year}/${year}-${month}.json`);
+    const crewRosterUrl = url(`crew/${year}/${year}-${month}.json`);
+    const expeditionInfoUrl = url("expeditions.json");
+
     const results = await Promise.allSettled([
       fetch(transcriptUrl),
       fetch(imagesUrl),
       fetch(ephemeraUrl),
+      fetch(groundTrackUrl),
+      fetch(daylightUrl),
       fetch(evaDetailsUrl),
       fetch(availableDatesUrl),
       fetch(youtubeLiveRecordingsUrl),
-      fetch(crewArrDepUrl),
+      fetch(crewRosterUrl),
       fetch(expeditionInfoUrl),
     ]);
 
@@ -34,10 +44,12 @@ export async function getDatePageData({
       transcriptResult,
       imagesResult,
       ephemeraResult,
+      groundTrackResult,
+      daylightResult,
       evaDetailsResult,
       availableDatesResult,
       youtubeLiveRecordingsResult,
-      crewArrDepResult,
+      crewRosterResult,
       expeditionInfoResult,
     ] = results;
 
@@ -51,8 +63,18 @@ export async function getDatePageData({
         : [];
     const ephemeraItems =
       ephemeraResult.status === "fulfilled" && ephemeraResult.value.ok
-        ? await ephemeraResult.value.json()
+        ? ephemeraItemsFromMonth(await ephemeraResult.value.json())
         : [];
+    // precomputed positions; the map falls back to propagating the TLEs without them
+    const groundTrack: GroundTrack | null =
+      groundTrackResult.status === "fulfilled" && groundTrackResult.value.ok
+        ? decodeGroundTrack(await groundTrackResult.value.json())
+        : null;
+    // precomputed subsolar points and ISS sunrises and sunsets; optional like the ground track
+    const daylight: Daylight | null =
+      daylightResult.status === "fulfilled" && daylightResult.value.ok
+        ? decodeDaylight(await daylightResult.value.json())
+        : null;
     const evaDetails =
       evaDetailsResult.status === "fulfilled" && evaDetailsResult.value.ok
         ? await evaDetailsResult.value.json()
@@ -63,12 +85,22 @@ export async function getDatePageData({
         : [];
     const youtubeLiveRecordings =
       youtubeLiveRecordingsResult.status === "fulfilled" && youtubeLiveRecordingsResult.value.ok
-        ? processYoutubeVideosCsv(await youtubeLiveRecordingsResult.value.text())
-        : [];
-    const crewArrDep =
-      crewArrDepResult.status === "fulfilled" && crewArrDepResult.value.ok
-        ? await crewArrDepResult.value.json()
+        ? (await youtubeLiveRecordingsResult.value.json())[date!] ?? []
         : [];
+    // the month's roster lists who was onboard at 00:00 UTC and the changes during each day
+    const crewRoster: CrewRosterMonth | null =
+      crewRosterResult.status === "fulfilled" && crewRosterResult.value.ok
+        ? await crewRosterResult.value.json()
+        : null;
+    const crewRosterDay = crewRoster?.days[date!];
+    const crewArrDep = crewRosterDay
+      ? [
+          ...new Set([
+            ...crewRosterDay.onboard,
+            ...crewRosterDay.changes.map(([_time, _change, stint]) => stint),
+          ]),
+        ].map((stint) => crewRoster!.crew[stint])
+      : [];
     const expeditionInfo =
       expeditionInfoResult.status === "fulfilled" && expeditionInfoResult.value.ok
         ? await expeditionInfoResult.value.json()
@@ -78,6 +110,8 @@ export async function getDatePageData({
       transcriptItems,
       imageItems,
       ephemeraItems,
+      groundTrack,
+      daylight,
       evaDetails,
       availableDates,
       youtubeLiveRecordings,
@@ -89,6 +123,8 @@ export async function getDatePageData({
       transcriptItems: [],
       imageItems: [],
       ephemeraItems: [],
+      groundTrack: null,
+      daylight: null,
       evaDetails: [],
       availableDates: [],
       youtubeLiveRecordings: [],
@@ -101,7 +137,8 @@ export async function getDatePageData({
 export async function getAvailableDates(): Promise<AvailableDate[]> {
   const baseStaticUrl = import.meta.env.VITE_BASE_STATIC_URL;
   try {
-    const response = await fetch(`${baseStaticUrl}/available_dates.json`);
+    const files = await getStaticManifest(baseStaticUrl);
+    const response = await fetch(getStaticUrl(baseStaticUrl, files, "available_dates.json"));
     if (!response.ok) {
       throw new Error("Failed to fetch available dates");
     }
@@ -112,20 +149,18 @@ export async function getAvailableDates(): Promise<AvailableDate[]> {
   }
 }
 
-export async function getCesiumPageData(): Promise<GetCesiumPageDataResponse> {
+export async function getCesiumPageData(): Promise<EphemeraItem[]> {
   const baseStaticUrl = import.meta.env.VITE_BASE_STATIC_URL;
   const date = "2023-11-01";
   const [year, month, _day] = date.split("-");
 
-  const ephemeraUrl = `${baseStaticUrl}/ephemera/${year}/${year}-${month}.json`;
-
   try {
-    const ephemeraResult = await fetch(ephemeraUrl);
-    const ephemeraItems = await ephemeraResult.json();
-    return ephemeraItems;
+    const files = await getStaticManifest(baseStaticUrl);
+    const ephemeraResult = await fetch(
+      getStaticUrl(baseStaticUrl, files, `ephemera/${year}/${year}-${month}.json`)
+    );
+    return ephemeraItemsFromMonth(await ephemeraResult.json());
   } catch (error) {
-    return {
-      ephemeraItems: [],
-    };
+    return [];
   }
 }
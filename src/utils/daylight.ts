@@ -0,0 +1,52 @@
+export const decodeDaylight = (file: DaylightFile): Daylight => ({
+  start: new Date(file.subsolar.start).getTime(),
+  step: file.subsolar.step * 1000,
+  subsolarLat: file.subsolar.lat,
+  subsolarLng: file.subsolar.lon,
+  issSunlitAtStart: file.iss ? file.iss.sunlitAtStart : null,
+  issEvents: file.iss
+    ? file.iss.events.map(([time, event]) => ({
+        time: new Date(time).getTime(),
+        sunlit: event === "sunrise",
+      }))
+    : [],
+});
+
+/**
+ * Index of the subsolar sample nearest to a unix ms time, clamped to the date. The terminator
+ * only needs redrawing when it changes.
+ */
+export const getSubsolarIndex = (daylight: Daylight, time: number): number => {
+  const index = Math.round((time - daylight.start) / daylight.step);
+  return Math.min(Math.max(index, 0), daylight.subsolarLat.length - 1);
+};
+
+export const getSubsolarPoint = (
+  daylight: Daylight,
+  index: number
+): { lat: number; lng: number } => ({
+  lat: daylight.subsolarLat[index],
+  lng: daylight.subsolarLng[index],
+});
+
+/**
+ * Whether the ISS is in sunlight at a unix ms time, from the last sunrise or sunset before it.
+ * Returns undefined when the date has no ISS schedule.
+ */
+export const isIssSunlit = (daylight: Daylight, time: number): boolean | undefined => {
+  if (daylight.issSunlitAtStart === null) {
+    return undefined;
+  }
+  // binary search for the number of events at or before the time
+  let low = 0;
+  let high = daylight.issEvents.length;
+  while (low < high) {
+    const mid = (low + high) >> 1;
+    if (daylight.issEvents[mid].time <= time) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  return low === 0 ? daylight.issSunlitAtStart : daylight.issEvents[low - 1].sunlit;
+};
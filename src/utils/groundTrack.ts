@@ -0,0 +1,63 @@
+const DEGREES_SCALE = 10000;
+
+const undoDeltas = (deltas: number[], scale: number): Float64Array => {
+  const values = new Float64Array(deltas.length);
+  let value = 0;
+  for (let i = 0; i < deltas.length; i++) {
+    value += deltas[i];
+    values[i] = value / scale;
+  }
+  return values;
+};
+
+export const decodeGroundTrack = (file: GroundTrackFile): GroundTrack => {
+  const sunlit = new Uint8Array(file.count);
+  let state = file.sunlitAtStart;
+  let changeIndex = 0;
+  for (let i = 0; i < file.count; i++) {
+    if (changeIndex < file.sunlitChanges.length && file.sunlitChanges[changeIndex] === i) {
+      state = !state;
+      changeIndex++;
+    }
+    sunlit[i] = state ? 1 : 0;
+  }
+  return {
+    start: new Date(file.start).getTime(),
+    step: file.step * 1000,
+    lat: undoDeltas(file.lat, DEGREES_SCALE),
+    lon: undoDeltas(file.lon, DEGREES_SCALE),
+    alt: undoDeltas(file.alt, 1000),
+    sunlit,
+  };
+};
+
+/**
+ * Interpolates the precomputed ground track at a unix ms time. Returns undefined outside the
+ * track, so callers can fall back to propagating the TLEs.
+ */
+export const getGroundTrackPosition = (
+  track: GroundTrack,
+  time: number
+): GroundTrackPosition | undefined => {
+  const position = (time - track.start) / track.step;
+  const index = Math.floor(position);
+  if (index < 0 || index + 1 >= track.lat.length) {
+    return undefined;
+  }
+  const fraction = position - index;
+
+  // interpolate across the antimeridian the short way
+  let lonDelta = track.lon[index + 1] - track.lon[index];
+  if (lonDelta > 180) lonDelta -= 360;
+  if (lonDelta < -180) lonDelta += 360;
+  let lng = track.lon[index] + lonDelta * fraction;
+  if (lng > 180) lng -= 360;
+  if (lng < -180) lng += 360;
+
+  return {
+    lat: track.lat[index] + (track.lat[index + 1] - track.lat[index]) * fraction,
+    lng,
+    alt: track.alt[index] + (track.alt[index + 1] - track.alt[index]) * fraction,
+    sunlit: track.sunlit[fraction < 0.5 ? index : index + 1] === 1,
+  };
+};
@@ -1,36 +1,68 @@
-import { findClosestDate } from "./time";
 import { getLatLngObj } from "tle.js";
+import { getGroundTrackPosition } from "./groundTrack";
+
+// month files are columnar and sorted by epoch, with one element set per epoch
+export const ephemeraItemsFromMonth = (month: EphemeraMonthFile): EphemeraItem[] =>
+  month.epoch.map((epoch, i) => ({
+    epoch,
+    tle_line1: month.tle_line1[i],
+    tle_line2: month.tle_line2[i],
+  }));
 
 export const findClosestEphemeraItem = (
   dateTime: Date,
   ephemeraItems: EphemeraItem[]
 ): EphemeraItem | undefined => {
-  const ephemeraDates = ephemeraItems.map((item) => new Date(item.epoch));
-  const closestDate = findClosestDate(dateTime, ephemeraDates);
-  if (!closestDate) {
+  if (!ephemeraItems.length) {
     return undefined;
   }
-  const closestEphemeraItem = ephemeraItems.find(
-    (item) => new Date(item.epoch).getTime() === closestDate.getTime()
-  );
-  return closestEphemeraItem;
+  // binary search for the first item at or after the time; the items are sorted by epoch
+  const time = dateTime.getTime();
+  let low = 0;
+  let high = ephemeraItems.length;
+  while (low < high) {
+    const middle = (low + high) >> 1;
+    if (new Date(ephemeraItems[middle].epoch).getTime() < time) {
+      low = middle + 1;
+    } else {
+      high = middle;
+    }
+  }
+  if (low === 0) {
+    return ephemeraItems[0];
+  }
+  if (low === ephemeraItems.length) {
+    return ephemeraItems[low - 1];
+  }
+  const before = ephemeraItems[low - 1];
+  const after = ephemeraItems[low];
+  return time - new Date(before.epoch).getTime() <= new Date(after.epoch).getTime() - time
+    ? before
+    : after;
 };
 
 export const getNextPosition = (
   dateTime: string,
   increment: number,
-  ephemeraItems: EphemeraItem[]
+  ephemeraItems: EphemeraItem[],
+  groundTrack: GroundTrack | null = null
 ): { lat: number; lng: number } => {
+  // Calculate the time offset in milliseconds
+  const baseTime = new Date(dateTime).getTime();
+  const offsetTime = baseTime + increment * 1000; // assuming increment is in seconds
+
+  // Use the precomputed ground track when the time is covered by it
+  const trackPosition = groundTrack && getGroundTrackPosition(groundTrack, offsetTime);
+  if (trackPosition) {
+    return { lat: trackPosition.lat, lng: trackPosition.lng };
+  }
+
   // Find the closest ephemera item
   const ephemeraItem = findClosestEphemeraItem(new Date(dateTime), ephemeraItems);
 
   // Combine TLE lines
   const tle = `${ephemeraItem.tle_line1}\n${ephemeraItem.tle_line2}`;
 
-  // Calculate the time offset in milliseconds
-  const baseTime = new Date(dateTime).getTime();
-  const offsetTime = baseTime + increment * 1000; // assuming increment is in seconds
-
   // Get latitude and longitude using tle.js utility
   const { lat, lng } = getLatLngObj(tle, offsetTime);
 
@@ -40,7 +72,8 @@ export const getNextPosition = (
 export const updateOrbitLine = (
   dateTime: string,
   timeStr: string,
-  ephemeraItems: EphemeraItem[]
+  ephemeraItems: EphemeraItem[],
+  groundTrack: GroundTrack | null = null
 ): { coordinates1: [number, number][]; coordinates2: [number, number][] } => {
   const secondsStart = -2000;
   const secondsEnd = 3800;
@@ -56,7 +89,7 @@ export const updateOrbitLine = (
   for (let i = secondsStart; i < secondsEnd; i += secondsStep) {
     // Combine date and time strings to create a full ISO date-time
     const fullDateTime = `${dateTime}T${timeStr}Z`;
-    const nextPosition = getNextPosition(fullDateTime, i, ephemeraItems);
+    const nextPosition = getNextPosition(fullDateTime, i, ephemeraItems, groundTrack);
 
     let lngIncrement;
     let lngStepSize;
@@ -81,7 +114,7 @@ export const updateOrbitLine = (
   if (dateLineHit) {
     for (let i = dateLineIncNum; i < secondsEnd; i += secondsStep) {
       const fullDateTime = `${dateTime}T${timeStr}Z`;
-      const nextPosition = getNextPosition(fullDateTime, i, ephemeraItems);
+      const nextPosition = getNextPosition(fullDateTime, i, ephemeraItems, groundTrack);
       coordinates2.push([nextPosition.lng, nextPosition.lat]);
     }
   }
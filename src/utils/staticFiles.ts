@@ -0,0 +1,38 @@
+let manifestRequest: Promise<StaticManifestFiles> | null = null;
+
+/**
+ * Content hashes of the published artifacts from static_manifest.json, fetched once per page
+ * load. The manifest is the only artifact that changes under the same URL, so it bypasses the
+ * HTTP cache. Resolves to {} when it can't be loaded, and artifacts are then fetched unversioned.
+ */
+export const getStaticManifest = (baseStaticUrl: string): Promise<StaticManifestFiles> => {
+  if (!manifestRequest) {
+    manifestRequest = fetch(`${baseStaticUrl}/static_manifest.json`, { cache: "no-cache" })
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error("Failed to fetch the static manifest");
+        }
+        return response.json();
+      })
+      .then((manifest: StaticManifest) => manifest.files)
+      .catch(() => {
+        // try again on the next load
+        manifestRequest = null;
+        return {};
+      });
+  }
+  return manifestRequest;
+};
+
+/**
+ * URL of an artifact by its path under the static base URL, versioned with its content hash so
+ * browser and CDN caches can keep it indefinitely.
+ */
+export const getStaticUrl = (
+  baseStaticUrl: string,
+  files: StaticManifestFiles,
+  path: string
+): string => {
+  const hash = files[path];
+  return hash ? `${baseStaticUrl}/${path}?v=${hash}` : `${baseStaticUrl}/${path}`;
+};
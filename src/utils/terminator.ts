@@ -22,6 +22,8 @@ function GMST(julianDay: number): number {
 type Options = {
   resolution: number;
   time: Date;
+  // precomputed subsolar point in degrees; used instead of computing the sun's position
+  subsolar?: { lat: number; lng: number };
 };
 
 type Ecliptic = {
@@ -156,19 +158,29 @@ export default class Terminator {
   }
 
   _compute(): number[][] {
-    const today = this.options.time ? new Date(this.options.time) : new Date();
-    const julianDay = julian(today);
-    const gst = GMST(julianDay);
     const latLng = [];
     const startMinus = -360;
 
-    const sunEclPos = this._sunEclipticPosition(julianDay);
-    const eclObliq = this._eclipticObliquity(julianDay);
-    const sunEqPos = this._sunEquatorialPosition(sunEclPos.lambda, eclObliq);
+    let ha: (lng: number) => number;
+    let sunEqPos: { alpha?: number; delta: number };
+    if (this.options.subsolar) {
+      // the hour angle is the longitude east of the subsolar point
+      const { lat, lng: subsolarLng } = this.options.subsolar;
+      sunEqPos = { delta: lat };
+      ha = (lng) => lng - subsolarLng;
+    } else {
+      const today = this.options.time ? new Date(this.options.time) : new Date();
+      const julianDay = julian(today);
+      const gst = GMST(julianDay);
+      const sunEclPos = this._sunEclipticPosition(julianDay);
+      const eclObliq = this._eclipticObliquity(julianDay);
+      const sunPos = this._sunEquatorialPosition(sunEclPos.lambda, eclObliq);
+      sunEqPos = sunPos;
+      ha = (lng) => this._hourAngle(lng, sunPos, gst);
+    }
     for (let i = 0; i <= 720 * this.options.resolution; i++) {
       const lng = startMinus + i / this.options.resolution;
-      const ha = this._hourAngle(lng, sunEqPos, gst);
-      latLng[i + 1] = [this._latitude(ha, sunEqPos), lng];
+      latLng[i + 1] = [this._latitude(ha(lng), sunEqPos), lng];
     }
     if (sunEqPos.delta < 0) {
       latLng[0] = [90, startMinus];